@@ -1,16 +1,13 @@
 import argparse
-import json
+import functools
 import os
 import sys
-from pathlib import Path
-from tqdm import tqdm
-import yaml
 
-from src.utils.video_io import VideoReader, VideoWriter
-from src.core.detector import PersonDetector
-from src.core.tracker import ByteTracker
-from src.core.counter import LineCounter
-from src.utils.visualization import draw_tracks, draw_counting_line, draw_counts
+from src.options import CheckpointOptions, RenderOptions, StreamOptions, StrideOptions
+from src.pipeline import run_sequence
+from src.sharding import run_sharded
+from src.serving import RemoteDetector
+from src.utils.profiling import profile_call
 
 # Evaluation script import
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'scripts'))
@@ -21,134 +18,201 @@ def main():
     parser = argparse.ArgumentParser(description='MOT17 tracking ve counting pipeline')
     parser.add_argument('--sequence', type=str, required=True,
                         help='Sequence adı (örn: MOT17-09, MOT17-02)')
+    parser.add_argument('--batch-size', type=int, default=1,
+                        help='Tek model çağrısında işlenecek frame sayısı')
+    parser.add_argument('--prefetch', type=int, default=0,
+                        help='Arka planda decode edilecek frame kuyruğu derinliği (0: kapalı)')
+    parser.add_argument('--decode-workers', type=int, default=2,
+                        help='Prefetch modunda decode thread sayısı')
+    parser.add_argument('--pipeline', action='store_true',
+                        help='Decode, detection ve render/encode ayrı thread\'lerde çalışsın')
+    parser.add_argument('--queue-size', type=int, default=8,
+                        help='Pipeline stage\'leri arasındaki kuyruk derinliği')
+    parser.add_argument('--no-render', action='store_true',
+                        help='Headless: çizim ve video encode yok (sadece txt/json/csv)')
+    parser.add_argument('--render-every', type=int, default=1,
+                        help='Sadece her N. frame\'i videoya yaz')
+    parser.add_argument('--render-events', action='store_true',
+                        help='Sadece crossing event\'i olan frameleri videoya yaz')
+    parser.add_argument('--det-cache', nargs='?', const='cache/detections', default=None,
+                        help='Detection cache klasörü (model + config hash\'i ile)')
+    parser.add_argument('--source', type=str, default=None,
+                        help='Canlı kaynak: RTSP/HTTP URL, kamera indeksi veya FIFO '
+                             '(counting line için --sequence yine gerekli)')
+    parser.add_argument('--drop-policy', choices=['oldest', 'newest', 'none'], default='oldest',
+                        help='Canlı kaynakta geride kalınca atılacak frame (oldest: hep en yeni frame)')
+    parser.add_argument('--stream-buffer', type=int, default=1,
+                        help='Canlı kaynak frame buffer\'ı')
+    parser.add_argument('--max-latency', type=float, default=None,
+                        help='Bu kadar saniyeden eski frameleri atla')
+    parser.add_argument('--realtime', action='store_true',
+                        help='--source dosya ise fps hızında oku (kamera simülasyonu)')
+    parser.add_argument('--max-frames', type=int, default=None,
+                        help='En fazla bu kadar frame işle')
+    parser.add_argument('--detect-every', type=int, default=1,
+                        help='Detector sadece her K. frame\'de, aradakiler Kalman prediction')
+    parser.add_argument('--adaptive-stride', action='store_true',
+                        help='Detection aralığını hareket / belirsizliğe göre seç')
+    parser.add_argument('--max-stride', type=int, default=8,
+                        help='Adaptive modda iki detection arası en fazla frame')
+    parser.add_argument('--roi', action='store_true', default=None,
+                        help='Detection sadece sayım çizgisi çevresi + aktif trackler üzerinde')
+    parser.add_argument('--multi-line', action='store_true', default=None,
+                        help='Tüm line_* / zone_* ile say (varsayılan: birden fazla tanımlıysa)')
+    parser.add_argument('--reduced-decode', action='store_true', default=None,
+                        help='Frameleri imgsz\'e göre küçültülmüş decode et (IMREAD_REDUCED_*)')
+    parser.add_argument('--timeline', nargs='?', const='csv', choices=['csv', 'json'], default=None,
+                        help='Frame başına stage sürelerini kaydet, p50/p95/p99 results.json\'a')
+    parser.add_argument('--checkpoint', type=float, nargs='?', const=5.0, default=None,
+                        help='En fazla bu kadar saniyede bir checkpoint al (varsayılan 5s)')
+    parser.add_argument('--resume', action='store_true',
+                        help='outputs/<SEQUENCE>/checkpoint.npz varsa oradan devam et (headless)')
+    parser.add_argument('--shards', type=int, default=None,
+                        help='Sequence\'ı örtüşen frame pencerelerine bölüp paralel işle (headless)')
+    parser.add_argument('--overlap', type=int, default=30,
+                        help='Sharding: pencereler arası örtüşme (frame), ID stitching için')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='Sharding: process sayısı (varsayılan: pencere sayısı)')
+    parser.add_argument('--server', nargs='?', const='', default=None,
+                        help='Detection paylaşımlı inference server\'da (scripts/serve_detector.py); '
+                             'socket verilmezse model.yaml\'daki')
+    parser.add_argument('--profile', action='store_true',
+                        help='cProfile ile çalıştır, profile.prof / profile.txt çıktı klasörüne')
     args = parser.parse_args()
+    if args.shards and (args.source or args.pipeline or args.adaptive_stride or args.roi
+                        or args.timeline or args.profile or args.checkpoint or args.resume
+                        or args.server is not None):
+        parser.error('--shards ile --source, --pipeline, --adaptive-stride, --roi, --timeline, '
+                     '--profile, --checkpoint, --resume ve --server kullanılamaz')
+    if args.resume and not args.no_render:
+        parser.error('--resume sadece --no-render ile (output.mp4 devam ettirilemez)')
     
     # paths
     sequence_name = args.sequence
-    input_dir = f'data/MOT17/train/{sequence_name}-SDP/img1/'
+    input_dir = args.source or f'data/MOT17/train/{sequence_name}-SDP/img1/'
     output_dir = f'outputs/{sequence_name}'
-    os.makedirs(output_dir, exist_ok=True)
     
     print(f"Sequence: {sequence_name}")
     print(f"Input: {input_dir}")
     print(f"Output: {output_dir}")
     
-    # counting line config
-    with open('configs/counting_lines.yaml', 'r', encoding='utf-8') as f:
-        lines_config = yaml.safe_load(f)
-    line_coords = lines_config[sequence_name]['line_1']['coordinates']
-    line_start = (line_coords[0], line_coords[1])
-    line_end = (line_coords[2], line_coords[3])
-    
-    # pipeline
-    reader = VideoReader(input_dir)
-    detector = PersonDetector()
-    tracker = ByteTracker()
-    counter = LineCounter(sequence_name)
-    
-    # video writer
-    writer = VideoWriter(
-        os.path.join(output_dir, 'output.mp4'),
-        fps=reader.fps,
-        width=reader.width,
-        height=reader.height
-    )
-    
-    print(f"Frame: {reader.total_frames}")
-    
-    # Tracking sonuçlarını kaydet (MOT format)
-    tracking_output = []
-    detection_stats = {'total_detections': 0, 'avg_confidence': []}
-    
-    # main loop
-    frame_idx = 0
-    for frame_idx in tqdm(range(reader.total_frames), desc="Processing"):
-        ret, frame = reader.read()
-        if not ret:
-            break
-        
-        # detection
-        detections = detector.detect(frame)
-        detection_stats['total_detections'] += len(detections)
-        if len(detections) > 0:
-            detection_stats['avg_confidence'].extend([d[4] for d in detections])
-        
-        # tracking
-        tracks = tracker.update(detections)
-        
-        # Tracking sonuçlarını kaydet (MOT format)
-        for track in tracks:
-            x1, y1, x2, y2, track_id, conf = track
-            w = x2 - x1
-            h = y2 - y1
-            # Format: <frame>, <id>, <bb_left>, <bb_top>, <bb_width>, <bb_height>, <conf>, -1, -1, -1
-            tracking_output.append(f"{frame_idx + 1},{int(track_id)},{x1:.2f},{y1:.2f},{w:.2f},{h:.2f},{conf:.4f},-1,-1,-1")
-        
-        # counting
-        counter.update(tracks, frame_idx + 1)
-        
-        # visualization
-        frame_vis = frame.copy()
-        draw_tracks(frame_vis, tracks)
-        draw_counting_line(frame_vis, line_start, line_end)
-        counts = counter.get_counts()
-        draw_counts(frame_vis, counts)
-        
-        # save
-        writer.write(frame_vis)
-    
-    reader.release()
-    writer.release()
-    
-    # Tracking sonuçlarını kaydet (MOT format)
-    tracking_path = os.path.join(output_dir, 'tracking.txt')
-    with open(tracking_path, 'w') as f:
-        f.write('\n'.join(tracking_output))
-    
-    # Save results
-    final_counts = counter.get_counts()
-    avg_conf = sum(detection_stats['avg_confidence']) / len(detection_stats['avg_confidence']) if detection_stats['avg_confidence'] else 0
-    
-    results = {
-        'sequence': sequence_name,
-        'total_frames': frame_idx + 1,
-        'detection_stats': {
-            'total_detections': detection_stats['total_detections'],
-            'avg_detections_per_frame': detection_stats['total_detections'] / (frame_idx + 1),
-            'avg_confidence': avg_conf
-        },
-        'counts': {
-            'entry': final_counts['entry'],
-            'exit': final_counts['exit'],
-            'total_crossings': final_counts['total_crossings'],
-            'unique_tracks': final_counts['unique_tracks']
-        }
-    }
-    
-    results_path = os.path.join(output_dir, 'results.json')
-    with open(results_path, 'w', encoding='utf-8') as f:
-        json.dump(results, f, indent=2, ensure_ascii=False)
-    
-    # Events.csv kaydet
-    events = counter.get_events()
-    events_path = os.path.join(output_dir, 'events.csv')
-    with open(events_path, 'w') as f:
-        f.write('frame,track_id,event_type,direction\n')
-        for event in events:
-            f.write(f"{event['frame']},{event['track_id']},{event['event_type']},{event['direction']}\n")
+    detector = None
+    if args.server is not None:
+        # model yüklenmez, tracker / counter bu process'te
+        detector = RemoteDetector(args.server or None)
+        print(f"Inference server: {detector.address}")
+    
+    run = run_sequence
+    if args.profile:
+        run = functools.partial(profile_call, output_dir, run_sequence)
+    
+    if args.shards:
+        if not args.no_render:
+            print("Sharding modunda video yazılmaz (headless)")
+        results = run_sharded(
+            sequence_name,
+            input_dir=input_dir,
+            output_dir=output_dir,
+            num_shards=args.shards,
+            overlap=args.overlap,
+            workers=args.workers,
+            batch_size=args.batch_size,
+            cache_dir=args.det_cache,
+            detect_every=args.detect_every,
+            multi_line=args.multi_line
+        )
+    else:
+        stream = None
+        if args.source is not None:
+            stream = StreamOptions(drop_policy=args.drop_policy, buffer_size=args.stream_buffer,
+                                   max_latency=args.max_latency, realtime=args.realtime)
+        checkpoint = None
+        if args.checkpoint is not None or args.resume:
+            checkpoint = CheckpointOptions(every=args.checkpoint, resume=args.resume)
+        results = run(
+            sequence_name,
+            input_dir=input_dir,
+            output_dir=output_dir,
+            detector=detector,
+            render=RenderOptions(enabled=not args.no_render, every=args.render_every,
+                                 events_only=args.render_events),
+            stream=stream,
+            stride=StrideOptions(detect_every=args.detect_every, adaptive=args.adaptive_stride,
+                                 max_stride=args.max_stride),
+            checkpoint=checkpoint,
+            batch_size=args.batch_size,
+            prefetch=args.prefetch,
+            decode_workers=args.decode_workers,
+            pipelined=args.pipeline,
+            queue_size=args.queue_size,
+            cache_dir=args.det_cache,
+            max_frames=args.max_frames,
+            roi=args.roi,
+            multi_line=args.multi_line,
+            timeline=args.timeline,
+            reduced_decode=args.reduced_decode
+        )
+    final_counts = results['counts']
+    paths = results['paths']
     
     print("\n" + "="*50)
     print("Results:")
     print("="*50)
-    print(f"Events saved: {events_path}")
+    print(f"Events saved: {paths['events']}")
     print(f"Entry: {final_counts['entry']}")
     print(f"Exit: {final_counts['exit']}")
     print(f"Total crossings: {final_counts['total_crossings']}")
     print(f"Unique tracks: {final_counts['unique_tracks']}")
+    for line in results.get('lines', {}).values():
+        print(f"  {line['name']}: entry {line['entry']}, exit {line['exit']}")
+    for zone in results.get('zones', {}).values():
+        print(f"  {zone['name']}: {zone['visits']} ziyaret, ortalama {zone.get('mean_dwell_s', 0):.1f}s, "
+              f"en uzun {zone.get('max_dwell_s', 0):.1f}s")
     print("="*50)
-    print(f"\nVideo saved: {os.path.join(output_dir, 'output.mp4')}")
-    print(f"Tracking output: {tracking_path}")
-    print(f"Results saved: {results_path}")
+    if paths['video']:
+        print(f"\nVideo saved: {paths['video']}")
+    print(f"Tracking output: {paths['tracking']}")
+    print(f"Results saved: {paths['results']}")
+    if paths['timeline']:
+        print(f"Timeline: {paths['timeline']}")
+    if args.profile:
+        print(f"Profile: {os.path.join(output_dir, 'profile.txt')}")
+    if results['detection_cache']:
+        print(f"Detection cache: {results['detection_cache']}")
+    
+    if 'roi' in results:
+        print(f"ROI: {results['roi']['crops_per_frame']:.1f} crop/frame, "
+              f"piksel oranı {results['roi']['pixel_ratio']:.0%}")
+    if 'decode_scale' in results:
+        print(f"Decode: 1/{results['decode_scale']} ölçek")
+    if results.get('resumed_from'):
+        print(f"Checkpoint'ten devam: frame {results['resumed_from'] + 1}")
+    if 'sharding' in results:
+        seams = results['sharding']['seams']
+        print(f"Sharding: {results['sharding']['shards']} pencere, "
+              f"{sum(seam['stitched'] for seam in seams)}/{sum(seam['tracks'] for seam in seams)} "
+              f"track sınırda birleştirildi")
+    if 'stride' in results:
+        print(f"Detection: {results['stride']['detected_frames']}/{results['total_frames']} frame")
+    if 'stream' in results:
+        stream = results['stream']
+        print(f"Stream: {stream['captured']} captured, {stream['dropped']} dropped "
+              f"({stream['drop_rate']:.1%}), latency avg {stream['avg_latency_ms']:.0f} ms "
+              f"/ max {stream['max_latency_ms']:.0f} ms")
+    
+    # Stage throughput raporu (darboğazı görmek için)
+    print(f"\nStages ({results['fps']:.1f} fps toplam):")
+    for name, stage in results['stages'].items():
+        print(f"  {name:<7} {stage['fps']:8.1f} fps  busy {stage['busy_s']:7.2f}s  wait {stage['wait_s']:7.2f}s")
+    if 'timings' in results:
+        print("\nFrame başına (ms)      p50      p95      p99")
+        for name, t in results['timings'].items():
+            if name.endswith('_ms'):
+                print(f"  {name[:-3]:<12} {t['p50']:8.2f} {t['p95']:8.2f} {t['p99']:8.2f}")
+    
+    # Canlı kaynak için GT yok
+    if args.source is not None:
+        return
     
     # Otomatik evaluation
     print("\n" + "="*50)
@@ -0,0 +1,229 @@
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import yaml
+
+from src.utils.sequences import base_sequence, collect_sequences
+
+# Evaluation script import
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'scripts'))
+
+
+# Worker process başına tek detector (model bir kez yüklenir)
+_detector = None
+
+
+def _init_worker(torch_threads, server=None):
+    """Worker başlangıcı: torch thread sayısı + model yükleme
+    
+    server verilirse model yüklenmez, detection inference server'da.
+    """
+    global _detector
+    if server is not None:
+        from src.serving import RemoteDetector
+        _detector = RemoteDetector(server or None)
+        return
+    if torch_threads:
+        import torch
+        torch.set_num_threads(torch_threads)
+    
+    from src.core.detector import PersonDetector
+    _detector = PersonDetector()
+
+
+def _process(name, seq_dir, options, evaluate):
+    """Worker içinde tek sequence işle
+    
+    Args:
+        name: çıktı / özet adı (örn: MOT17-02 veya MOT17-02-DPM)
+    """
+    from src.pipeline import run_sequence
+    
+    sequence_name = base_sequence(name)
+    output_dir = f'outputs/{name}'
+    start = time.perf_counter()
+    results = run_sequence(
+        sequence_name,
+        input_dir=os.path.join(seq_dir, 'img1'),
+        output_dir=output_dir,
+        detector=_detector,
+        show_progress=False,
+        **options
+    )
+    
+    eval_results = None
+    if evaluate:
+        from evaluate import evaluate_sequence
+        eval_results = evaluate_sequence(sequence_name, seq_dir=seq_dir, output_dir=output_dir)
+    
+    return {
+        'sequence': name,
+        'total_frames': results['total_frames'],
+        'counts': results['counts'],
+        'detection_stats': results['detection_stats'],
+        'evaluation': eval_results,
+        'fps': results['fps'],
+        'elapsed_s': time.perf_counter() - start,
+        'worker_pid': os.getpid()
+    }
+
+
+def summarize(results, failed):
+    """Tüm sequence'lar için toplam özet"""
+    done = [r for r in results if r is not None]
+    total_frames = sum(r['total_frames'] for r in done)
+    total_elapsed = sum(r['elapsed_s'] for r in done)
+    
+    summary = {
+        'sequences': {r['sequence']: r for r in done},
+        'failed': failed,
+        'totals': {
+            'sequences': len(done),
+            'frames': total_frames,
+            'entry': sum(r['counts']['entry'] for r in done),
+            'exit': sum(r['counts']['exit'] for r in done),
+            'total_crossings': sum(r['counts']['total_crossings'] for r in done),
+            'total_detections': sum(r['detection_stats']['total_detections'] for r in done)
+        }
+    }
+    
+    evaluated = [r['evaluation'] for r in done if r['evaluation'] and r['evaluation']['detection']]
+    if evaluated:
+        tp = sum(e['detection']['tp'] for e in evaluated)
+        fp = sum(e['detection']['fp'] for e in evaluated)
+        fn = sum(e['detection']['fn'] for e in evaluated)
+        precision = tp / (tp + fp) if (tp + fp) > 0 else 0
+        recall = tp / (tp + fn) if (tp + fn) > 0 else 0
+        summary['totals']['detection'] = {
+            'precision': precision,
+            'recall': recall,
+            'f1': 2 * precision * recall / (precision + recall) if (precision + recall) > 0 else 0
+        }
+    
+    tracked = [r['evaluation']['tracking'] for r in done if r['evaluation'] and r['evaluation']['tracking']]
+    if tracked:
+        num_gt = sum(t['num_gt'] for t in tracked)
+        num_pred = sum(t['num_pred'] for t in tracked)
+        matches = sum(t['matches'] for t in tracked)
+        idtp = sum(t['idtp'] for t in tracked)
+        id_switches = sum(t['id_switches'] for t in tracked)
+        errors = sum(t['fp'] + t['fn'] for t in tracked) + id_switches
+        summary['totals']['tracking'] = {
+            'mota': 1 - errors / num_gt if num_gt > 0 else 0,
+            'motp': sum(t['iou_sum'] for t in tracked) / matches if matches > 0 else 0,
+            'idf1': 2 * idtp / (num_gt + num_pred) if (num_gt + num_pred) > 0 else 0,
+            'id_switches': id_switches,
+            'fragmentations': sum(t['fragmentations'] for t in tracked)
+        }
+    
+    summary['totals']['worker_time_s'] = total_elapsed
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Birden fazla sequence için paralel pipeline')
+    parser.add_argument('--sequences', nargs='+', default=None,
+                        help='Sadece bu sequence\'lar (varsayılan: sequences.yaml\'daki enabled olanlar)')
+    parser.add_argument('--glob', type=str, default=None,
+                        help='Sequence klasörleri için glob (örn: "data/MOT17/train/*-SDP")')
+    parser.add_argument('--workers', type=int, default=2,
+                        help='Process sayısı (her biri modeli bir kez yükler)')
+    parser.add_argument('--torch-threads', type=int, default=0,
+                        help='Worker başına torch thread sayısı (0: torch varsayılanı)')
+    parser.add_argument('--batch-size', type=int, default=1)
+    parser.add_argument('--prefetch', type=int, default=0)
+    parser.add_argument('--pipeline', action='store_true')
+    parser.add_argument('--no-render', action='store_true',
+                        help='Headless: output.mp4 yazılmaz')
+    parser.add_argument('--det-cache', nargs='?', const='cache/detections', default=None,
+                        help='Detection cache klasörü')
+    parser.add_argument('--no-eval', action='store_true',
+                        help='Sequence sonrası evaluation çalıştırma')
+    parser.add_argument('--server', nargs='?', const='', default=None,
+                        help='Worker\'lar modeli yüklemez, tek inference server kullanır '
+                             '(scripts/serve_detector.py)')
+    parser.add_argument('--summary', type=str, default='outputs/summary.json')
+    args = parser.parse_args()
+    
+    sequences = collect_sequences(pattern=args.glob, names=args.sequences)
+    failed = {}
+    # çizgi ayarı olmayan sequence worker'da KeyError verir, baştan ayır
+    with open('configs/counting_lines.yaml', encoding='utf-8') as f:
+        lines_config = yaml.safe_load(f)
+    for name, _ in sequences:
+        if base_sequence(name) not in lines_config:
+            failed[name] = f"configs/counting_lines.yaml'da {base_sequence(name)} yok"
+            print(f"[{name}] atlandı: {failed[name]}")
+    sequences = [(name, seq_dir) for name, seq_dir in sequences if name not in failed]
+    if not sequences:
+        print("Sequence bulunamadı")
+        return
+    
+    options = {
+        'batch_size': args.batch_size,
+        'prefetch': args.prefetch,
+        'pipelined': args.pipeline,
+        'render': not args.no_render,
+        'cache_dir': args.det_cache
+    }
+    workers = min(args.workers, len(sequences))
+    print(f"{len(sequences)} sequence, {workers} worker")
+    
+    results = []
+    wall_start = time.perf_counter()
+    # fork + torch thread havuzu sorun çıkarabilir, spawn kullan
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context,
+                             initializer=_init_worker, initargs=(args.torch_threads, args.server)) as pool:
+        futures = {
+            pool.submit(_process, name, seq_dir, options, not args.no_eval): name
+            for name, seq_dir in sequences
+        }
+        for future in as_completed(futures):
+            name = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                failed[name] = str(e)
+                print(f"[{name}] hata: {e}")
+                continue
+            results.append(result)
+            counts = result['counts']
+            print(f"[{name}] {result['total_frames']} frame, {result['fps']:.1f} fps, "
+                  f"entry {counts['entry']} / exit {counts['exit']}")
+    wall_time = time.perf_counter() - wall_start
+    
+    summary = summarize(results, failed)
+    summary['totals']['wall_time_s'] = wall_time
+    summary['totals']['fps'] = summary['totals']['frames'] / wall_time if wall_time > 0 else 0
+    
+    os.makedirs(os.path.dirname(args.summary) or '.', exist_ok=True)
+    with open(args.summary, 'w', encoding='utf-8') as f:
+        json.dump(summary, f, indent=2, ensure_ascii=False)
+    
+    totals = summary['totals']
+    print("\n" + "="*50)
+    print("Summary:")
+    print("="*50)
+    print(f"Sequences: {totals['sequences']} ({len(failed)} failed)")
+    print(f"Frames:    {totals['frames']} ({totals['fps']:.1f} fps, {wall_time:.1f}s)")
+    print(f"Entry:     {totals['entry']}")
+    print(f"Exit:      {totals['exit']}")
+    print(f"Total:     {totals['total_crossings']}")
+    if 'detection' in totals:
+        print(f"F1:        {totals['detection']['f1']:.3f}")
+    if 'tracking' in totals:
+        print(f"MOTA:      {totals['tracking']['mota']:.1%}")
+        print(f"IDF1:      {totals['tracking']['idf1']:.1%}")
+        print(f"ID Sw.:    {totals['tracking']['id_switches']}")
+    print("="*50)
+    print(f"Summary saved: {args.summary}")
+
+
+if __name__ == '__main__':
+    main()
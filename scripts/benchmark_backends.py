@@ -0,0 +1,125 @@
+"""
+Detector backend karşılaştırması (ultralytics / onnx / openvino)
+
+Her backend için batch=1 latency (p50, ortalama), batch=B throughput ve
+referans backend'e göre detection uyumu (aynı frame'lerde eşleşen bbox
+oranı, ortalama IoU ve conf farkı) raporlanır.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+import yaml
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.core.backends import BACKENDS, create_backend
+from evaluate import match_frame
+
+
+def load_frames(seq_dir, num_frames):
+    """Sequence boyunca eşit aralıklı num_frames frame"""
+    img_dir = os.path.join(seq_dir, 'img1')
+    files = sorted(f for f in os.listdir(img_dir) if f.endswith('.jpg'))
+    idx = np.linspace(0, len(files) - 1, min(num_frames, len(files))).astype(int)
+    return [cv2.imread(os.path.join(img_dir, files[i])) for i in idx]
+
+
+def measure(backend, frames, batch_size, warmup=3):
+    """batch=1 latency ve batch=batch_size throughput, tüm frame'lerin çıktıları"""
+    for frame in frames[:warmup]:
+        backend([frame])
+    
+    latencies = []
+    outputs = []
+    for frame in frames:
+        start = time.perf_counter()
+        outputs.extend(backend([frame]))
+        latencies.append(time.perf_counter() - start)
+    latencies = np.array(latencies) * 1000
+    
+    start = time.perf_counter()
+    for i in range(0, len(frames), batch_size):
+        backend(frames[i:i + batch_size])
+    elapsed = time.perf_counter() - start
+    
+    return {
+        'latency_p50_ms': float(np.percentile(latencies, 50)),
+        'latency_mean_ms': float(latencies.mean()),
+        'throughput_fps': len(frames) / elapsed if elapsed > 0 else 0.0,
+    }, outputs
+
+
+def parity(ref_outputs, outputs, iou_thresh=0.5):
+    """Referans çıktılara göre precision / recall, eşleşenlerde IoU ve conf farkı"""
+    tp = num_ref = num_pred = 0
+    ious, conf_diffs = [], []
+    for ref, pred in zip(ref_outputs, outputs):
+        ref_idx, pred_idx, iou = match_frame(ref[:, :4], pred[:, :4], iou_thresh)
+        tp += len(ref_idx)
+        num_ref += len(ref)
+        num_pred += len(pred)
+        ious.append(iou)
+        conf_diffs.append(np.abs(ref[ref_idx, 4] - pred[pred_idx, 4]))
+    ious = np.concatenate(ious) if ious else np.zeros(0)
+    conf_diffs = np.concatenate(conf_diffs) if conf_diffs else np.zeros(0)
+    return {
+        'precision': tp / num_pred if num_pred > 0 else 1.0,
+        'recall': tp / num_ref if num_ref > 0 else 1.0,
+        'mean_iou': float(ious.mean()) if len(ious) else 0.0,
+        'mean_conf_diff': float(conf_diffs.mean()) if len(conf_diffs) else 0.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Detector backend benchmark')
+    parser.add_argument('--config', default='configs/model.yaml')
+    parser.add_argument('--sequence', default='data/MOT17/train/MOT17-09-FRCNN')
+    parser.add_argument('--backends', nargs='+', choices=BACKENDS, default=list(BACKENDS))
+    parser.add_argument('--reference', choices=BACKENDS, default='ultralytics',
+                        help='Uyum karşılaştırması için referans backend')
+    parser.add_argument('--frames', type=int, default=100)
+    parser.add_argument('--batch-size', type=int, default=8)
+    parser.add_argument('--output', default=None, help='Sonuçları JSON olarak kaydet')
+    args = parser.parse_args()
+    
+    with open(args.config) as f:
+        config = yaml.safe_load(f)['detection']
+    frames = load_frames(args.sequence, args.frames)
+    
+    # referans önce ölçülür
+    names = sorted(args.backends, key=lambda b: b != args.reference)
+    report, outputs = {}, {}
+    for name in names:
+        try:
+            backend = create_backend({**config, 'backend': name})
+        except (ImportError, FileNotFoundError) as e:
+            print(f"{name}: atlandı ({e})")
+            continue
+        report[name], outputs[name] = measure(backend, frames, args.batch_size)
+    
+    if args.reference in outputs:
+        for name in report:
+            report[name].update(parity(outputs[args.reference], outputs[name]))
+    
+    header = ['backend', 'p50_ms', 'mean_ms', f'fps@b{args.batch_size}',
+              'precision', 'recall', 'mean_iou', 'conf_diff']
+    print(' '.join(f"{h:>12}" for h in header))
+    for name, r in report.items():
+        row = [name, f"{r['latency_p50_ms']:.1f}", f"{r['latency_mean_ms']:.1f}",
+               f"{r['throughput_fps']:.1f}"]
+        row += [f"{r[k]:.3f}" if k in r else '-'
+                for k in ('precision', 'recall', 'mean_iou', 'mean_conf_diff')]
+        print(' '.join(f"{str(v):>12}" for v in row))
+    
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\nSaved: {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,61 @@
+"""
+pairwise_iou ve calculate_iou döngüsü karşılaştırması (microbenchmark)
+"""
+import argparse
+import os
+import sys
+import timeit
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.utils.geometry import calculate_iou, pairwise_iou
+
+
+def random_boxes(n, rng, width=1920, height=1080):
+    """Frame içinde rastgele bboxlar [x1, y1, x2, y2]"""
+    xy = rng.uniform([0, 0], [width, height], (n, 2))
+    wh = rng.uniform([20, 50], [120, 300], (n, 2))
+    return np.hstack([xy, xy + wh])
+
+
+def scalar_iou_matrix(boxes_a, boxes_b):
+    """Eski yöntem: Python çift döngü"""
+    out = np.zeros((len(boxes_a), len(boxes_b)))
+    for i, a in enumerate(boxes_a):
+        for j, b in enumerate(boxes_b):
+            out[i, j] = calculate_iou(a, b)
+    return out
+
+
+def bench(fn, repeat):
+    """En iyi çalışma süresi (saniye)"""
+    return min(timeit.repeat(fn, number=1, repeat=repeat))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10, 100, 1000])
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+    
+    rng = np.random.default_rng(0)
+    
+    print(f"{'N':>6} {'scalar (ms)':>14} {'pairwise (ms)':>14} {'speedup':>9}")
+    for n in args.sizes:
+        boxes_a = random_boxes(n, rng)
+        boxes_b = random_boxes(n, rng)
+        
+        # scalar versiyon büyük N'de çok yavaş, daha az tekrar
+        scalar_repeat = 1 if n >= 1000 else args.repeat
+        t_scalar = bench(lambda: scalar_iou_matrix(boxes_a, boxes_b), scalar_repeat)
+        t_vec = bench(lambda: pairwise_iou(boxes_a, boxes_b), args.repeat)
+        
+        assert np.allclose(scalar_iou_matrix(boxes_a[:50], boxes_b[:50]),
+                           pairwise_iou(boxes_a[:50], boxes_b[:50]))
+        
+        print(f"{n:>6} {t_scalar * 1e3:>14.3f} {t_vec * 1e3:>14.3f} {t_scalar / t_vec:>8.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,172 @@
+"""
+Inference server yük testi: N kamera, throughput ve gecikme
+
+Her kamera ayrı bir process; kendi framelerini (sequence'ın farklı
+bölümleri) belleğe yükler ve süre boyunca frame başına detect çağırır.
+--fps 0 ise kameralar cevap gelir gelmez yeni frame gönderir (kapalı
+döngü), > 0 ise kamera hızında. Her N için toplam throughput, kamera başına
+fps, p50 / p95 / p99 gecikme ve server'ın ortalama batch boyutu raporlanır.
+--baseline ile aynı yük, her kamerada ayrı model yüklenerek (bugünkü gibi
+kamera başına bir run.py) tekrar ölçülür.
+
+Sadece detection yolu ölçülür; tracker / counter kamera process'inde
+çalışır ve server'dan etkilenmez.
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.core.detector import PersonDetector
+from src.serving import InferenceServer, RemoteBackend, RemoteDetector
+from src.utils.sequences import collect_sequences
+from src.utils.video_io import VideoReader
+
+
+def _camera(index, address, input_dir, num_frames, duration, fps, barrier, results):
+    """Tek kamera: frameleri yükle, hazır olunca süre boyunca detect"""
+    try:
+        # address None: kamera kendi modelini yükler (baseline)
+        detector = PersonDetector() if address is None else RemoteDetector(address)
+        reader = VideoReader(input_dir, decode_size=detector.decode_size,
+                             start_frame=index * num_frames)
+        detector.decode_scale = reader.decode_scale
+        frames = []
+        while len(frames) < num_frames:
+            ret, frame = reader.read()
+            if not ret:
+                break
+            frames.append(frame)
+        reader.release()
+        detector.detect(frames[0])  # ısınma (model yükleme / ilk bağlantı)
+    except Exception:
+        barrier.abort()
+        raise
+    barrier.wait()
+    
+    latencies = []
+    start = time.monotonic()
+    while time.monotonic() - start < duration:
+        if fps:
+            # kamera hızı: sıradaki frame'in zamanı gelmediyse bekle
+            delay = start + len(latencies) / fps - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+        t = time.monotonic()
+        detector.detect(frames[len(latencies) % len(frames)])
+        latencies.append(time.monotonic() - t)
+    results.put({'camera': index, 'frames': len(latencies), 'elapsed_s': time.monotonic() - start,
+                 'latencies': latencies})
+
+
+def server_stats(address):
+    """Server istatistikleri (kısa bağlantı; açık kalan client batch beklemesini etkiler)"""
+    backend = RemoteBackend(address)
+    try:
+        return backend.stats()
+    finally:
+        backend.close()
+
+
+def run_cameras(num_cameras, address, input_dir, args):
+    """N kamera process'ini aynı anda başlat, sonuçları topla"""
+    # fork + torch thread havuzu sorun çıkarabilir, spawn kullan
+    context = multiprocessing.get_context('spawn')
+    barrier = context.Barrier(num_cameras + 1)
+    results = context.Queue()
+    processes = [
+        context.Process(target=_camera, args=(i, address, input_dir, args.frames, args.duration,
+                                              args.fps, barrier, results))
+        for i in range(num_cameras)
+    ]
+    for process in processes:
+        process.start()
+    # tüm kameralar hazır olunca
+    barrier.wait(timeout=600)
+    wall_start = time.monotonic()
+    cameras = [results.get() for _ in processes]
+    wall_time = time.monotonic() - wall_start
+    for process in processes:
+        process.join()
+    
+    latencies = np.concatenate([c['latencies'] for c in cameras]) * 1000
+    frames = sum(c['frames'] for c in cameras)
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+    return {
+        'cameras': num_cameras,
+        'frames': frames,
+        'throughput_fps': frames / wall_time,
+        'camera_fps': float(np.mean([c['frames'] / c['elapsed_s'] for c in cameras])),
+        'latency_ms': {'p50': float(p50), 'p95': float(p95), 'p99': float(p99),
+                       'mean': float(latencies.mean()), 'max': float(latencies.max())}
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Inference server yük testi')
+    parser.add_argument('--sequence', default=None, help='Frame kaynağı (varsayılan: ilk enabled)')
+    parser.add_argument('--cameras', type=int, nargs='+', default=[1, 2, 4, 8])
+    parser.add_argument('--frames', type=int, default=50, help='Kamera başına belleğe yüklenen frame')
+    parser.add_argument('--duration', type=float, default=10.0, help='Her N için ölçüm süresi (s)')
+    parser.add_argument('--fps', type=float, default=0,
+                        help='Kamera frame hızı (0: cevap gelince hemen sonraki frame)')
+    parser.add_argument('--max-batch', type=int, default=None)
+    parser.add_argument('--max-wait-ms', type=float, default=None)
+    parser.add_argument('--socket', default=None,
+                        help='Çalışan server (scripts/serve_detector.py); yoksa burada başlatılır')
+    parser.add_argument('--baseline', action='store_true',
+                        help='Karşılaştırma: her kamera kendi modelini yükler (batch 1)')
+    parser.add_argument('--output', default=None, help='Sonuçları JSON olarak kaydet')
+    args = parser.parse_args()
+    
+    name, seq_dir = collect_sequences(names=[args.sequence] if args.sequence else None)[0]
+    input_dir = os.path.join(seq_dir, 'img1')
+    
+    server = None
+    address = args.socket
+    if address is None:
+        max_wait = None if args.max_wait_ms is None else args.max_wait_ms / 1000
+        server = InferenceServer(max_batch=args.max_batch, max_wait=max_wait).start()
+        address = server.address
+        print(f"Server: {address} (max_batch {server.max_batch}, max_wait {server.max_wait * 1000:.1f} ms)")
+    
+    report = {'sequence': name, 'fps': args.fps, 'server': [], 'baseline': []}
+    try:
+        for num_cameras in args.cameras:
+            stats_before = server_stats(address)
+            entry = run_cameras(num_cameras, address, input_dir, args)
+            stats = server_stats(address)
+            
+            batches = stats['batches'] - stats_before['batches']
+            # ısınma çağrıları da dahil, yaklaşık
+            entry['mean_batch'] = (stats['frames'] - stats_before['frames']) / batches if batches else 0
+            report['server'].append(entry)
+            if args.baseline:
+                report['baseline'].append(run_cameras(num_cameras, None, input_dir, args))
+    finally:
+        if server is not None:
+            server.close()
+    
+    header = ['mode', 'cameras', 'fps', 'cam_fps', 'p50_ms', 'p95_ms', 'p99_ms', 'batch']
+    print(' '.join(f"{h:>9}" for h in header))
+    for mode in ('server', 'baseline'):
+        for e in report[mode]:
+            lat = e['latency_ms']
+            row = [mode, e['cameras'], f"{e['throughput_fps']:.1f}", f"{e['camera_fps']:.1f}",
+                   f"{lat['p50']:.1f}", f"{lat['p95']:.1f}", f"{lat['p99']:.1f}",
+                   f"{e['mean_batch']:.2f}" if 'mean_batch' in e else '-']
+            print(' '.join(f"{str(v):>9}" for v in row))
+    
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\nSaved: {args.output}")
+
+
+if __name__ == '__main__':
+    main()
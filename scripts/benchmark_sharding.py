@@ -0,0 +1,108 @@
+"""
+Zamansal sharding hız / ID tutarlılığı karşılaştırması
+
+Her sequence önce seri (run_sequence, headless), sonra her shard sayısı için
+run_sharded ile işlenir. Süre ve hızlanma, sayım farkı, seri çıktıya göre
+ID tutarlılığı (seri tracking.txt referans alınarak IDF1 / ID switch) ve GT
+varsa MOTA / IDF1 raporlanır.
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.pipeline import run_sequence
+from src.sharding import run_sharded
+from src.utils.mot_io import load_mot
+from src.utils.sequences import collect_sequences
+from evaluate import eval_tracking
+
+
+def score(output_dir, reference, gt):
+    """tracking.txt'yi seri çıktı ve GT ile karşılaştır"""
+    data = load_mot(os.path.join(output_dir, 'tracking.txt'), use_cache=False)
+    entry = {}
+    if reference is not None:
+        consistency = eval_tracking(reference, data)
+        entry.update(serial_idf1=consistency['idf1'], serial_id_switches=consistency['id_switches'])
+    if gt is not None:
+        track = eval_tracking(gt, data)
+        entry.update(mota=track['mota'], idf1=track['idf1'], id_switches=track['id_switches'])
+    return entry
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Temporal sharding benchmark')
+    parser.add_argument('--sequences', nargs='+', default=None)
+    parser.add_argument('--shards', type=int, nargs='+', default=[2, 4, 8])
+    parser.add_argument('--overlap', type=int, default=30)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--batch-size', type=int, default=1)
+    parser.add_argument('--det-cache', nargs='?', const='cache/detections', default=None,
+                        help='Detection cache (sadece doğruluk; süre detector maliyetini içermez)')
+    parser.add_argument('--output', default=None, help='Sonuçları JSON olarak kaydet')
+    args = parser.parse_args()
+    
+    report = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, seq_dir in collect_sequences(names=args.sequences):
+            input_dir = os.path.join(seq_dir, 'img1')
+            gt_path = os.path.join(seq_dir, 'gt', 'gt.txt')
+            gt = load_mot(gt_path, is_gt=True) if os.path.exists(gt_path) else None
+            
+            output_dir = os.path.join(tmp, name, 'serial')
+            start = time.perf_counter()
+            results = run_sequence(name, input_dir=input_dir, output_dir=output_dir, render=False,
+                                   batch_size=args.batch_size, cache_dir=args.det_cache,
+                                   show_progress=False)
+            serial_time = time.perf_counter() - start
+            reference = load_mot(os.path.join(output_dir, 'tracking.txt'), use_cache=False)
+            report[name] = {'serial': {'time_s': serial_time, 'counts': results['counts'],
+                                       **score(output_dir, None, gt)}}
+            
+            for shards in args.shards:
+                output_dir = os.path.join(tmp, name, f'shards{shards}')
+                start = time.perf_counter()
+                results = run_sharded(name, input_dir=input_dir, output_dir=output_dir,
+                                      num_shards=shards, overlap=args.overlap, workers=args.workers,
+                                      batch_size=args.batch_size, cache_dir=args.det_cache)
+                elapsed = time.perf_counter() - start
+                seams = results['sharding']['seams']
+                report[name][f'shards={shards}'] = {
+                    'time_s': elapsed,
+                    'speedup': serial_time / elapsed if elapsed > 0 else 0,
+                    'counts': results['counts'],
+                    'stitched': sum(seam['stitched'] for seam in seams),
+                    'seam_tracks': sum(seam['tracks'] for seam in seams),
+                    **score(output_dir, reference, gt)
+                }
+    
+    header = ['sequence', 'mode', 'time_s', 'speedup', 'entry', 'exit', 'count_err',
+              'serial_idf1', 'serial_idsw', 'stitched', 'mota', 'idf1', 'id_sw']
+    print(' '.join(f"{h:>11}" for h in header))
+    for name, entries in report.items():
+        ref = entries['serial']['counts']
+        for label, e in entries.items():
+            counts = e['counts']
+            count_err = abs(counts['entry'] - ref['entry']) + abs(counts['exit'] - ref['exit'])
+            row = [name, label, f"{e['time_s']:.1f}", f"{e.get('speedup', 1.0):.2f}x",
+                   counts['entry'], counts['exit'], count_err,
+                   f"{e['serial_idf1']:.3f}" if 'serial_idf1' in e else '-',
+                   e.get('serial_id_switches', '-'),
+                   f"{e['stitched']}/{e['seam_tracks']}" if 'stitched' in e else '-',
+                   f"{e['mota']:.3f}" if 'mota' in e else '-',
+                   f"{e['idf1']:.3f}" if 'idf1' in e else '-',
+                   e.get('id_switches', '-')]
+            print(' '.join(f"{str(v):>11}" for v in row))
+    
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\nSaved: {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,102 @@
+"""
+Detection stride doğruluk / throughput karşılaştırması
+
+Her sequence için detector sadece her K. frame'de (veya adaptive) çalıştırılır,
+ara framelerde trackler Kalman prediction ile ilerler. Her K için MOTA, IDF1,
+sayım farkı (K=1'e göre) ve fps raporlanır.
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.core.detector import PersonDetector
+from src.options import StrideOptions
+from src.pipeline import run_sequence
+from src.utils.mot_io import load_mot
+from src.utils.sequences import collect_sequences
+from evaluate import eval_tracking
+
+
+def run_mode(detector, name, seq_dir, output_dir, stride, adaptive, max_stride, cache_dir):
+    """Tek sequence, tek stride ayarı"""
+    results = run_sequence(
+        name,
+        input_dir=os.path.join(seq_dir, 'img1'),
+        output_dir=output_dir,
+        detector=detector,
+        render=False,
+        cache_dir=cache_dir,
+        stride=StrideOptions(detect_every=stride, adaptive=adaptive, max_stride=max_stride),
+        show_progress=False
+    )
+    
+    entry = {
+        'frames': results['total_frames'],
+        'detected_frames': results.get('stride', {}).get('detected_frames', results['total_frames']),
+        'fps': results['fps'],
+        'detect_s': results['stages']['detect']['busy_s'],
+        'counts': results['counts']
+    }
+    
+    gt_path = os.path.join(seq_dir, 'gt', 'gt.txt')
+    if os.path.exists(gt_path):
+        track = eval_tracking(load_mot(gt_path, is_gt=True),
+                              load_mot(os.path.join(output_dir, 'tracking.txt'), use_cache=False))
+        entry.update(mota=track['mota'], idf1=track['idf1'], id_switches=track['id_switches'])
+    return entry
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Detection stride benchmark')
+    parser.add_argument('--sequences', nargs='+', default=None)
+    parser.add_argument('--strides', type=int, nargs='+', default=[1, 2, 3, 5, 10])
+    parser.add_argument('--adaptive', action='store_true',
+                        help='Adaptive stride modunu da ölç')
+    parser.add_argument('--max-stride', type=int, default=8)
+    parser.add_argument('--det-cache', nargs='?', const='cache/detections', default=None,
+                        help='Detection cache (sadece doğruluk; fps detector maliyetini içermez)')
+    parser.add_argument('--output', default=None, help='Sonuçları JSON olarak kaydet')
+    args = parser.parse_args()
+    
+    sequences = collect_sequences(names=args.sequences)
+    modes = [(k, False) for k in args.strides]
+    if args.adaptive:
+        modes.append((1, True))
+    if (1, False) not in modes:
+        modes.insert(0, (1, False))  # sayım farkı için referans
+    
+    detector = PersonDetector()
+    report = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, seq_dir in sequences:
+            report[name] = {}
+            for stride, adaptive in modes:
+                label = f'adaptive<={args.max_stride}' if adaptive else f'K={stride}'
+                output_dir = os.path.join(tmp, name, label)
+                report[name][label] = run_mode(detector, name, seq_dir, output_dir, stride,
+                                               adaptive, args.max_stride, args.det_cache)
+    
+    header = ['sequence', 'mode', 'det_frames', 'fps', 'mota', 'idf1', 'id_sw', 'entry', 'exit', 'count_err']
+    print(' '.join(f"{h:>12}" for h in header))
+    for name, entries in report.items():
+        ref = entries['K=1']['counts']
+        for label, e in entries.items():
+            counts = e['counts']
+            count_err = abs(counts['entry'] - ref['entry']) + abs(counts['exit'] - ref['exit'])
+            row = [name, label, f"{e['detected_frames']}/{e['frames']}", f"{e['fps']:.1f}",
+                   f"{e['mota']:.3f}" if 'mota' in e else '-',
+                   f"{e['idf1']:.3f}" if 'idf1' in e else '-',
+                   e.get('id_switches', '-'), counts['entry'], counts['exit'], count_err]
+            print(' '.join(f"{str(v):>12}" for v in row))
+    
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\nSaved: {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -4,58 +4,57 @@ Tracking ve counting değerlendirme
 import json
 import os
 import sys
-from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from scipy.optimize import linear_sum_assignment
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from src.utils.geometry import calculate_iou
-
-
-def parse_file(path, is_gt=False):
-    """MOT format dosya okuma"""
-    data = defaultdict(list)
-    with open(path, 'r') as f:
-        for line in f:
-            parts = line.strip().split(',')
-            frame_id = int(parts[0])
-            
-            if is_gt:
-                track_id = int(parts[1])
-                x, y, w, h = map(float, parts[2:6])
-                conf = float(parts[6])
-                if conf > 0:  # sadece visible
-                    data[frame_id].append({'id': track_id, 'bbox': [x, y, x+w, y+h]})
-            else:
-                track_id = int(parts[1])
-                x, y, w, h = map(float, parts[2:6])
-                conf = float(parts[6])
-                data[frame_id].append({'id': track_id, 'bbox': [x, y, x+w, y+h], 'conf': conf})
-    
-    return data
+from src.utils.geometry import pairwise_iou
+from src.utils.mot_io import load_mot
+
+
+def _frame_union(data_a, data_b):
+    """İki veriden en az birinde satırı olan frame'ler (sıralı)"""
+    return np.union1d(data_a.frame_ids(), data_b.frame_ids())
+
+
+def match_frame(gt_boxes, pred_boxes, iou_thresh=0.5):
+    """Bir frame için optimal (Hungarian) eşleştirme
+    
+    Returns:
+        gt_idx, pred_idx, ious: eşleşen çiftler (IoU >= iou_thresh)
+    """
+    empty = np.zeros(0, dtype=np.int64)
+    if len(gt_boxes) == 0 or len(pred_boxes) == 0:
+        return empty, empty, np.zeros(0)
+    
+    iou = pairwise_iou(gt_boxes, pred_boxes)
+    # Eşik altındaki çiftler seçilmesin diye IoU 0'a çekilir
+    iou_masked = np.where(iou >= iou_thresh, iou, 0)
+    rows, cols = linear_sum_assignment(iou_masked, maximize=True)
+    valid = iou_masked[rows, cols] > 0
+    rows, cols = rows[valid], cols[valid]
+    return rows, cols, iou[rows, cols]
 
 
 def eval_detection(gt_data, det_data, iou_thresh=0.5):
-    """Detection metrikleri"""
+    """Detection metrikleri (frame başına optimal eşleştirme)
+    
+    Sadece GT'si olan framelerde sayılır (visible GT olmayan framelerdeki
+    detectionlar FP değil), önceki sonuçlarla karşılaştırılabilir kalsın.
+    """
     tp = fp = fn = 0
     
-    for frame_id in gt_data.keys():
-        gt_boxes = [obj['bbox'] for obj in gt_data.get(frame_id, [])]
-        det_boxes = [obj['bbox'] for obj in det_data.get(frame_id, [])]
-        
-        matched_gt = set()
-        
-        for det_box in det_boxes:
-            best_iou = max([calculate_iou(det_box, gt_box) for gt_box in gt_boxes] + [0])
-            
-            if best_iou >= iou_thresh:
-                tp += 1
-                for j, gt_box in enumerate(gt_boxes):
-                    if j not in matched_gt and calculate_iou(det_box, gt_box) == best_iou:
-                        matched_gt.add(j)
-                        break
-            else:
-                fp += 1
+    for frame_id in gt_data.frame_ids():
+        frame_id = int(frame_id)
+        _, gt_boxes, _ = gt_data.frame(frame_id)
+        _, det_boxes, _ = det_data.frame(frame_id)
         
-        fn += len(gt_boxes) - len(matched_gt)
+        gt_idx, _, _ = match_frame(gt_boxes, det_boxes, iou_thresh)
+        tp += len(gt_idx)
+        fp += len(det_boxes) - len(gt_idx)
+        fn += len(gt_boxes) - len(gt_idx)
     
     precision = tp / (tp + fp) if (tp + fp) > 0 else 0
     recall = tp / (tp + fn) if (tp + fn) > 0 else 0
@@ -65,67 +64,124 @@ def eval_detection(gt_data, det_data, iou_thresh=0.5):
 
 
 def eval_tracking(gt_data, track_data, iou_thresh=0.5):
-    """Tracking quality metrikleri"""
-    id_switches = fragmentations = 0
-    gt_to_pred = defaultdict(list)
-    last_seen = {}
-    
-    for frame_id in sorted(gt_data.keys()):
-        gt_objs = gt_data.get(frame_id, [])
-        pred_objs = track_data.get(frame_id, [])
+    """Tracking metrikleri: CLEAR-MOT (MOTA/MOTP), IDF1, ID switch, fragmentation
+    
+    CLEAR-MOT: önceki frame'deki gt-pred eşleşmesi IoU eşiğini hala geçiyorsa
+    korunur, kalanlar Hungarian ile eşleştirilir. IDF1: tüm sequence boyunca
+    gt ID - pred ID arasında birebir eşleşme (IDTP maksimum).
+    """
+    num_gt = num_pred = matches = fp = fn = id_switches = fragmentations = 0
+    iou_sum = 0.0
+    last_match = {}  # gt_id -> son eşleştiği pred_id
+    last_seen = {}   # gt_id -> son eşleştiği frame
+    pair_gt, pair_pred = [], []  # IDF1 için eşik üstü tüm (gt, pred) çiftleri
+    
+    for frame_id in _frame_union(gt_data, track_data):
+        frame_id = int(frame_id)
+        gt_ids, gt_boxes, _ = gt_data.frame(frame_id)
+        pred_ids, pred_boxes, _ = track_data.frame(frame_id)
+        num_gt += len(gt_ids)
+        num_pred += len(pred_ids)
+        
+        if len(gt_ids) == 0 or len(pred_ids) == 0:
+            fp += len(pred_ids)
+            fn += len(gt_ids)
+            continue
+        
+        iou = pairwise_iou(gt_boxes, pred_boxes)
+        valid = iou >= iou_thresh
+        
+        rows, cols = np.nonzero(valid)
+        pair_gt.append(gt_ids[rows])
+        pair_pred.append(pred_ids[cols])
         
-        matched = set()
+        # Önceki eşleşmeler: hala geçerliyse öncelikli (büyük bonus)
+        score = np.where(valid, iou, 0)
+        prev = np.array([last_match.get(g, -1) for g in gt_ids])
+        keep = (prev[:, None] == pred_ids[None, :]) & valid
+        score = score + keep * len(gt_ids)
         
-        for gt_obj in gt_objs:
-            best_iou = 0
-            best_pred = None
-            
-            for j, pred_obj in enumerate(pred_objs):
-                if j not in matched:
-                    iou = calculate_iou(gt_obj['bbox'], pred_obj['bbox'])
-                    if iou > best_iou:
-                        best_iou = iou
-                        best_pred = (j, pred_obj['id'])
-            
-            if best_iou >= iou_thresh and best_pred:
-                gt_id = gt_obj['id']
-                pred_id = best_pred[1]
-                matched.add(best_pred[0])
-                
-                if gt_id in gt_to_pred and gt_to_pred[gt_id][-1] != pred_id:
-                    id_switches += 1
-                
-                if gt_id in last_seen and frame_id - last_seen[gt_id] > 1:
-                    fragmentations += 1
-                
-                gt_to_pred[gt_id].append(pred_id)
-                last_seen[gt_id] = frame_id
-    
-    return {'id_switches': id_switches, 'fragmentations': fragmentations}
+        rows, cols = linear_sum_assignment(score, maximize=True)
+        ok = valid[rows, cols]
+        rows, cols = rows[ok], cols[ok]
+        
+        matches += len(rows)
+        iou_sum += float(iou[rows, cols].sum())
+        fp += len(pred_ids) - len(rows)
+        fn += len(gt_ids) - len(rows)
+        
+        for gt_id, pred_id in zip(gt_ids[rows].tolist(), pred_ids[cols].tolist()):
+            if gt_id in last_match and last_match[gt_id] != pred_id:
+                id_switches += 1
+            if gt_id in last_seen and frame_id - last_seen[gt_id] > 1:
+                fragmentations += 1
+            last_match[gt_id] = pred_id
+            last_seen[gt_id] = frame_id
+    
+    mota = 1 - (fn + fp + id_switches) / num_gt if num_gt > 0 else 0
+    motp = iou_sum / matches if matches > 0 else 0
+    
+    # IDF1: gt ID x pred ID birlikte görülme sayıları, birebir optimal eşleşme
+    idtp = 0
+    if pair_gt:
+        pair_gt = np.concatenate(pair_gt)
+        pair_pred = np.concatenate(pair_pred)
+        gt_uniq, gt_inv = np.unique(pair_gt, return_inverse=True)
+        pred_uniq, pred_inv = np.unique(pair_pred, return_inverse=True)
+        counts = np.zeros((len(gt_uniq), len(pred_uniq)))
+        np.add.at(counts, (gt_inv, pred_inv), 1)
+        rows, cols = linear_sum_assignment(counts, maximize=True)
+        idtp = int(counts[rows, cols].sum())
+    idfp = num_pred - idtp
+    idfn = num_gt - idtp
+    idf1 = 2 * idtp / (2 * idtp + idfp + idfn) if (num_gt + num_pred) > 0 else 0
+    
+    return {
+        'id_switches': id_switches,
+        'fragmentations': fragmentations,
+        'mota': mota,
+        'motp': motp,
+        'idf1': idf1,
+        'idp': idtp / num_pred if num_pred > 0 else 0,
+        'idr': idtp / num_gt if num_gt > 0 else 0,
+        'num_gt': num_gt,
+        'num_pred': num_pred,
+        'matches': matches,
+        'fp': fp,
+        'fn': fn,
+        'idtp': idtp,
+        'iou_sum': iou_sum
+    }
 
 
-def main():
-    import argparse
-    parser = argparse.ArgumentParser()
-    parser.add_argument('--sequence', required=True)
-    args = parser.parse_args()
+def evaluate_sequence(seq, seq_dir=None, output_dir=None):
+    """Tek sequence için evaluation, evaluation.json yaz
+    
+    Args:
+        seq: Sequence adı (örn: MOT17-09)
+        seq_dir: MOT17 sequence klasörü (varsayılan data/MOT17/train/<seq>-SDP)
+        output_dir: run.py çıktı klasörü (varsayılan outputs/<seq>)
     
-    seq = args.sequence
-    gt_path = f'data/MOT17/train/{seq}-SDP/gt/gt.txt'
-    det_path = f'data/MOT17/train/{seq}-SDP/det/det.txt'
-    track_path = f'outputs/{seq}/tracking.txt'
-    results_path = f'outputs/{seq}/results.json'
+    Returns:
+        eval_results dict veya run.py çıktıları yoksa None
+    """
+    seq_dir = seq_dir or f'data/MOT17/train/{seq}-SDP'
+    output_dir = output_dir or f'outputs/{seq}'
+    gt_path = os.path.join(seq_dir, 'gt', 'gt.txt')
+    det_path = os.path.join(seq_dir, 'det', 'det.txt')
+    track_path = os.path.join(output_dir, 'tracking.txt')
+    results_path = os.path.join(output_dir, 'results.json')
     
     if not os.path.exists(track_path) or not os.path.exists(results_path):
         print("Önce run.py çalıştır")
-        return
+        return None
     
     with open(results_path) as f:
         results = json.load(f)
     
-    gt_data = parse_file(gt_path, is_gt=True) if os.path.exists(gt_path) else None
-    det_data = parse_file(det_path, is_gt=True) if os.path.exists(det_path) else None
-    track_data = parse_file(track_path)
+    gt_data = load_mot(gt_path, is_gt=True) if os.path.exists(gt_path) else None
+    det_data = load_mot(det_path, is_gt=True) if os.path.exists(det_path) else None
+    track_data = load_mot(track_path)
     
     print(f"\n{'='*60}")
     print(f"EVALUATION: {seq}")
@@ -146,6 +202,9 @@ def main():
     if gt_data:
         track_metrics = eval_tracking(gt_data, track_data)
         print(f"\nTracking:")
+        print(f"  MOTA:           {track_metrics['mota']:.1%}")
+        print(f"  MOTP (IoU):     {track_metrics['motp']:.3f}")
+        print(f"  IDF1:           {track_metrics['idf1']:.1%}")
         print(f"  ID Switches:    {track_metrics['id_switches']}")
         print(f"  Fragmentations: {track_metrics['fragmentations']}")
     else:
@@ -168,12 +227,44 @@ def main():
         'counting': counts
     }
     
-    eval_path = f'outputs/{seq}/evaluation.json'
+    eval_path = os.path.join(output_dir, 'evaluation.json')
     with open(eval_path, 'w') as f:
         json.dump(eval_results, f, indent=2)
     
     print(f"\n{'='*60}")
     print(f"Saved: {eval_path}\n")
+    
+    return eval_results
+
+
+def main():
+    import argparse
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--sequence', nargs='+', required=True,
+                        help='Bir veya daha fazla sequence')
+    parser.add_argument('--seq-dir', nargs='+', default=None,
+                        help='Sequence başına MOT17 klasörü (örn: data/MOT17/train/MOT17-02-DPM; '
+                             'varsayılan <seq>-SDP)')
+    parser.add_argument('--output-dir', nargs='+', default=None,
+                        help='Sequence başına run.py çıktı klasörü (varsayılan outputs/<seq>)')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='Sequence bazlı paralel evaluation için process sayısı')
+    args = parser.parse_args()
+    
+    num = len(args.sequence)
+    for option, values in (('--seq-dir', args.seq_dir), ('--output-dir', args.output_dir)):
+        if values is not None and len(values) != num:
+            parser.error(f'{option} için {num} klasör gerekli (--sequence ile aynı sırada)')
+    seq_dirs = args.seq_dir or [None] * num
+    output_dirs = args.output_dir or [None] * num
+    
+    if num == 1 or args.workers <= 1:
+        for seq, seq_dir, output_dir in zip(args.sequence, seq_dirs, output_dirs):
+            evaluate_sequence(seq, seq_dir=seq_dir, output_dir=output_dir)
+        return
+    
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        list(pool.map(evaluate_sequence, args.sequence, seq_dirs, output_dirs))
 
 
 if __name__ == '__main__':
@@ -0,0 +1,43 @@
+"""
+YOLO ağırlıklarını ONNX / OpenVINO formatına export et (backend: onnx / openvino)
+"""
+import argparse
+import os
+import shutil
+import sys
+
+import yaml
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Detector modelini export et')
+    parser.add_argument('--config', default='configs/model.yaml')
+    parser.add_argument('--format', choices=['onnx', 'openvino'], nargs='+', default=['onnx'])
+    parser.add_argument('--static-batch', action='store_true',
+                        help='Sabit batch=1 (varsayılan: dinamik batch)')
+    args = parser.parse_args()
+    
+    from ultralytics import YOLO
+    
+    with open(args.config) as f:
+        config = yaml.safe_load(f)['detection']
+    imgsz = config.get('imgsz', 640)
+    
+    for fmt in args.format:
+        model = YOLO(config['model_name'])
+        exported = model.export(format=fmt, imgsz=imgsz, dynamic=not args.static_batch)
+        
+        # model.yaml'daki yola taşı
+        target = config['onnx_model'] if fmt == 'onnx' else os.path.dirname(config['openvino_model'])
+        if os.path.abspath(exported) != os.path.abspath(target):
+            if os.path.isdir(target):
+                shutil.rmtree(target)
+            os.makedirs(os.path.dirname(target) or '.', exist_ok=True)
+            shutil.move(exported, target)
+        print(f"{fmt}: {target}")
+
+
+if __name__ == '__main__':
+    main()
@@ -29,6 +29,8 @@ def generate_table():
             f"{det['precision']*100:.1f}%",
             f"{det['recall']*100:.1f}%",
             f"{det['f1']:.3f}",
+            f"{track['mota']*100:.1f}%" if 'mota' in track else '-',
+            f"{track['idf1']*100:.1f}%" if 'idf1' in track else '-',
             track['id_switches'],
             track['fragmentations'],
             count['entry'],
@@ -37,16 +39,16 @@ def generate_table():
         ])
     
     # Tablo oluştur
-    fig, ax = plt.subplots(figsize=(12, 3))
+    fig, ax = plt.subplots(figsize=(14, 3))
     ax.axis('tight')
     ax.axis('off')
     
-    headers = ['Sequence', 'Precision', 'Recall', 'F1', 'ID Switches', 
+    headers = ['Sequence', 'Precision', 'Recall', 'F1', 'MOTA', 'IDF1', 'ID Switches', 
                'Fragments', 'Entry', 'Exit', 'Total']
     
     table = ax.table(cellText=data, colLabels=headers, 
                      cellLoc='center', loc='center',
-                     colWidths=[0.12] * len(headers))
+                     colWidths=[0.1] * len(headers))
     
     table.auto_set_font_size(False)
     table.set_fontsize(10)
@@ -0,0 +1,194 @@
+"""
+ONNX modelini INT8'e çevir (ONNX Runtime static quantization)
+
+MOT17 sequence'larından eşit aralıklı frameler kalibrasyon için kullanılır.
+Aradaki (kalibrasyonda kullanılmayan) framelerde FP32 ve INT8 modelin
+detection precision / recall'u ve latency'si ölçülür, rapor modelin yanına
+<model>.json olarak yazılır. PersonDetector bu rapora göre doğruluk sınırı
+altındaki modeli reddeder.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+import yaml
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.core.backends import (check_quantized, create_backend, file_hash, preprocess,
+                               quantized_report_path)
+from src.utils.mot_io import MOTData, load_mot
+from src.utils.sequences import collect_sequences
+from evaluate import eval_detection
+
+
+def sample_frames(seq_dir, num_calib, num_eval):
+    """Kalibrasyon ve evaluation için ayrık, eşit aralıklı frame'ler
+    
+    Returns:
+        calib, eval: [(frame_id, path), ...] (frame_id 1'den başlar)
+    """
+    img_dir = os.path.join(seq_dir, 'img1')
+    files = sorted(f for f in os.listdir(img_dir) if f.endswith('.jpg'))
+    frames = [(i + 1, os.path.join(img_dir, f)) for i, f in enumerate(files)]
+    calib_idx = np.linspace(0, len(frames) - 1, min(num_calib, len(frames))).astype(int)
+    rest = np.setdiff1d(np.arange(len(frames)), calib_idx)
+    eval_idx = rest[np.linspace(0, len(rest) - 1, min(num_eval, len(rest))).astype(int)] if len(rest) else rest
+    return [frames[i] for i in calib_idx], [frames[i] for i in eval_idx]
+
+
+def head_nodes(model_path):
+    """Detection head'in kutu decode kısmı (Conv dışı node'lar) FP32 kalır
+    
+    Koordinatlar 0-640 aralığında, skorlar 0-1; aynı tensörde INT8'e
+    çevrilince kutular bozulur.
+    """
+    import onnx
+    
+    graph = onnx.load(model_path).graph
+    outputs = {o.name for o in graph.output}
+    last = [n.name for n in graph.node if outputs & set(n.output)]
+    if not last or not last[0].startswith('/') or last[0].count('/') < 2:
+        return []
+    prefix = '/'.join(last[0].split('/')[:2]) + '/'
+    return [n.name for n in graph.node if n.name.startswith(prefix) and n.op_type != 'Conv']
+
+
+def quantize(fp32_path, int8_path, calib_paths, imgsz, per_channel=True):
+    """Static QDQ quantization (aktivasyon uint8, ağırlık int8)"""
+    from onnxruntime.quantization import (CalibrationDataReader, QuantFormat, QuantType,
+                                          quantize_static)
+    
+    import onnxruntime as ort
+    input_name = ort.InferenceSession(fp32_path, providers=['CPUExecutionProvider']).get_inputs()[0].name
+    
+    class FrameReader(CalibrationDataReader):
+        def __init__(self):
+            self.paths = iter(calib_paths)
+        
+        def get_next(self):
+            path = next(self.paths, None)
+            if path is None:
+                return None
+            batch, _ = preprocess([cv2.imread(path)], imgsz)
+            return {input_name: batch}
+    
+    quantize_static(
+        fp32_path, int8_path, FrameReader(),
+        quant_format=QuantFormat.QDQ,
+        activation_type=QuantType.QUInt8,
+        weight_type=QuantType.QInt8,
+        per_channel=per_channel,
+        nodes_to_exclude=head_nodes(fp32_path)
+    )
+
+
+def evaluate_model(backend, sequences, warmup=3):
+    """Evaluation framelerinde detection metrikleri ve batch=1 latency"""
+    latencies = []
+    tp = fp = fn = 0
+    for gt_path, frames in sequences:
+        for _, path in frames[:warmup]:
+            backend([cv2.imread(path)])
+        
+        frame_ids, boxes = [], []
+        for frame_id, path in frames:
+            image = cv2.imread(path)
+            start = time.perf_counter()
+            dets = backend([image])[0]
+            latencies.append(time.perf_counter() - start)
+            frame_ids.append(np.full(len(dets), frame_id))
+            boxes.append(dets)
+        boxes = np.concatenate(boxes)
+        pred = MOTData(np.concatenate(frame_ids), np.full(len(boxes), -1), boxes[:, :4], boxes[:, 4])
+        
+        gt = load_mot(gt_path, is_gt=True)
+        ids = [fid for fid, _ in frames]
+        gt_ids, gt_boxes, gt_confs = zip(*[gt.frame(fid) for fid in ids])
+        gt = MOTData(np.repeat(ids, [len(b) for b in gt_ids]), np.concatenate(gt_ids),
+                     np.concatenate(gt_boxes), np.concatenate(gt_confs))
+        
+        metrics = eval_detection(gt, pred)
+        tp += metrics['tp']
+        fp += metrics['fp']
+        fn += metrics['fn']
+    
+    latencies = np.array(latencies) * 1000
+    return {
+        'precision': tp / (tp + fp) if tp + fp > 0 else 0.0,
+        'recall': tp / (tp + fn) if tp + fn > 0 else 0.0,
+        'tp': tp, 'fp': fp, 'fn': fn,
+        'latency_p50_ms': float(np.percentile(latencies, 50)),
+        'latency_mean_ms': float(latencies.mean()),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='INT8 quantization + doğruluk raporu')
+    parser.add_argument('--config', default='configs/model.yaml')
+    parser.add_argument('--sequences', nargs='+', default=None)
+    parser.add_argument('--calib-frames', type=int, default=100,
+                        help='Sequence başına kalibrasyon frame sayısı')
+    parser.add_argument('--eval-frames', type=int, default=100,
+                        help='Sequence başına evaluation frame sayısı')
+    parser.add_argument('--no-per-channel', action='store_true')
+    parser.add_argument('--num-threads', type=int, default=None,
+                        help='Latency ölçümü için thread sayısı (varsayılan: model.yaml)')
+    args = parser.parse_args()
+    
+    with open(args.config) as f:
+        config = yaml.safe_load(f)['detection']
+    fp32_path = config['onnx_model']
+    int8_path = config['quantized']['model']
+    imgsz = config.get('imgsz', 640)
+    if not os.path.exists(fp32_path):
+        raise FileNotFoundError(f"FP32 ONNX model yok: {fp32_path} (scripts/export_model.py --format onnx)")
+    
+    calib_paths, eval_sequences = [], []
+    for name, seq_dir in collect_sequences(names=args.sequences):
+        calib, evals = sample_frames(seq_dir, args.calib_frames, args.eval_frames)
+        calib_paths += [path for _, path in calib]
+        eval_sequences.append((os.path.join(seq_dir, 'gt', 'gt.txt'), evals))
+    
+    print(f"Kalibrasyon: {len(calib_paths)} frame")
+    quantize(fp32_path, int8_path, calib_paths, imgsz, per_channel=not args.no_per_channel)
+    
+    threads = config.get('num_threads', 0) if args.num_threads is None else args.num_threads
+    results = {}
+    for label, path in (('fp32', fp32_path), ('int8', int8_path)):
+        backend = create_backend({**config, 'backend': 'onnx', 'onnx_model': path,
+                                  'num_threads': threads, 'quantized': {'enabled': False}})
+        results[label] = evaluate_model(backend, eval_sequences)
+    
+    report = {
+        'sha1': file_hash(int8_path),
+        'source_model': fp32_path,
+        'calibration_frames': len(calib_paths),
+        'eval_frames': sum(len(frames) for _, frames in eval_sequences),
+        'per_channel': not args.no_per_channel,
+        **results,
+        'speedup': results['fp32']['latency_mean_ms'] / max(results['int8']['latency_mean_ms'], 1e-9),
+    }
+    report_path = quantized_report_path(int8_path)
+    with open(report_path, 'w') as f:
+        json.dump(report, f, indent=2)
+    
+    print(f"{'model':>8} {'precision':>10} {'recall':>8} {'p50_ms':>8} {'mean_ms':>8}")
+    for label, r in results.items():
+        print(f"{label:>8} {r['precision']:>10.3f} {r['recall']:>8.3f} "
+              f"{r['latency_p50_ms']:>8.1f} {r['latency_mean_ms']:>8.1f}")
+    print(f"Speedup: {report['speedup']:.2f}x")
+    print(f"Saved: {int8_path}, {report_path}")
+    
+    try:
+        check_quantized({**config, 'quantized': {**config['quantized'], 'enabled': True}})
+        print("Doğruluk sınırı: OK")
+    except ValueError as e:
+        print(e)
+
+
+if __name__ == '__main__':
+    main()
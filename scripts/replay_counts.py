@@ -0,0 +1,161 @@
+"""
+Kaydedilmiş trajectory'ler üzerinden offline sayım
+
+outputs/<SEQUENCE>/tracking.txt tekrar oynatılmadan tek vektörize geçişte
+sayılır. --verify ile mevcut events.csv ve results.json sayımları ile
+karşılaştırılır, --scan ile frame boyunca aday çizgiler taranır.
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+
+import numpy as np
+import yaml
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.core.counter import is_multi_config
+from src.core.replay import TrajectoryReplay, config_lines
+
+
+def load_events(path, with_line=False):
+    """events.csv -> counter.get_events() formatı"""
+    with open(path, newline='') as f:
+        events = []
+        for row in csv.DictReader(f):
+            event = {
+                'frame': int(row['frame']),
+                'track_id': int(row['track_id']),
+                'event_type': row['event_type'],
+                'direction': row['direction']
+            }
+            if with_line:
+                event['line'] = row['line']
+            events.append(event)
+    return events
+
+
+def candidate_lines(orientation, size, step, base=None):
+    """Frame boyunca step pikselde bir dikey / yatay aday çizgi
+    
+    Yön bilgisi (entry / exit) aynı yönelimdeki base çizgiden alınır, yoksa
+    dikeyde right / left, yatayda down / up.
+    """
+    width, height = size
+    if orientation == 'vertical':
+        direction = {'entry': 'right', 'exit': 'left'}
+        lines = [[x, 0, x, height] for x in range(step, width, step)]
+    else:
+        direction = {'entry': 'down', 'exit': 'up'}
+        lines = [[0, y, width, y] for y in range(step, height, step)]
+    if base is not None and base['direction']['entry'] in (direction['entry'], direction['exit']):
+        direction = base['direction']
+    return [{'key': f'{orientation}_{c[0] or c[1]}', 'coordinates': c, 'direction': dict(direction)}
+            for c in lines]
+
+
+def verify(name, replay, lines, mode, output_dir):
+    """Replay sonucu kaydedilmiş events.csv / results.json ile aynı mı"""
+    with open(os.path.join(output_dir, 'results.json')) as f:
+        results = json.load(f)
+    with_line = mode == 'side'
+    counts = replay.total(lines, mode)
+    events = replay.events(lines, mode, with_line=with_line)
+    expected = load_events(os.path.join(output_dir, 'events.csv'), with_line=with_line)
+    
+    counts_ok = counts == results['counts']
+    events_ok = events == expected
+    status = 'OK' if counts_ok and events_ok else 'DIFF'
+    print(f"{name}: {status}  counts {counts} (kayıtlı {results['counts']}), "
+          f"events {len(events)} (kayıtlı {len(expected)})")
+    return counts_ok and events_ok
+
+
+def scan(name, replay, lines, mode, top):
+    """Aday çizgileri say, en çok geçiş olanları yazdır"""
+    start = time.perf_counter()
+    counts = replay.count(lines, mode)
+    elapsed = time.perf_counter() - start
+    
+    print(f"{name}: {len(lines)} çizgi, {replay.num_moves} hareket, {elapsed * 1000:.1f} ms "
+          f"({len(lines) / max(elapsed, 1e-9):.0f} çizgi/s)")
+    order = np.argsort([-c['total_crossings'] for c in counts], kind='stable')
+    for i in order[:top]:
+        c = counts[i]
+        print(f"  {lines[i]['key']:>16} {str(lines[i]['coordinates']):>24} "
+              f"entry={c['entry']:<4} exit={c['exit']:<4} unique={c['unique_tracks']}")
+    return {
+        'lines_per_s': len(lines) / max(elapsed, 1e-9),
+        'lines': [{'key': line['key'], 'coordinates': line['coordinates'], **c}
+                  for line, c in zip(lines, counts)]
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Offline sayım (tracking.txt replay)')
+    parser.add_argument('--sequences', nargs='+', default=None)
+    parser.add_argument('--outputs', default='outputs', help='run.py çıktı klasörü')
+    parser.add_argument('--lines-config', default='configs/counting_lines.yaml')
+    parser.add_argument('--sequences-config', default='configs/sequences.yaml')
+    parser.add_argument('--verify', action='store_true',
+                        help='events.csv ve results.json ile karşılaştır (fark varsa çıkış kodu 1)')
+    parser.add_argument('--scan', choices=['vertical', 'horizontal'], nargs='+', default=None,
+                        help='Frame boyunca aday çizgileri tara')
+    parser.add_argument('--step', type=int, default=10, help='Aday çizgiler arası piksel')
+    parser.add_argument('--mode', choices=['axis', 'side'], default=None,
+                        help='Yön kuralı (varsayılan: pipeline gibi, çoklu çizgide side)')
+    parser.add_argument('--top', type=int, default=10)
+    parser.add_argument('--output', default=None, help='Tarama sonuçlarını JSON olarak kaydet')
+    args = parser.parse_args()
+    
+    with open(args.lines_config, encoding='utf-8') as f:
+        lines_config = yaml.safe_load(f)
+    with open(args.sequences_config, encoding='utf-8') as f:
+        sequences = yaml.safe_load(f)['sequences']
+    names = args.sequences or [
+        name for name in lines_config
+        if os.path.exists(os.path.join(args.outputs, name, 'tracking.txt'))
+    ]
+    
+    report = {}
+    ok = True
+    for name in names:
+        output_dir = os.path.join(args.outputs, name)
+        total_frames = None
+        results_path = os.path.join(output_dir, 'results.json')
+        if os.path.exists(results_path):
+            with open(results_path) as f:
+                total_frames = json.load(f).get('total_frames')
+        
+        start = time.perf_counter()
+        replay = TrajectoryReplay.from_file(os.path.join(output_dir, 'tracking.txt'), total_frames)
+        print(f"{name}: {len(replay.track_ids)} satır, {len(np.unique(replay.track_ids))} track, "
+              f"yükleme {(time.perf_counter() - start) * 1000:.1f} ms")
+        
+        # pipeline ile aynı counter seçimi
+        seq_config = lines_config[name]
+        multi = is_multi_config(seq_config)
+        mode = args.mode or ('side' if multi else 'axis')
+        lines = config_lines(seq_config, None if multi else ['line_1'])
+        
+        if args.verify:
+            ok &= verify(name, replay, lines, mode, output_dir)
+        if args.scan:
+            height, width = sequences[name]['resolution']
+            candidates = []
+            for orientation in args.scan:
+                candidates += candidate_lines(orientation, (width, height), args.step, lines[0] if lines else None)
+            report[name] = scan(name, replay, candidates, mode, args.top)
+    
+    if args.output and report:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\nSaved: {args.output}")
+    if not ok:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+"""
+Paylaşımlı inference server
+
+Modeli bir kez yükler, kamera pipeline'larından (run.py --server,
+run_all.py --server) gelen frameleri dinamik batch'lerde işler. Ayarlar
+model.yaml 'server' bölümünden, komut satırı ile değiştirilebilir.
+"""
+import argparse
+import os
+import signal
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.serving import InferenceServer
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Dinamik batch\'li detection server')
+    parser.add_argument('--socket', default=None, help='Unix socket yolu (varsayılan: model.yaml)')
+    parser.add_argument('--max-batch', type=int, default=None,
+                        help='Tek model çağrısında en fazla frame')
+    parser.add_argument('--max-wait-ms', type=float, default=None,
+                        help='İlk frame\'den sonra batch\'in dolması için en fazla bekleme')
+    parser.add_argument('--torch-threads', type=int, default=0,
+                        help='Torch thread sayısı (0: torch varsayılanı)')
+    parser.add_argument('--stats-every', type=float, default=10.0,
+                        help='Bu kadar saniyede bir istatistik yazdır (0: kapalı)')
+    args = parser.parse_args()
+    
+    if args.torch_threads:
+        import torch
+        torch.set_num_threads(args.torch_threads)
+    
+    # SIGTERM'de de socket dosyası silinsin
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    
+    max_wait = None if args.max_wait_ms is None else args.max_wait_ms / 1000
+    server = InferenceServer(address=args.socket, max_batch=args.max_batch, max_wait=max_wait)
+    with server:
+        print(f"Server: {server.address} (max_batch {server.max_batch}, "
+              f"max_wait {server.max_wait * 1000:.1f} ms)")
+        last = server.stats()
+        try:
+            while True:
+                time.sleep(args.stats_every or 3600)
+                if not args.stats_every:
+                    continue
+                stats = server.stats()
+                frames = stats['frames'] - last['frames']
+                batches = stats['batches'] - last['batches']
+                infer = stats['infer_s'] - last['infer_s']
+                print(f"{frames / args.stats_every:.1f} fps, {batches} batch "
+                      f"(ortalama {frames / batches if batches else 0:.2f} frame), "
+                      f"model meşgul {infer / args.stats_every:.0%}")
+                last = stats
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == '__main__':
+    main()
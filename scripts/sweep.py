@@ -0,0 +1,259 @@
+"""
+Tracker parametre taraması (cached / MOT detectionları ile, video decode yok)
+
+Her sequence'ın detectionları bir kez yüklenir, parametre grid'indeki her
+kombinasyon ByteTracker + LineCounter üzerinden tekrar oynatılır ve sonuç
+bellekte evaluation metrikleriyle puanlanır.
+"""
+import argparse
+import itertools
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import yaml
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.core.tracker import ByteTracker
+from src.core.counter import LineCounter, MultiLineCounter, is_multi_config
+from src.core.detection_cache import DetectionCache, sequence_cache_key
+from src.utils.mot_io import MOTData, load_mot
+from src.utils.video_io import VideoReader
+from evaluate import eval_detection, eval_tracking
+
+
+PARAMS = ['track_thresh', 'track_buffer', 'match_thresh', 'low_thresh']
+
+# Worker process başına sequence verisi (initializer ile bir kez)
+_sequences = None
+
+
+def load_mot_detections(path, num_frames=None):
+    """MOT det.txt -> frame başına (K, 5) [x1, y1, x2, y2, conf]"""
+    data = load_mot(path)
+    if num_frames is None:
+        num_frames = data.num_frames
+    
+    boxes = np.empty((len(data), 5), dtype=np.float32)
+    boxes[:, :4] = data.boxes
+    boxes[:, 4] = data.confs
+    bounds = np.asarray(data.offsets)
+    bounds = np.append(bounds, np.full(max(0, num_frames + 2 - len(bounds)), len(data)))
+    return [boxes[bounds[i]:bounds[i + 1]] for i in range(1, num_frames + 1)]
+
+
+def load_cached_detections(sequence_name, cache_dir, seq_dir, model_config='configs/model.yaml',
+                           reduced_decode=None):
+    """run.py --det-cache ile yazılmış detection cache'i
+    
+    Key run_sequence ile aynı kurulur; reduced_decode açıksa (None:
+    model.yaml'daki ayar) decode ölçeği sequence'ın frame boyutundan seçilir.
+    Cache stride ile yazıldıysa detect edilmemiş frameler None.
+    """
+    with open(model_config) as f:
+        config = yaml.safe_load(f)['detection']
+    if reduced_decode is None:
+        reduced_decode = config.get('reduced_decode', False)
+    decode_scale = 1
+    if reduced_decode:
+        reader = VideoReader(os.path.join(seq_dir, 'img1'), decode_size=config.get('imgsz', 640))
+        decode_scale = reader.decode_scale
+        reader.release()
+    cache = DetectionCache(cache_dir, sequence_name, sequence_cache_key(config, decode_scale))
+    if not cache.exists():
+        raise FileNotFoundError(f"Detection cache yok: {cache.path} (önce run.py --det-cache)")
+    cache.load()
+    return [np.array(cache.get(i)) if cache.present[i] else None for i in range(cache.num_frames)]
+
+
+def load_sequence(sequence_name, seq_dir, source, cache_dir, reduced_decode=None):
+    """Sequence detectionları + GT + sayım ayarı (run_sequence gibi çoklu çizgi / zone)"""
+    gt_path = os.path.join(seq_dir, 'gt', 'gt.txt')
+    gt_data = load_mot(gt_path, is_gt=True) if os.path.exists(gt_path) else None
+    
+    if source == 'cache':
+        detections = load_cached_detections(sequence_name, cache_dir, seq_dir, reduced_decode=reduced_decode)
+    else:
+        num_frames = gt_data.num_frames if gt_data else None
+        detections = load_mot_detections(os.path.join(seq_dir, 'det', 'det.txt'), num_frames)
+    
+    with open('configs/counting_lines.yaml', 'r', encoding='utf-8') as f:
+        lines_config = yaml.safe_load(f) or {}
+    multi_line = sequence_name in lines_config and is_multi_config(lines_config[sequence_name])
+    
+    return {'name': sequence_name, 'detections': detections, 'gt': gt_data, 'multi_line': multi_line}
+
+
+def replay(sequence, params):
+    """Detectionları tracker + counter'dan geçir, sonuçları bellekte tut"""
+    tracker = ByteTracker(overrides=params)
+    try:
+        # run_sequence ile aynı: birden fazla çizgi veya zone varsa MultiLineCounter
+        counter_cls = MultiLineCounter if sequence['multi_line'] else LineCounter
+        counter = counter_cls(sequence['name'])
+    except ValueError:
+        counter = None  # counting_lines.yaml'da yok
+    
+    frames, tracks_all = [], []
+    for frame_idx, detections in enumerate(sequence['detections']):
+        if detections is None:
+            # stride'lı cache: detection yapılmamış frame
+            tracks = tracker.predict_only()
+        else:
+            tracks = tracker.update(detections)
+        frame_id = frame_idx + 1
+        if tracks:
+            frames.append(np.full(len(tracks), frame_id))
+            tracks_all.append(np.asarray(tracks, dtype=np.float64))
+        if counter is not None:
+            counter.update(tracks, frame_id)
+    
+    if tracks_all:
+        frames = np.concatenate(frames)
+        tracks_all = np.concatenate(tracks_all)
+    else:
+        frames, tracks_all = np.zeros(0), np.zeros((0, 6))
+    track_data = MOTData(frames, tracks_all[:, 4], tracks_all[:, :4], tracks_all[:, 5])
+    
+    counts = counter.get_counts() if counter is not None else None
+    if sequence['multi_line'] and counter is not None:
+        counts['lines'] = {key: {'entry': line['entry'], 'exit': line['exit']}
+                           for key, line in counter.get_line_counts().items()}
+    return track_data, counts
+
+
+def _init_worker(sequences):
+    global _sequences
+    _sequences = sequences
+
+
+def _score(params):
+    """Bir parametre kombinasyonu için tüm sequence'ları puanla"""
+    start = time.perf_counter()
+    per_sequence = {}
+    totals = {'tp': 0, 'fp': 0, 'fn': 0, 'id_switches': 0, 'fragmentations': 0}
+    clear = {'num_gt': 0, 'num_pred': 0, 'matches': 0, 'iou_sum': 0.0, 'idtp': 0, 'fp': 0, 'fn': 0}
+    
+    for sequence in _sequences:
+        track_data, counts = replay(sequence, params)
+        entry = {'counts': counts}
+        if sequence['gt'] is not None:
+            det_metrics = eval_detection(sequence['gt'], track_data)
+            track_metrics = eval_tracking(sequence['gt'], track_data)
+            entry.update(det_metrics)
+            # fp/fn detection metriklerinden, CLEAR-MOT fp/fn sadece MOTA için
+            entry.update({k: v for k, v in track_metrics.items() if k not in ('fp', 'fn')})
+            for key in totals:
+                totals[key] += entry[key]
+            for key in clear:
+                clear[key] += track_metrics[key]
+        per_sequence[sequence['name']] = entry
+    
+    tp, fp, fn = totals['tp'], totals['fp'], totals['fn']
+    precision = tp / (tp + fp) if (tp + fp) > 0 else 0
+    recall = tp / (tp + fn) if (tp + fn) > 0 else 0
+    totals['precision'] = precision
+    totals['recall'] = recall
+    totals['f1'] = 2 * precision * recall / (precision + recall) if (precision + recall) > 0 else 0
+    
+    # MOTA / MOTP / IDF1 toplamlardan (sequence ortalaması değil)
+    num_gt, num_pred, idtp = clear['num_gt'], clear['num_pred'], clear['idtp']
+    errors = clear['fn'] + clear['fp'] + totals['id_switches']
+    totals['mota'] = 1 - errors / num_gt if num_gt > 0 else 0
+    totals['motp'] = clear['iou_sum'] / clear['matches'] if clear['matches'] > 0 else 0
+    totals['idf1'] = 2 * idtp / (num_gt + num_pred) if (num_gt + num_pred) > 0 else 0
+    
+    return {
+        'params': params,
+        'totals': totals,
+        'sequences': per_sequence,
+        'elapsed_s': time.perf_counter() - start
+    }
+
+
+def build_grid(args):
+    """CLI listelerinden parametre kombinasyonları"""
+    values = [getattr(args, name) for name in PARAMS]
+    return [dict(zip(PARAMS, combo)) for combo in itertools.product(*values)]
+
+
+def rank(results, sort_by):
+    """Kombinasyonları sırala (ID switch / fragmentation küçük, diğerleri büyük iyi)"""
+    ascending = sort_by in ('id_switches', 'fragmentations')
+    return sorted(results, key=lambda r: r['totals'][sort_by], reverse=not ascending)
+
+
+def _format_counts(counts):
+    """entry:exit, çoklu çizgide çizgi başına (line_1=3:2,line_2=0:1)"""
+    if not counts:
+        return '-'
+    if counts.get('lines'):
+        return ','.join(f"{key}={line['entry']}:{line['exit']}" for key, line in counts['lines'].items())
+    return f"{counts['entry']}:{counts['exit']}"
+
+
+def print_table(ranked, top):
+    header = [*PARAMS, 'mota', 'idf1', 'precision', 'recall', 'f1', 'id_sw', 'frag', 'counts']
+    print(' '.join(f"{h:>12}" for h in header))
+    for r in ranked[:top]:
+        t = r['totals']
+        counts = '/'.join(_format_counts(s['counts']) for s in r['sequences'].values())
+        row = [*(r['params'][p] for p in PARAMS),
+               f"{t['mota']:.3f}", f"{t['idf1']:.3f}",
+               f"{t['precision']:.3f}", f"{t['recall']:.3f}", f"{t['f1']:.3f}",
+               t['id_switches'], t['fragmentations'], counts]
+        print(' '.join(f"{str(v):>12}" for v in row))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='ByteTracker parametre taraması')
+    parser.add_argument('--sequences', nargs='+', default=['MOT17-09', 'MOT17-02', 'MOT17-04'])
+    parser.add_argument('--data-root', default='data/MOT17/train')
+    parser.add_argument('--source', choices=['det', 'cache'], default='det',
+                        help='det: MOT det/det.txt, cache: run.py --det-cache çıktısı')
+    parser.add_argument('--cache-dir', default='cache/detections')
+    parser.add_argument('--reduced-decode', action='store_true', default=None,
+                        help='Cache run.py --reduced-decode ile yazıldı (varsayılan: model.yaml)')
+    parser.add_argument('--track-thresh', type=float, nargs='+', default=[0.4, 0.5, 0.6])
+    parser.add_argument('--track-buffer', type=int, nargs='+', default=[30, 50, 100])
+    parser.add_argument('--match-thresh', type=float, nargs='+', default=[0.6, 0.7, 0.8])
+    parser.add_argument('--low-thresh', type=float, nargs='+', default=[0.1])
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--sort-by', default='mota',
+                        choices=['mota', 'idf1', 'motp', 'f1', 'precision', 'recall',
+                                 'id_switches', 'fragmentations'])
+    parser.add_argument('--top', type=int, default=20)
+    parser.add_argument('--output', default=None, help='Sıralı tabloyu JSON olarak kaydet')
+    args = parser.parse_args()
+    
+    start = time.perf_counter()
+    sequences = [
+        load_sequence(name, os.path.join(args.data_root, f'{name}-SDP'), args.source, args.cache_dir,
+                      args.reduced_decode)
+        for name in args.sequences
+    ]
+    print(f"{len(sequences)} sequence yüklendi ({time.perf_counter() - start:.1f}s)")
+    
+    grid = build_grid(args)
+    print(f"{len(grid)} kombinasyon, {args.workers} worker")
+    
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=args.workers, initializer=_init_worker,
+                             initargs=(sequences,)) as pool:
+        results = list(pool.map(_score, grid))
+    print(f"Sweep: {time.perf_counter() - start:.1f}s\n")
+    
+    ranked = rank(results, args.sort_by)
+    print_table(ranked, args.top)
+    
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(ranked, f, indent=2)
+        print(f"\nSaved: {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,273 @@
+"""
+Detector inference backend'leri
+
+Hepsi aynı arayüzü sağlar: backend(images) -> her görüntü için (K, 5)
+float32 [x1, y1, x2, y2, conf], orijinal görüntü koordinatlarında.
+ONNX / OpenVINO için letterbox, normalize ve NMS NumPy ile yapılır.
+"""
+import hashlib
+import json
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+from src.utils.geometry import nms
+
+
+BACKENDS = ('ultralytics', 'onnx', 'openvino')
+
+
+def model_file(config):
+    """Seçili backend'in model dosyası"""
+    backend = config.get('backend', 'ultralytics')
+    quantized = config.get('quantized', {})
+    if backend in ('onnx', 'openvino') and quantized.get('enabled', False):
+        # INT8 QDQ ONNX, OpenVINO da doğrudan okuyabilir
+        return quantized['model']
+    if backend == 'onnx':
+        return config.get('onnx_model', Path(config['model_name']).with_suffix('.onnx'))
+    if backend == 'openvino':
+        return config['openvino_model']
+    return config['model_name']
+
+
+def create_backend(config):
+    """model.yaml 'detection' bölümüne göre backend oluştur"""
+    backend = config.get('backend', 'ultralytics')
+    if backend == 'ultralytics':
+        return UltralyticsBackend(config)
+    if backend == 'onnx':
+        return OnnxBackend(config)
+    if backend == 'openvino':
+        return OpenVINOBackend(config)
+    raise ValueError(f"Bilinmeyen backend: {backend} ({', '.join(BACKENDS)})")
+
+
+def file_hash(path):
+    """Model dosyasının sha1'i"""
+    h = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def quantized_report_path(model_path):
+    """Kalibrasyon raporu modelin yanında: <model>.json"""
+    model_path = Path(model_path)
+    return model_path.with_name(model_path.name + '.json')
+
+
+def check_quantized(config):
+    """INT8 modeli kalibrasyon raporuna göre doğrula
+    
+    Rapor scripts/quantize_model.py ile yazılır. Rapor yoksa, başka bir
+    modele aitse veya precision/recall FP32 modele göre max_precision_drop /
+    max_recall_drop'tan fazla düşmüşse ValueError.
+    
+    Returns:
+        rapor (dict)
+    """
+    quantized = config['quantized']
+    path = Path(quantized['model'])
+    report_path = quantized_report_path(path)
+    if not path.exists():
+        raise FileNotFoundError(f"INT8 model yok: {path} (scripts/quantize_model.py ile oluştur)")
+    if not report_path.exists():
+        raise ValueError(f"INT8 model doğrulanmamış, rapor yok: {report_path}")
+    
+    with open(report_path) as f:
+        report = json.load(f)
+    if report.get('sha1') != file_hash(path):
+        raise ValueError(f"Rapor {path} dosyasına ait değil, scripts/quantize_model.py ile yeniden oluştur")
+    
+    for metric in ('precision', 'recall'):
+        drop = report['fp32'][metric] - report['int8'][metric]
+        limit = quantized.get(f'max_{metric}_drop', 0.02)
+        if drop > limit:
+            raise ValueError(
+                f"INT8 model reddedildi: {metric} {report['fp32'][metric]:.3f} -> "
+                f"{report['int8'][metric]:.3f} (düşüş {drop:.3f} > {limit})"
+            )
+    return report
+
+
+def letterbox(image, size=640, color=114):
+    """Oranı koruyarak size x size'a sığdır, kalan kısmı doldur
+    
+    Returns:
+        padded (size, size, 3), scale, (pad_x, pad_y)
+    """
+    h, w = image.shape[:2]
+    scale = min(size / h, size / w)
+    new_w, new_h = int(round(w * scale)), int(round(h * scale))
+    pad_x, pad_y = (size - new_w) // 2, (size - new_h) // 2
+    
+    padded = np.full((size, size, 3), color, dtype=np.uint8)
+    if (new_w, new_h) != (w, h):
+        image = cv2.resize(image, (new_w, new_h), interpolation=cv2.INTER_LINEAR)
+    padded[pad_y:pad_y + new_h, pad_x:pad_x + new_w] = image
+    return padded, scale, (pad_x, pad_y)
+
+
+def preprocess(images, size=640):
+    """BGR görüntüler -> (N, 3, size, size) float32 RGB [0, 1]
+    
+    Returns:
+        batch, [(scale, (pad_x, pad_y), (h, w)), ...]
+    """
+    batch = np.empty((len(images), 3, size, size), dtype=np.float32)
+    meta = []
+    for i, image in enumerate(images):
+        padded, scale, pad = letterbox(image, size)
+        # HWC BGR -> CHW RGB
+        batch[i] = padded[:, :, ::-1].transpose(2, 0, 1)
+        meta.append((scale, pad, image.shape[:2]))
+    batch *= 1 / 255.0
+    return batch, meta
+
+
+def postprocess(output, meta, conf_thresh=0.25, iou_thresh=0.45, classes=(0,)):
+    """YOLOv8 ham çıktısı -> görüntü başına (K, 5) [x1, y1, x2, y2, conf]
+    
+    Args:
+        output: (N, 4 + num_classes, num_anchors) [cx, cy, w, h, class skorları...]
+        meta: preprocess'ten gelen (scale, pad, shape) listesi
+    """
+    results = []
+    for pred, (scale, (pad_x, pad_y), (h, w)) in zip(output, meta):
+        scores = pred[4:][list(classes)]  # (C, A)
+        conf = scores.max(axis=0)
+        keep = conf >= conf_thresh
+        if not keep.any():
+            results.append(np.zeros((0, 5), dtype=np.float32))
+            continue
+        
+        cx, cy, bw, bh = pred[:4, keep]
+        boxes = np.stack([cx - bw / 2, cy - bh / 2, cx + bw / 2, cy + bh / 2], axis=1)
+        # letterbox -> orijinal koordinatlar
+        boxes -= [pad_x, pad_y, pad_x, pad_y]
+        boxes /= scale
+        boxes[:, [0, 2]] = boxes[:, [0, 2]].clip(0, w)
+        boxes[:, [1, 3]] = boxes[:, [1, 3]].clip(0, h)
+        
+        conf = conf[keep]
+        idx = nms(boxes, conf, iou_thresh)
+        results.append(np.hstack([boxes[idx], conf[idx, None]]).astype(np.float32))
+    return results
+
+
+class UltralyticsBackend:
+    """ultralytics.YOLO (PyTorch)"""
+    
+    def __init__(self, config):
+        from ultralytics import YOLO
+        self.config = config
+        self.model = YOLO(config['model_name'])
+    
+    def __call__(self, images):
+        results = self.model(
+            list(images),
+            conf=self.config['confidence_threshold'],
+            iou=self.config['iou_threshold'],
+            device=self.config['device'],
+            classes=self.config.get('classes', [0]),
+            verbose=False
+        )
+        
+        batch_boxes = []
+        for result in results:
+            if result.boxes is None:
+                batch_boxes.append(np.zeros((0, 5), dtype=np.float32))
+                continue
+            # data: [x1, y1, x2, y2, conf, cls]
+            boxes = result.boxes.data[:, :5].cpu().numpy()
+            batch_boxes.append(np.ascontiguousarray(boxes, dtype=np.float32))
+        return batch_boxes
+
+
+class _GraphBackend:
+    """Export edilmiş graph backend'leri için ortak pre/post-processing"""
+    
+    def __init__(self, config):
+        self.config = config
+        self.imgsz = config.get('imgsz', 640)
+        self.num_threads = config.get('num_threads', 0)
+        self.dynamic_batch = False
+    
+    def __call__(self, images):
+        if len(images) == 0:
+            return []
+        batch, meta = preprocess(images, self.imgsz)
+        if self.dynamic_batch:
+            output = self._run(batch)
+        else:
+            # sabit batch=1 ile export edilmiş model
+            output = np.concatenate([self._run(batch[i:i + 1]) for i in range(len(batch))])
+        return postprocess(
+            output, meta,
+            conf_thresh=self.config['confidence_threshold'],
+            iou_thresh=self.config['iou_threshold'],
+            classes=self.config.get('classes', [0])
+        )
+    
+    def _run(self, batch):
+        raise NotImplementedError
+
+
+class OnnxBackend(_GraphBackend):
+    """ONNX Runtime (CPUExecutionProvider)"""
+    
+    def __init__(self, config):
+        super().__init__(config)
+        try:
+            import onnxruntime as ort
+        except ImportError as e:
+            raise ImportError("onnx backend için: pip install onnxruntime") from e
+        
+        options = ort.SessionOptions()
+        if self.num_threads:
+            options.intra_op_num_threads = self.num_threads
+        path = str(model_file(config))
+        if not Path(path).exists():
+            raise FileNotFoundError(f"ONNX model yok: {path} (scripts/export_model.py ile oluştur)")
+        self.session = ort.InferenceSession(path, options, providers=['CPUExecutionProvider'])
+        
+        model_input = self.session.get_inputs()[0]
+        self.input_name = model_input.name
+        self.dynamic_batch = not isinstance(model_input.shape[0], int)
+        if isinstance(model_input.shape[2], int):
+            self.imgsz = model_input.shape[2]
+    
+    def _run(self, batch):
+        return self.session.run(None, {self.input_name: batch})[0]
+
+
+class OpenVINOBackend(_GraphBackend):
+    """OpenVINO IR (CPU)"""
+    
+    def __init__(self, config):
+        super().__init__(config)
+        try:
+            import openvino as ov
+        except ImportError as e:
+            raise ImportError("openvino backend için: pip install openvino") from e
+        
+        core = ov.Core()
+        if self.num_threads:
+            core.set_property('CPU', {'INFERENCE_NUM_THREADS': self.num_threads})
+        path = str(model_file(config))
+        if not Path(path).exists():
+            raise FileNotFoundError(f"OpenVINO model yok: {path} (scripts/export_model.py ile oluştur)")
+        model = core.read_model(path)
+        
+        shape = model.input(0).get_partial_shape()
+        self.dynamic_batch = shape[0].is_dynamic
+        if shape[2].is_static:
+            self.imgsz = shape[2].get_length()
+        self.compiled = core.compile_model(model, 'CPU')
+        self.output = self.compiled.output(0)
+    
+    def _run(self, batch):
+        return self.compiled(batch)[self.output]
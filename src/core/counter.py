@@ -1,7 +1,31 @@
+import numpy as np
 import yaml
 from pathlib import Path
 
-from src.utils.geometry import line_intersection, get_bbox_bottom_center
+from src.utils.geometry import (line_intersection, get_bbox_bottom_center, segment_crossings,
+                                points_in_polygons)
+
+
+def is_multi_config(sequence_config):
+    """Sequence birden fazla çizgi veya zone tanımlıyorsa True"""
+    lines = [k for k, v in sequence_config.items() if k.startswith('line_') and v.get('enabled', True)]
+    zones = [k for k, v in sequence_config.items() if k.startswith('zone_') and v.get('enabled', True)]
+    return len(lines) > 1 or len(zones) > 0
+
+
+def direction_names(line_start, line_end):
+    """Çizginin (pozitif, negatif) tarafına geçiş yönlerinin adı
+    
+    Pozitif tarafın normali (-dy, dx); baskın eksenine göre right/left/down/up.
+    Dikey çizgide soldan sağa "right", yatay çizgide yukarıdan aşağı "down"
+    olur, çapraz çizgilerde de hareketin değil çizginin yönüne bakılır.
+    """
+    dx = line_end[0] - line_start[0]
+    dy = line_end[1] - line_start[1]
+    nx, ny = -dy, dx
+    if abs(nx) >= abs(ny):
+        return ('right', 'left') if nx > 0 else ('left', 'right')
+    return ('down', 'up') if ny > 0 else ('up', 'down')
 
 
 class LineCounter:
@@ -35,7 +59,7 @@ class LineCounter:
         self.exit_count = 0
         self.crossed_tracks = {}  # track_id: son geçiş yönü
         self.events = []  # Tüm crossing eventleri
-        
+    
     def update(self, tracks, frame_id=None):
         """Trackleri kontrol et, çizgi geçişini say
         
@@ -131,6 +155,34 @@ class LineCounter:
         """Tüm crossing eventlerini döndür"""
         return self.events
     
+    def pop_events(self):
+        """Son çağrıdan beri oluşan eventleri döndür ve listeden çıkar
+        
+        Uzun streamlerde events listesinin büyümemesi için, eventler dışarıda
+        (örn: events.csv'ye) yazılıyorsa kullanılır.
+        """
+        events, self.events = self.events, []
+        return events
+    
+    def get_state(self):
+        """Checkpoint için durum (eventler events.csv'de, burada tutulmaz)"""
+        return {
+            'track_ids': np.array(list(self.track_positions), dtype=np.int64),
+            'positions': np.array(list(self.track_positions.values()), dtype=np.float64).reshape(-1, 2),
+            'crossed_ids': np.array(list(self.crossed_tracks), dtype=np.int64),
+            'crossed_directions': np.array(list(self.crossed_tracks.values()), dtype=str),
+            'counts': np.array([self.entry_count, self.exit_count], dtype=np.int64)
+        }
+    
+    def set_state(self, state):
+        """get_state() çıktısından devam et"""
+        self.track_positions = {
+            track_id: tuple(pos) for track_id, pos in zip(state['track_ids'].tolist(), state['positions'].tolist())
+        }
+        self.crossed_tracks = dict(zip(state['crossed_ids'].tolist(), state['crossed_directions'].tolist()))
+        self.entry_count, self.exit_count = (int(v) for v in state['counts'])
+        self.events = []
+    
     def get_line_coords(self):
         """Çizgi koordinatlarını döndür (görselleştirme için)"""
         return self.line_start, self.line_end
@@ -142,3 +194,218 @@ class LineCounter:
     def get_line_thickness(self):
         """Çizgi kalınlığını döndür"""
         return self.line_config['thickness']
+
+
+class MultiLineCounter:
+    """Birden fazla çizgi ve polygon zone üzerinden sayım
+    
+    Sequence'ın tüm enabled line_* çizgileri ve zone_* polygonları okunur.
+    Her frame'de tüm track hareketleri tüm çizgilerle tek seferde test
+    edilir (segment_crossings); geçiş yönü hareketin baskın ekseninden değil
+    çizginin hangi tarafına geçildiğinden bulunur, çapraz çizgilerde de
+    doğru çalışır. Zone'larda track başına giriş frame'i tutulur, çıkınca
+    (veya track kaybolunca) kalma süresi kaydedilir.
+    
+    LineCounter ile aynı arayüz; eventlere 'line' alanı eklenir.
+    """
+    
+    def __init__(self, sequence_name, config_path="configs/counting_lines.yaml"):
+        config_path = Path(config_path)
+        with open(config_path) as f:
+            config = yaml.safe_load(f)
+        
+        if sequence_name not in config:
+            raise ValueError(f"Sequence '{sequence_name}' configs bulunamadı")
+        self.config = config[sequence_name]
+        
+        self.lines = [
+            {'key': key, **line} for key, line in self.config.items()
+            if key.startswith('line_') and line.get('enabled', True)
+        ]
+        self.zones = [
+            {'key': key, **zone} for key, zone in self.config.items()
+            if key.startswith('zone_') and zone.get('enabled', True)
+        ]
+        if not self.lines and not self.zones:
+            raise ValueError(f"Sequence '{sequence_name}' için çizgi veya zone yok")
+        
+        coords = np.array([line['coordinates'] for line in self.lines], dtype=np.float64).reshape(-1, 4)
+        self.line_starts = coords[:, :2]
+        self.line_ends = coords[:, 2:]
+        # +1 / -1 geçişinin yön adı ve event tipi
+        self.side_names = [direction_names(a, b) for a, b in zip(self.line_starts, self.line_ends)]
+        self.side_events = [
+            tuple(
+                'entry' if name == line['direction']['entry']
+                else 'exit' if name == line['direction']['exit'] else None
+                for name in names
+            )
+            for line, names in zip(self.lines, self.side_names)
+        ]
+        self.polygons = [np.asarray(zone['polygon'], dtype=np.float64) for zone in self.zones]
+        
+        # Aktif track durumu, track_id'ye göre sıralı
+        num_lines, num_zones = len(self.lines), len(self.zones)
+        self.track_ids = np.zeros(0, dtype=np.int64)
+        self.positions = np.zeros((0, 2))
+        self.last_side = np.zeros((0, num_lines), dtype=np.int8)  # çizgi başına son geçiş yönü
+        self.zone_enter = np.zeros((0, num_zones), dtype=np.int64)  # -1: zone dışında
+        self.last_frame = np.zeros(0, dtype=np.int64)
+        self.frame_id = 0
+        
+        # Sayaçlar
+        self.line_counts = np.zeros((num_lines, 2), dtype=np.int64)  # [entry, exit]
+        self.dwell_times = [[] for _ in self.zones]  # tamamlanan ziyaretler (frame)
+        self.events = []
+    
+    def update(self, tracks, frame_id=None):
+        """Trackleri kontrol et, çizgi geçişlerini ve zone'ları güncelle
+        
+        Args:
+            tracks: [[x1, y1, x2, y2, track_id, conf], ...]
+            frame_id: Mevcut frame numarası (events ve kalma süresi için)
+        """
+        self.frame_id = frame_id if frame_id is not None else self.frame_id + 1
+        tracks = np.asarray(tracks, dtype=np.float64).reshape(-1, 6)
+        ids = tracks[:, 4].astype(np.int64)
+        # alt orta nokta
+        positions = np.stack([(tracks[:, 0] + tracks[:, 2]) / 2, tracks[:, 3]], axis=1)
+        
+        # önceki frame'deki durum
+        idx = np.searchsorted(self.track_ids, ids)
+        idx = np.minimum(idx, max(len(self.track_ids) - 1, 0))
+        seen = (self.track_ids[idx] == ids) if len(self.track_ids) else np.zeros(len(ids), dtype=bool)
+        
+        last_side = np.zeros((len(ids), len(self.lines)), dtype=np.int8)
+        zone_enter = np.full((len(ids), len(self.zones)), -1, dtype=np.int64)
+        last_side[seen] = self.last_side[idx[seen]]
+        zone_enter[seen] = self.zone_enter[idx[seen]]
+        
+        if seen.any() and self.lines:
+            self._count_crossings(ids, seen, self.positions[idx[seen]], positions[seen], last_side, frame_id)
+        if self.zones:
+            self._update_zones(positions, zone_enter)
+        
+        # Kaybolmuş trackler: zone içindeyse ziyaret son görüldüğü frame'de biter
+        gone = np.ones(len(self.track_ids), dtype=bool)
+        gone[idx[seen]] = False
+        for row in np.nonzero(gone)[0]:
+            for z in np.nonzero(self.zone_enter[row] >= 0)[0]:
+                self.dwell_times[z].append(int(self.last_frame[row] - self.zone_enter[row, z] + 1))
+        
+        order = np.argsort(ids, kind='stable')
+        self.track_ids = ids[order]
+        self.positions = positions[order]
+        self.last_side = last_side[order]
+        self.zone_enter = zone_enter[order]
+        self.last_frame = np.full(len(ids), self.frame_id, dtype=np.int64)
+    
+    def _count_crossings(self, ids, seen, prev_pos, current_pos, last_side, frame_id):
+        """Görülen trackler x çizgiler, tek seferde"""
+        crossings = segment_crossings(prev_pos, current_pos, self.line_starts, self.line_ends)
+        rows = np.nonzero(seen)[0]
+        # Aynı çizgiden aynı yönde ard arda geçiş sayılmaz
+        new = (crossings != 0) & (crossings != last_side[rows])
+        
+        for m, l in zip(*np.nonzero(new)):
+            side = crossings[m, l]
+            k = 0 if side > 0 else 1
+            direction = self.side_names[l][k]
+            event_type = self.side_events[l][k]
+            last_side[rows[m], l] = side
+            if event_type is None:
+                continue
+            
+            self.line_counts[l, 0 if event_type == 'entry' else 1] += 1
+            if frame_id is not None:
+                self.events.append({
+                    'frame': frame_id,
+                    'track_id': int(ids[rows[m]]),
+                    'event_type': event_type,
+                    'direction': direction,
+                    'line': self.lines[l]['key']
+                })
+    
+    def _update_zones(self, positions, zone_enter):
+        """Zone giriş / çıkışları ve kalma süreleri"""
+        inside = points_in_polygons(positions, self.polygons)
+        outside = zone_enter < 0
+        
+        left = ~inside & ~outside
+        for row, z in zip(*np.nonzero(left)):
+            self.dwell_times[z].append(int(self.frame_id - zone_enter[row, z]))
+        zone_enter[left] = -1
+        zone_enter[inside & outside] = self.frame_id
+    
+    def get_state(self):
+        """Checkpoint için durum (eventler events.csv'de, burada tutulmaz)"""
+        dwell = [np.asarray(times, dtype=np.int64) for times in self.dwell_times]
+        return {
+            'track_ids': self.track_ids,
+            'positions': self.positions,
+            'last_side': self.last_side,
+            'zone_enter': self.zone_enter,
+            'last_frame': self.last_frame,
+            'frame_id': np.int64(self.frame_id),
+            'line_counts': self.line_counts,
+            'dwell_times': np.concatenate(dwell) if dwell else np.zeros(0, dtype=np.int64),
+            'dwell_lengths': np.array([len(d) for d in dwell], dtype=np.int64)
+        }
+    
+    def set_state(self, state):
+        """get_state() çıktısından devam et"""
+        for name in ('track_ids', 'positions', 'last_side', 'zone_enter', 'last_frame', 'line_counts'):
+            setattr(self, name, np.array(state[name], dtype=getattr(self, name).dtype))
+        self.frame_id = int(state['frame_id'])
+        bounds = np.cumsum(state['dwell_lengths'])[:-1]
+        self.dwell_times = [times.tolist() for times in np.split(state['dwell_times'], bounds)] if self.zones else []
+        self.events = []
+    
+    def get_counts(self):
+        """Tüm çizgilerin toplam sayımları"""
+        entry, exit_ = (int(v) for v in self.line_counts.sum(axis=0)) if self.lines else (0, 0)
+        return {
+            'entry': entry,
+            'exit': exit_,
+            'total_crossings': entry + exit_,
+            'unique_tracks': int((self.last_side != 0).any(axis=1).sum())
+        }
+    
+    def get_line_counts(self):
+        """Çizgi başına sayımlar"""
+        return {
+            line['key']: {
+                'name': line.get('name', line['key']),
+                'entry': int(counts[0]),
+                'exit': int(counts[1]),
+                'directions': {'entry': line['direction']['entry'], 'exit': line['direction']['exit']}
+            }
+            for line, counts in zip(self.lines, self.line_counts)
+        }
+    
+    def get_zone_stats(self, fps=None):
+        """Zone başına ziyaret sayısı, kalma süreleri (frame, fps verilirse saniye) ve anlık doluluk"""
+        stats = {}
+        for z, zone in enumerate(self.zones):
+            dwell = np.array(self.dwell_times[z], dtype=np.float64)
+            entry = {
+                'name': zone.get('name', zone['key']),
+                'visits': len(dwell),
+                'occupancy': int((self.zone_enter[:, z] >= 0).sum()),
+                'mean_dwell_frames': float(dwell.mean()) if len(dwell) else 0.0,
+                'max_dwell_frames': int(dwell.max()) if len(dwell) else 0
+            }
+            if fps:
+                entry['mean_dwell_s'] = entry['mean_dwell_frames'] / fps
+                entry['max_dwell_s'] = entry['max_dwell_frames'] / fps
+            stats[zone['key']] = entry
+        return stats
+    
+    def get_events(self):
+        """Tüm crossing eventlerini döndür"""
+        return self.events
+    
+    def pop_events(self):
+        """Son çağrıdan beri oluşan eventleri döndür ve listeden çıkar"""
+        events, self.events = self.events, []
+        return events
@@ -0,0 +1,175 @@
+import hashlib
+import json
+import os
+import shutil
+from pathlib import Path
+
+import numpy as np
+
+from src.core.backends import model_file
+
+
+def cache_key(config, extra=None):
+    """Model ağırlıkları + detection config için kısa hash
+    
+    Args:
+        config: model.yaml 'detection' bölümü
+        extra: key'e eklenecek diğer ayarlar (dict)
+    """
+    h = hashlib.sha1()
+    backend = config.get('backend', 'ultralytics')
+    weights = Path(model_file(config))
+    if weights.exists():
+        with open(weights, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                h.update(chunk)
+    else:
+        # ultralytics indirecek, sadece isim
+        h.update(str(weights).encode())
+    
+    # device sonucu değiştirmez, cache_dir key'in parçası değil
+    # model dosyası zaten hash'te (quantized açıksa INT8 model)
+    # ROI açıkken cache kullanılmaz (PersonDetector.open_cache)
+    ignored = ('device', 'cache_dir', 'use_cache', 'backend', 'onnx_model', 'openvino_model',
+               'num_threads', 'quantized', 'reduced_decode', 'server', 'roi')
+    relevant = {k: v for k, v in config.items() if k not in ignored}
+    if backend != 'ultralytics':
+        # farklı pre/post-processing, detectionlar birebir aynı değil
+        relevant['backend'] = backend
+    if extra:
+        relevant['extra'] = extra
+    h.update(json.dumps(relevant, sort_keys=True).encode())
+    return h.hexdigest()[:16]
+
+
+def sequence_cache_key(config, decode_scale=1):
+    """Bir sequence çalışmasının cache key'i (run_sequence / sweep aynı key'i kullanır)
+    
+    Args:
+        decode_scale: küçültülmüş decode ölçeği (VideoReader.decode_scale)
+    """
+    # farklı decode ölçeğinde detectionlar birebir aynı değil
+    extra = {'decode_scale': decode_scale} if decode_scale > 1 else None
+    return cache_key(config, extra)
+
+
+class DetectionCache:
+    """Sequence bazlı disk üzerinde detection cache
+    
+    <cache_dir>/<sequence>/<key>/ altında:
+        boxes.npy    (M, 5) float32, tüm frame'lerin detectionları art arda
+        offsets.npy  (F + 1,) int64, frame i = boxes[offsets[i]:offsets[i + 1]]
+        present.npy  (F,) bool, detection yapılmış frameler (stride ile
+                     yazılan cache'te sadece her K. frame)
+        meta.json    frame sayısı, config özeti
+    
+    Okuma memory-mapped, frame başına slice kopyasız.
+    """
+    
+    def __init__(self, cache_dir, sequence_name, key):
+        self.path = Path(cache_dir) / sequence_name / key
+        self.boxes = None
+        self.offsets = None
+        self.present = None
+        self._pending = {}
+    
+    def exists(self):
+        return (self.path / 'meta.json').exists()
+    
+    def load(self):
+        """Cache'i memory-mapped aç"""
+        self.boxes = np.load(self.path / 'boxes.npy', mmap_mode='r')
+        self.offsets = np.load(self.path / 'offsets.npy', mmap_mode='r')
+        present_path = self.path / 'present.npy'
+        # present.npy'siz eski cache: tüm frameler var
+        self.present = (np.load(present_path) if present_path.exists()
+                        else np.ones(len(self.offsets) - 1, dtype=bool))
+        return self
+    
+    @property
+    def num_pending(self):
+        return len(self._pending)
+    
+    @property
+    def num_frames(self):
+        return len(self.offsets) - 1 if self.offsets is not None else 0
+    
+    def has(self, frame_ids=None):
+        """frame_ids'in hepsi cache'te mi (None: tüm frameler)"""
+        if self.present is None:
+            return False
+        if frame_ids is None:
+            return bool(self.present.all())
+        frame_ids = np.asarray(frame_ids, dtype=np.int64)
+        if len(frame_ids) and frame_ids.max() >= self.num_frames:
+            return False
+        return bool(self.present[frame_ids].all())
+    
+    def get(self, frame_idx):
+        """Frame'in detectionları, (K, 5)"""
+        return self.boxes[self.offsets[frame_idx]:self.offsets[frame_idx + 1]]
+    
+    def add(self, frame_idx, boxes):
+        """Cache oluştururken bir frame'in detectionlarını ekle"""
+        self._pending[frame_idx] = np.asarray(boxes, dtype=np.float32).reshape(-1, 5)
+    
+    def get_state(self):
+        """Eklenmiş ama yazılmamış frameler (checkpoint için)"""
+        frame_ids = np.array(sorted(self._pending), dtype=np.int64)
+        frames = [self._pending[i] for i in frame_ids]
+        offsets = np.zeros(len(frames) + 1, dtype=np.int64)
+        offsets[1:] = np.cumsum([len(b) for b in frames])
+        boxes = np.concatenate(frames) if frames else np.zeros((0, 5), dtype=np.float32)
+        return {'frame_ids': frame_ids, 'offsets': offsets, 'boxes': boxes}
+    
+    def set_state(self, state):
+        boxes, offsets = state['boxes'], state['offsets']
+        for k, frame_idx in enumerate(state['frame_ids'].tolist()):
+            self._pending[frame_idx] = np.array(boxes[offsets[k]:offsets[k + 1]], dtype=np.float32)
+    
+    def save(self, num_frames, meta=None):
+        """Eklenen frameleri diske yaz
+        
+        Yüklü cache'te olup bu çalışmada detect edilmeyen frameler korunur,
+        böylece farklı stride'lı çalışmalar cache'i tamamlar. Yazma geçici
+        klasöre yapılıp rename edilir.
+        
+        Args:
+            num_frames: sequence'ın frame sayısı
+        
+        Returns:
+            True: cache yazıldı
+        """
+        if not self._pending:
+            return False
+        frames = [None] * num_frames
+        if self.present is not None and self.num_frames == num_frames:
+            for i in np.flatnonzero(self.present):
+                frames[i] = np.array(self.get(i))
+        for i, boxes in self._pending.items():
+            if i < num_frames:
+                frames[i] = boxes
+        present = np.array([boxes is not None for boxes in frames], dtype=bool)
+        empty = np.zeros((0, 5), dtype=np.float32)
+        frames = [empty if boxes is None else boxes for boxes in frames]
+        
+        offsets = np.zeros(num_frames + 1, dtype=np.int64)
+        offsets[1:] = np.cumsum([len(b) for b in frames])
+        boxes = np.concatenate(frames) if frames else empty
+        
+        tmp_path = self.path.with_name(self.path.name + f'.tmp{os.getpid()}')
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        tmp_path.mkdir(parents=True)
+        np.save(tmp_path / 'boxes.npy', boxes)
+        np.save(tmp_path / 'offsets.npy', offsets)
+        np.save(tmp_path / 'present.npy', present)
+        with open(tmp_path / 'meta.json', 'w') as f:
+            json.dump({'num_frames': num_frames, 'detected_frames': int(present.sum()),
+                       'num_boxes': len(boxes), **(meta or {})}, f, indent=2)
+        
+        self.boxes = self.offsets = self.present = None
+        if self.path.exists():
+            shutil.rmtree(self.path)
+        os.replace(tmp_path, self.path)
+        self._pending = {}
+        return True
@@ -1,42 +1,251 @@
-from ultralytics import YOLO
+import numpy as np
 import yaml
 from pathlib import Path
 
+from src.core.backends import check_quantized, create_backend
+from src.core.detection_cache import DetectionCache, sequence_cache_key
+from src.core.roi import pack_rects
+from src.utils.geometry import nms
+
 
 class PersonDetector:
     """YOLO ile insan tespiti"""
     
-    def __init__(self, config_path="configs/model.yaml"):
+    def __init__(self, config_path="configs/model.yaml", cache_dir=None, roi=None):
+        """
+        Args:
+            config_path: model.yaml
+            cache_dir: detection cache klasörü (None: model.yaml'daki ayar)
+            roi: ROI crop inference'ı aç/kapat (None: model.yaml'daki ayar)
+        """
         config_path = Path(config_path)
         with open(config_path) as f:
             config = yaml.safe_load(f)
         
         self.config = config['detection']
-        self.model = YOLO(self.config['model_name'])
         self.conf_thresh = self.config['confidence_threshold']
         self.iou_thresh = self.config['iou_threshold']
         self.device = self.config['device']
+        self._model = None
+        
+        # ROI crop inference (açıksa cache key'e dahil)
+        self.config['roi'] = {**self.config.get('roi', {})}
+        if roi is not None:
+            self.config['roi']['enabled'] = roi
+        self.roi_config = self.config['roi']
+        
+        # Küçültülmüş decode: frameler 1/decode_scale boyutunda gelir (VideoReader
+        # decode_size=imgsz ile seçer), bboxlar tam çözünürlüğe çevrilir
+        self.reduced_decode = bool(self.config.get('reduced_decode', False))
+        self.decode_scale = 1
+        
+        # INT8 model: kalibrasyon raporu doğruluk sınırının altındaysa yüklenmez
+        self.quantized_report = None
+        if self.config.get('quantized', {}).get('enabled', False):
+            if self.config.get('backend', 'ultralytics') not in ('onnx', 'openvino'):
+                raise ValueError("quantized model için backend 'onnx' veya 'openvino' olmalı")
+            self.quantized_report = check_quantized(self.config)
+        
+        # Detection cache (sadece frameler + model config'e bağlı)
+        if cache_dir is None and self.config.get('use_cache', False):
+            cache_dir = self.config.get('cache_dir', 'cache/detections')
+        self.cache_dir = cache_dir
+        self.cache = None
+        self.cache_hit = False
+        self._cache_frames = None
+        self._cache_reads = None  # son açılan cache: cache'ten / modelden gelen frame sayısı
+        self._cache_misses = 0
+    
+    @property
+    def model(self):
+        """Inference backend'i, ilk kullanımda yüklenir (cache hit'te hiç yüklenmez)"""
+        if self._model is None:
+            self._model = create_backend(self.config)
+        return self._model
+    
+    def open_cache(self, sequence_name, num_frames, frame_ids=None):
+        """Sequence için detection cache'i aç
+        
+        Hit ise detect/detect_batch frame_ids ile çağrıldığında model yerine
+        cache'ten okur. Değilse cache'te olan frameler yine cache'ten, diğerleri
+        modelden gelir (örn: adaptive stride önceden frameleri bilemez); yeni
+        detectionlar close_cache'te yazılır.
+        ROI açıkken cache kullanılmaz: croplar tracker'ın tahminlerine bağlı,
+        detectionlar başka tracker / çizgi ayarında geçerli değil.
         
-    def detect(self, frame):
+        Args:
+            num_frames: sequence'ın frame sayısı
+            frame_ids: bu çalışmada detect edilecek frameler (None: hepsi);
+                sabit stride'da sadece her K. frame cache'te olmalı
+        
+        Returns:
+            True: cache hit
+        """
+        self.cache = None
+        self.cache_hit = False
+        self._cache_reads = None
+        if not self.cache_dir or self.roi_enabled:
+            return False
+        self._cache_reads = self._cache_misses = 0
+        
+        self.cache = DetectionCache(self.cache_dir, sequence_name,
+                                    sequence_cache_key(self.config, self.decode_scale))
+        self._cache_frames = num_frames
+        if self.cache.exists():
+            self.cache.load()
+            self.cache_hit = self.cache.num_frames >= num_frames and self.cache.has(frame_ids)
+        return self.cache_hit
+    
+    def close_cache(self, save=True):
+        """Miss durumunda toplanan detectionları diske yaz
+        
+        Cache'te önceden olan frameler korunur (stride'lı çalışmalar cache'i
+        tamamlar).
+        
+        Args:
+            save: False ise (örn: run yarıda kaldı) hiçbir şey yazılmaz
+        """
+        written = False
+        if self.cache is not None and not self.cache_hit and save:
+            written = self.cache.save(self._cache_frames, meta={'model_name': self.config['model_name']})
+        self.cache = None
+        self.cache_hit = False
+        return written
+    
+    @property
+    def cache_status(self):
+        """Son açılan cache: 'hit', 'partial', 'miss' veya None (kullanılmadı)"""
+        if self._cache_reads is None:
+            return None
+        if self._cache_misses == 0:
+            return 'hit'
+        return 'partial' if self._cache_reads else 'miss'
+    
+    def detect(self, frame, frame_id=None):
         """Frame üzerinde detection
         
         Returns:
-            boxes: [[x1, y1, x2, y2, conf], ...]
+            boxes: (K, 5) [[x1, y1, x2, y2, conf], ...]
+        """
+        frame_ids = None if frame_id is None else [frame_id]
+        return self.detect_batch([frame], frame_ids)[0]
+    
+    @property
+    def roi_enabled(self):
+        return bool(self.roi_config.get('enabled', False))
+    
+    @property
+    def decode_size(self):
+        """Küçültülmüş decode için hedef uzun kenar (kapalıysa None)"""
+        return self.config.get('imgsz', 640) if self.reduced_decode else None
+    
+    def detect_batch(self, frames, frame_ids=None, rois=None):
+        """Birden fazla frame için tek model çağrısında detection
+        
+        Args:
+            frames: frame listesi (cache hit'te None olabilir)
+            frame_ids: 0'dan başlayan frame indeksleri (cache için)
+            rois: frame başına (K, 4) crop bölgeleri [x1, y1, x2, y2]; verilirse
+                model sadece croplar üzerinde çalışır, bboxlar frame
+                koordinatlarına çevrilir
+        
+        decode_scale > 1 ise frameler küçültülmüş decode edilmiştir; rois tam
+        çözünürlük koordinatlarında verilir, dönen bboxlar da tam çözünürlükte.
+        
+        Returns:
+            Her frame için (K, 5) [[x1, y1, x2, y2, conf], ...] dizisi
         """
-        results = self.model(
-            frame,
-            conf=self.conf_thresh,
-            iou=self.iou_thresh,
-            device=self.device,
-            classes=[0],  # sadece insan sınıfı
-            verbose=False
-        )[0]
-        
-        boxes = []
-        if results.boxes is not None:
-            for box in results.boxes:
-                x1, y1, x2, y2 = box.xyxy[0].cpu().numpy()
-                conf = float(box.conf[0])
-                boxes.append([x1, y1, x2, y2, conf])
-        
-        return boxes
+        if len(frames) == 0:
+            return []
+        
+        use_cache = self.cache is not None and frame_ids is not None
+        if use_cache:
+            # cache'te olan frameler modele gitmez (hit'te hepsi)
+            cached = [self.cache_hit or self.cache.has([i]) for i in frame_ids]
+            self._cache_reads += sum(cached)
+            self._cache_misses += len(cached) - sum(cached)
+            if all(cached):
+                return [self.cache.get(i) for i in frame_ids]
+            frames = [frame for frame, c in zip(frames, cached) if not c]
+            if rois is not None:
+                rois = [frame_rois for frame_rois, c in zip(rois, cached) if not c]
+        
+        scale = self.decode_scale
+        if rois is None:
+            batch_boxes = self._infer(frames)
+        else:
+            if scale > 1:
+                rois = [self._scale_rois(frame_rois, scale, frame.shape) for frame_rois, frame in zip(rois, frames)]
+            batch_boxes = self._infer_rois(frames, rois)
+        if scale > 1:
+            for boxes in batch_boxes:
+                boxes[:, :4] *= scale
+        
+        if use_cache:
+            detected = iter(batch_boxes)
+            batch_boxes = []
+            for frame_id, c in zip(frame_ids, cached):
+                if c:
+                    batch_boxes.append(self.cache.get(frame_id))
+                else:
+                    boxes = next(detected)
+                    self.cache.add(frame_id, boxes)
+                    batch_boxes.append(boxes)
+        
+        return batch_boxes
+    
+    @staticmethod
+    def _scale_rois(rois, scale, shape):
+        """Tam çözünürlük crop bölgelerini küçültülmüş frame'e çevir (dışa yuvarlayarak)"""
+        rois = np.asarray(rois, dtype=np.int64).reshape(-1, 4)
+        scaled = np.hstack([rois[:, :2] // scale, -(-rois[:, 2:] // scale)])
+        scaled[:, [0, 2]] = np.clip(scaled[:, [0, 2]], 0, shape[1])
+        scaled[:, [1, 3]] = np.clip(scaled[:, [1, 3]], 0, shape[0])
+        return scaled
+    
+    def _infer_rois(self, frames, rois):
+        """Her frame'in cropları tek mosaic görüntüde, tüm frameler tek model çağrısında
+        
+        Frame başına yine tek inference yapılır (aynı compute), ama görüntü
+        sadece ilgili bölgelerden oluştuğu için kişiler daha az küçültülür.
+        """
+        mosaics, layouts = [], []
+        for frame, frame_rois in zip(frames, rois):
+            frame_rois = np.asarray(frame_rois, dtype=np.int64).reshape(-1, 4)
+            sizes = frame_rois[:, 2:] - frame_rois[:, :2]
+            offsets, (width, height) = pack_rects(sizes)
+            
+            mosaic = np.full((height, width, 3), 114, dtype=frame.dtype)
+            for (x1, y1, x2, y2), (ox, oy) in zip(frame_rois, offsets):
+                mosaic[oy:oy + y2 - y1, ox:ox + x2 - x1] = frame[y1:y2, x1:x2]
+            mosaics.append(mosaic)
+            layouts.append((frame_rois, offsets, sizes))
+        
+        results = []
+        for boxes, (frame_rois, offsets, sizes) in zip(self._infer(mosaics), layouts):
+            # bbox merkezinin düştüğü crop'a göre frame koordinatlarına çevir
+            centers = (boxes[:, None, :2] + boxes[:, None, 2:4]) / 2
+            inside = ((centers >= offsets[None]) & (centers < offsets[None] + sizes[None])).all(axis=2)
+            keep = inside.any(axis=1)
+            tile = inside.argmax(axis=1)[keep]
+            boxes = boxes[keep].copy()
+            
+            low = offsets[tile]
+            high = low + sizes[tile]
+            boxes[:, [0, 2]] = np.clip(boxes[:, [0, 2]], low[:, :1], high[:, :1])
+            boxes[:, [1, 3]] = np.clip(boxes[:, [1, 3]], low[:, 1:], high[:, 1:])
+            shift = frame_rois[tile, :2] - low
+            boxes[:, [0, 2]] += shift[:, :1]
+            boxes[:, [1, 3]] += shift[:, 1:]
+            
+            if len(frame_rois) > 1:
+                # örtüşen croplarda iki kez görülen kişiler
+                boxes = boxes[nms(boxes[:, :4], boxes[:, 4], self.iou_thresh)]
+            results.append(np.ascontiguousarray(boxes, dtype=np.float32))
+        return results
+    
+    def _infer(self, images):
+        """Model çağrısı, her görüntü için (K, 5) float32"""
+        if len(images) == 0:
+            return []
+        return self.model(images)
@@ -0,0 +1,166 @@
+import numpy as np
+from scipy.optimize import linear_sum_assignment
+from scipy.sparse import coo_matrix
+from scipy.sparse.csgraph import connected_components
+
+from src.utils.geometry import pairwise_iou, paired_iou
+
+
+# Bu boyutun altında gating overhead'i dense çözümden pahalı
+GATING_MIN_PAIRS = 4096
+
+
+def gate_pairs(boxes_a, boxes_b):
+    """Kesişme ihtimali olan bbox çiftlerini bul (sort-and-sweep)
+    
+    boxes_b x1'e göre sıralanır; her a kutusu için x ekseninde çakışabilecek
+    b kutuları searchsorted ile tek aralık olarak bulunur, sonra gerçek x/y
+    çakışması kontrol edilir. Kesişmeyen çiftlerin IoU'su zaten 0.
+    
+    Args:
+        boxes_a: (N, 4), boxes_b: (M, 4) [x1, y1, x2, y2]
+    
+    Returns:
+        rows, cols: kesişen çiftlerin indeksleri
+    """
+    a = np.asarray(boxes_a, dtype=np.float64).reshape(-1, 4)
+    b = np.asarray(boxes_b, dtype=np.float64).reshape(-1, 4)
+    empty = np.zeros(0, dtype=np.int64)
+    if len(a) == 0 or len(b) == 0:
+        return empty, empty
+    
+    order = np.argsort(b[:, 0], kind='stable')
+    b_x1 = b[order, 0]
+    max_w = (b[:, 2] - b[:, 0]).max()
+    
+    # b.x2 > a.x1 için b.x1 > a.x1 - max_w olmalı; b.x1 < a.x2
+    lo = np.searchsorted(b_x1, a[:, 0] - max_w, side='right')
+    hi = np.searchsorted(b_x1, a[:, 2], side='left')
+    counts = np.maximum(hi - lo, 0)
+    total = counts.sum()
+    if total == 0:
+        return empty, empty
+    
+    rows = np.repeat(np.arange(len(a)), counts)
+    starts = np.cumsum(counts) - counts
+    offsets = np.arange(total) - np.repeat(starts, counts)
+    cols = order[np.repeat(lo, counts) + offsets]
+    
+    overlap = (
+        (b[cols, 0] < a[rows, 2]) & (b[cols, 2] > a[rows, 0]) &
+        (b[cols, 1] < a[rows, 3]) & (b[cols, 3] > a[rows, 1])
+    )
+    return rows[overlap], cols[overlap]
+
+
+def linear_assignment(boxes_a, boxes_b, match_thresh, method='hungarian', gating=True):
+    """IoU cost (1 - IoU) ile eşleştirme
+    
+    gating açıksa sadece kesişen çiftler değerlendirilir, problem bağlı
+    bileşenlere bölünür ve her blok ayrı çözülür. Kesişmeyen çiftlerin cost'u
+    sabit (1) olduğu için sonuç dense Hungarian ile aynıdır (eşit cost'lu
+    çözümler hariç).
+    
+    Args:
+        boxes_a: (N, 4) track bboxları
+        boxes_b: (M, 4) detection bboxları
+        match_thresh: minimum IoU
+        method: "hungarian" veya "greedy" (düşük latency için)
+        gating: sort-and-sweep + bileşen ayrıştırma (küçük problemlerde dense)
+    
+    Returns:
+        matches, unmatched_a, unmatched_b
+    """
+    n, m = len(boxes_a), len(boxes_b)
+    if n == 0 or m == 0:
+        return [], list(range(n)), list(range(m))
+    
+    gating = gating and n * m >= GATING_MIN_PAIRS
+    if gating:
+        rows, cols = gate_pairs(boxes_a, boxes_b)
+        iou = paired_iou(np.asarray(boxes_a)[rows], np.asarray(boxes_b)[cols])
+        keep = iou > 0
+        rows, cols, iou = rows[keep], cols[keep], iou[keep]
+    else:
+        iou_matrix = pairwise_iou(boxes_a, boxes_b)
+        rows, cols = np.nonzero(iou_matrix > 0)
+        iou = iou_matrix[rows, cols]
+    
+    if method == 'greedy':
+        matches = _greedy(rows, cols, iou, match_thresh)
+    elif method == 'hungarian':
+        if gating:
+            matches = _solve_components(rows, cols, iou, n, m, match_thresh)
+        else:
+            matches = _solve_dense(1 - iou_matrix, match_thresh)
+    else:
+        raise ValueError(f"Bilinmeyen eşleştirme yöntemi: {method}")
+    
+    matches.sort()
+    matched_a = {i for i, _ in matches}
+    matched_b = {j for _, j in matches}
+    unmatched_a = [i for i in range(n) if i not in matched_a]
+    unmatched_b = [j for j in range(m) if j not in matched_b]
+    return matches, unmatched_a, unmatched_b
+
+
+def _solve_dense(cost_matrix, match_thresh):
+    """Tüm matris üzerinde Hungarian"""
+    row_ind, col_ind = linear_sum_assignment(cost_matrix)
+    return [
+        (int(i), int(j)) for i, j in zip(row_ind, col_ind)
+        if cost_matrix[i, j] < (1 - match_thresh)
+    ]
+
+
+def _solve_components(rows, cols, iou, n, m, match_thresh):
+    """Kesişme grafını bağlı bileşenlere böl, her bloğu ayrı çöz"""
+    if len(rows) == 0:
+        return []
+    
+    # Node'lar: 0..n-1 a kutuları, n..n+m-1 b kutuları
+    graph = coo_matrix((np.ones(len(rows)), (rows, cols + n)), shape=(n + m, n + m))
+    _, labels = connected_components(graph, directed=False)
+    
+    edge_labels = labels[rows]
+    order = np.argsort(edge_labels, kind='stable')
+    rows, cols, iou, edge_labels = rows[order], cols[order], iou[order], edge_labels[order]
+    bounds = np.flatnonzero(np.diff(edge_labels)) + 1
+    starts = np.concatenate([[0], bounds])
+    ends = np.concatenate([bounds, [len(rows)]])
+    
+    matches = []
+    for start, end in zip(starts, ends):
+        if end - start == 1:
+            # Tek çift: doğrudan eşik kontrolü
+            if 1 - iou[start] < (1 - match_thresh):
+                matches.append((int(rows[start]), int(cols[start])))
+            continue
+        
+        block_rows, local_r = np.unique(rows[start:end], return_inverse=True)
+        block_cols, local_c = np.unique(cols[start:end], return_inverse=True)
+        cost = np.ones((len(block_rows), len(block_cols)))
+        cost[local_r, local_c] = 1 - iou[start:end]
+        
+        for i, j in _solve_dense(cost, match_thresh):
+            matches.append((int(block_rows[i]), int(block_cols[j])))
+    
+    return matches
+
+
+def _greedy(rows, cols, iou, match_thresh):
+    """En yüksek IoU'dan başlayarak greedy eşleştirme"""
+    passing = (1 - iou) < (1 - match_thresh)
+    rows, cols, iou = rows[passing], cols[passing], iou[passing]
+    order = np.lexsort((cols, rows, -iou))
+    
+    matches = []
+    used_a, used_b = set(), set()
+    for k in order:
+        i, j = int(rows[k]), int(cols[k])
+        if i in used_a or j in used_b:
+            continue
+        used_a.add(i)
+        used_b.add(j)
+        matches.append((i, j))
+    return matches
@@ -0,0 +1,210 @@
+"""
+Tamamlanmış trajectory'ler üzerinden offline sayım
+
+tracking.txt bir kez yüklenip track_id'ye göre gruplanır; ardışık
+framelerdeki ayak noktası hareketleri (M, 2) dizilerinde tutulur. Bir veya
+yüzlerce aday çizgi için tüm geçişler tek vektörize geçişte bulunur,
+tracker veya video tekrar çalıştırılmaz.
+
+Sayım kuralları LineCounter (mode='axis') ve MultiLineCounter (mode='side')
+ile aynıdır: sadece ardışık iki framede görünen track hareket eder, araya
+boşluk giren track sıfırdan başlar, aynı çizgiden aynı yönde ard arda geçiş
+sayılmaz.
+"""
+import numpy as np
+
+from src.core.counter import direction_names
+from src.utils.geometry import line_intersections, segment_crossings
+from src.utils.mot_io import load_mot
+
+
+# Yön kodları
+DIRECTIONS = ('right', 'left', 'down', 'up')
+_CODES = {name: i for i, name in enumerate(DIRECTIONS)}
+
+# Çizgi grubu başına en fazla hareket x çizgi hücresi (bellek sınırı)
+CHUNK_CELLS = 1 << 22
+
+
+def config_lines(sequence_config, keys=None):
+    """counting_lines.yaml sequence bölümündeki enabled line_* çizgileri
+    
+    Returns:
+        [{'key', 'coordinates', 'direction', ...}, ...]
+    """
+    return [
+        {'key': key, **line} for key, line in sequence_config.items()
+        if key.startswith('line_') and line.get('enabled', True) and (keys is None or key in keys)
+    ]
+
+
+class TrajectoryReplay:
+    """Track bazlı sıralanmış trajectory'ler ve vektörize sayım
+    
+    Attributes:
+        track_ids, frames: (N,) track_id'ye, sonra frame'e göre sıralı
+        points: (N, 2) ayak noktası (bbox alt orta)
+        rows: (N,) dosyadaki (frame sıralı) satır indeksi, event sırası için
+        starts: (M,) hareketlerin başlangıç satırı, hareket = starts -> starts + 1
+        segments: (N,) kesintisiz görünme aralığı numarası
+        num_frames: son frame (unique_tracks için)
+    """
+    
+    def __init__(self, data, num_frames=None):
+        frames = np.repeat(np.arange(data.num_frames + 1), np.diff(data.offsets))
+        order = np.lexsort((frames, data.ids))
+        self.track_ids = data.ids[order]
+        self.frames = frames[order]
+        self.rows = order
+        boxes = data.boxes[order]
+        self.points = np.stack([(boxes[:, 0] + boxes[:, 2]) / 2, boxes[:, 3]], axis=1)
+        self.num_frames = data.num_frames if num_frames is None else num_frames
+        
+        # Sadece bir sonraki framede de görünen track hareket eder
+        linked = (self.track_ids[1:] == self.track_ids[:-1]) & (self.frames[1:] == self.frames[:-1] + 1)
+        self.starts = np.flatnonzero(linked)
+        self.segments = np.cumsum(np.r_[True, ~linked])
+        # son framede hala görünen aralıklar
+        self.alive = np.zeros(self.segments[-1] + 1 if len(self.segments) else 1, dtype=bool)
+        self.alive[self.segments[self.frames == self.num_frames]] = True
+    
+    @classmethod
+    def from_file(cls, path, num_frames=None):
+        """tracking.txt'den"""
+        return cls(load_mot(path, use_cache=False), num_frames)
+    
+    @property
+    def num_moves(self):
+        return len(self.starts)
+    
+    def _line_arrays(self, lines):
+        coords = np.array([line['coordinates'] for line in lines], dtype=np.float64).reshape(-1, 4)
+        return coords[:, :2], coords[:, 2:]
+    
+    def crossings(self, lines, mode='axis'):
+        """Tüm çizgiler için sayılan geçişler
+        
+        Args:
+            lines: [{'coordinates': [x1, y1, x2, y2], ...}, ...]
+            mode: 'axis' yön hareketin baskın ekseninden (LineCounter),
+                  'side' çizginin hangi tarafına geçildiğinden (MultiLineCounter)
+        
+        Returns:
+            line, move, direction: (K,) çizgi indeksi, hareket indeksi (starts'ta),
+            yön kodu (DIRECTIONS); çizgiye, sonra harekete göre sıralı
+        """
+        if mode not in ('axis', 'side'):
+            raise ValueError(f"Bilinmeyen mode: {mode} (axis, side)")
+        line_starts, line_ends = self._line_arrays(lines)
+        p1 = self.points[self.starts]
+        p2 = self.points[self.starts + 1]
+        
+        if mode == 'axis':
+            delta = p2 - p1
+            horizontal = np.abs(delta[:, 0]) > np.abs(delta[:, 1])
+            move_dirs = np.where(horizontal,
+                                 np.where(delta[:, 0] > 0, _CODES['right'], _CODES['left']),
+                                 np.where(delta[:, 1] > 0, _CODES['down'], _CODES['up']))
+        else:
+            side_codes = np.array([[_CODES[name] for name in direction_names(a, b)]
+                                   for a, b in zip(line_starts, line_ends)], dtype=np.int64).reshape(-1, 2)
+        
+        # Hücre sayısı CHUNK_CELLS'i geçmesin
+        chunk = max(1, CHUNK_CELLS // max(len(p1), 1))
+        line_idx, move_idx, dirs = [], [], []
+        for lo in range(0, len(line_starts), chunk):
+            hi = lo + chunk
+            if mode == 'axis':
+                hits = line_intersections(p1, p2, line_starts[lo:hi], line_ends[lo:hi])
+                l, m = np.nonzero(hits.T)
+                d = move_dirs[m]
+            else:
+                sides = segment_crossings(p1, p2, line_starts[lo:hi], line_ends[lo:hi])
+                l, m = np.nonzero(sides.T)
+                d = side_codes[lo + l, (sides[m, l] < 0).astype(np.int64)]
+            line_idx.append(l + lo)
+            move_idx.append(m)
+            dirs.append(d)
+        
+        line_idx = np.concatenate(line_idx) if line_idx else np.zeros(0, dtype=np.int64)
+        move_idx = np.concatenate(move_idx) if move_idx else np.zeros(0, dtype=np.int64)
+        dirs = np.concatenate(dirs) if dirs else np.zeros(0, dtype=np.int64)
+        
+        # Aynı aralıkta, aynı çizgiden bir önceki geçişle aynı yön sayılmaz
+        segments = self.segments[self.starts[move_idx]]
+        repeat = np.zeros(len(line_idx), dtype=bool)
+        repeat[1:] = ((line_idx[1:] == line_idx[:-1]) & (segments[1:] == segments[:-1]) &
+                      (dirs[1:] == dirs[:-1]))
+        keep = ~repeat
+        return line_idx[keep], move_idx[keep], dirs[keep]
+    
+    def count(self, lines, mode='axis'):
+        """Çizgi başına get_counts() ile aynı sayımlar
+        
+        Returns:
+            [{'entry', 'exit', 'total_crossings', 'unique_tracks'}, ...]
+        """
+        line_idx, move_idx, dirs = self.crossings(lines, mode)
+        entry, exit_ = self._event_masks(lines, line_idx, dirs)
+        num_lines = len(lines)
+        entries = np.bincount(line_idx[entry], minlength=num_lines)
+        exits = np.bincount(line_idx[exit_], minlength=num_lines)
+        
+        # Son framede görünen ve bu aralıkta çizgiyi geçmiş trackler
+        segments = self.segments[self.starts[move_idx]]
+        alive = self.alive[segments]
+        pairs = np.unique(np.stack([line_idx[alive], segments[alive]], axis=1), axis=0)
+        unique = np.bincount(pairs[:, 0], minlength=num_lines)
+        
+        return [
+            {'entry': int(e), 'exit': int(x), 'total_crossings': int(e + x), 'unique_tracks': int(u)}
+            for e, x, u in zip(entries, exits, unique)
+        ]
+    
+    def total(self, lines, mode='axis'):
+        """Tüm çizgiler birlikte, counter.get_counts() ile aynı
+        
+        unique_tracks son framede görünen ve herhangi bir çizgiyi geçmiş
+        track sayısı (MultiLineCounter gibi, çizgi başına toplam değil).
+        """
+        line_idx, move_idx, dirs = self.crossings(lines, mode)
+        entry, exit_ = self._event_masks(lines, line_idx, dirs)
+        segments = self.segments[self.starts[move_idx]]
+        unique = np.unique(segments[self.alive[segments]])
+        return {
+            'entry': int(entry.sum()),
+            'exit': int(exit_.sum()),
+            'total_crossings': int(entry.sum() + exit_.sum()),
+            'unique_tracks': len(unique)
+        }
+    
+    def events(self, lines, mode='axis', with_line=False):
+        """Counter.get_events() ile aynı sırada eventler (frame, sonra dosya sırası)"""
+        line_idx, move_idx, dirs = self.crossings(lines, mode)
+        entry, exit_ = self._event_masks(lines, line_idx, dirs)
+        counted = entry | exit_
+        line_idx, move_idx, dirs, entry = line_idx[counted], move_idx[counted], dirs[counted], entry[counted]
+        
+        end = self.starts[move_idx] + 1
+        order = np.lexsort((line_idx, self.rows[end]))
+        events = []
+        for i in order:
+            event = {
+                'frame': int(self.frames[end[i]]),
+                'track_id': int(self.track_ids[end[i]]),
+                'event_type': 'entry' if entry[i] else 'exit',
+                'direction': DIRECTIONS[dirs[i]]
+            }
+            if with_line:
+                event['line'] = lines[line_idx[i]].get('key', f'line_{line_idx[i] + 1}')
+            events.append(event)
+        return events
+    
+    def _event_masks(self, lines, line_idx, dirs):
+        """Geçişlerden entry / exit olanlar"""
+        codes = np.array([
+            [_CODES.get(line['direction']['entry'], -1), _CODES.get(line['direction']['exit'], -1)]
+            if 'direction' in line else [-1, -1]
+            for line in lines
+        ], dtype=np.int64).reshape(-1, 2)
+        return dirs == codes[line_idx, 0], dirs == codes[line_idx, 1]
@@ -0,0 +1,159 @@
+import numpy as np
+
+
+class ROIPlanner:
+    """Detection için frame içinde kırpılacak bölgeleri seçer
+    
+    Her sayım çizgisi için çizginin etrafında band piksellik şerit (veya
+    counting_lines.yaml'da verilmişse polygon'un çevreleyen dikdörtgeni),
+    her zone için polygon'un çevreleyen dikdörtgeni ve
+    bu bölgeye track_range pikselden yakın aktif tracklerin tahmini konumları
+    (track_margin kadar genişletilmiş) birleştirilir. Uzaktaki trackler
+    yakında çizgiyi geçemeyeceği için takip edilmez. Örtüşen bölgeler tek crop'ta toplanır, en fazla max_crops
+    crop kalır. Cropların toplam alanı frame'in max_area_ratio'sunu geçerse
+    tek full-frame crop kullanılır.
+    """
+    
+    def __init__(self, roi_config, lines, frame_size):
+        """
+        Args:
+            roi_config: model.yaml 'detection.roi' bölümü
+            lines: counting_lines.yaml'daki sequence bölümü ({'line_1': {...}, ...})
+            frame_size: (width, height)
+        """
+        self.width, self.height = frame_size
+        self.band = roi_config.get('band', 300)
+        self.track_margin = roi_config.get('track_margin', 0.5)
+        self.track_range = roi_config.get('track_range', 300)
+        self.max_crops = roi_config.get('max_crops', 4)
+        self.min_size = roi_config.get('min_size', 320)
+        self.max_area_ratio = roi_config.get('max_area_ratio', 0.6)
+        
+        self.static_rects = np.array([
+            self._line_rect(line) for line in lines.values()
+            if isinstance(line, dict) and line.get('enabled', True)
+            and ('coordinates' in line or 'polygon' in line)
+        ], dtype=np.float64).reshape(-1, 4)
+        self.full_frame = np.array([[0, 0, self.width, self.height]], dtype=np.float64)
+    
+    def _line_rect(self, line):
+        """Çizgi etrafındaki (zone ise polygon'un kendisi) sabit bölge"""
+        if 'polygon' in line:
+            points = np.asarray(line['polygon'], dtype=np.float64)
+            return [*points.min(axis=0), *points.max(axis=0)]
+        roi = line.get('roi', {})
+        if 'polygon' in roi:
+            points = np.asarray(roi['polygon'], dtype=np.float64)
+            return [*points.min(axis=0), *points.max(axis=0)]
+        
+        band = roi.get('band', self.band)
+        x1, y1, x2, y2 = line['coordinates']
+        return [min(x1, x2) - band, min(y1, y2) - band, max(x1, x2) + band, max(y1, y2) + band]
+    
+    def plan(self, track_boxes=None):
+        """Bu frame için crop bölgeleri
+        
+        Args:
+            track_boxes: (N, 4) tracklerin tahmini konumları
+        
+        Returns:
+            (K, 4) int [x1, y1, x2, y2], frame sınırları içinde
+        """
+        rects = [self.static_rects]
+        if track_boxes is not None and len(track_boxes) > 0:
+            boxes = np.asarray(track_boxes, dtype=np.float64).reshape(-1, 4)
+            boxes = boxes[self._near_lines(boxes)]
+            size = (boxes[:, 2:] - boxes[:, :2]) * self.track_margin
+            rects.append(np.hstack([boxes[:, :2] - size, boxes[:, 2:] + size]))
+        rects = self._clip(self._expand(np.concatenate(rects)))
+        rects = rects[(rects[:, 2] > rects[:, 0]) & (rects[:, 3] > rects[:, 1])]
+        if len(rects) == 0:
+            return self.full_frame.astype(np.int64)
+        
+        rects = self._merge(rects)
+        area = ((rects[:, 2] - rects[:, 0]) * (rects[:, 3] - rects[:, 1])).sum()
+        if area > self.max_area_ratio * self.width * self.height:
+            return self.full_frame.astype(np.int64)
+        return np.round(rects).astype(np.int64)
+    
+    def _near_lines(self, boxes):
+        """Sabit bölgelerden en fazla track_range uzaktaki bboxlar"""
+        r = self.static_rects
+        d = self.track_range
+        return (
+            (boxes[:, None, 2] > r[None, :, 0] - d) & (boxes[:, None, 0] < r[None, :, 2] + d) &
+            (boxes[:, None, 3] > r[None, :, 1] - d) & (boxes[:, None, 1] < r[None, :, 3] + d)
+        ).any(axis=1)
+    
+    def _expand(self, rects):
+        """min_size'dan küçük bölgeleri merkezden büyüt (model için bağlam)"""
+        center = (rects[:, :2] + rects[:, 2:]) / 2
+        half = np.maximum((rects[:, 2:] - rects[:, :2]) / 2, self.min_size / 2)
+        return np.hstack([center - half, center + half])
+    
+    def _clip(self, rects):
+        rects = rects.copy()
+        rects[:, [0, 2]] = np.clip(rects[:, [0, 2]], 0, self.width)
+        rects[:, [1, 3]] = np.clip(rects[:, [1, 3]], 0, self.height)
+        return rects
+    
+    def _merge(self, rects):
+        """Bölge birleştirme
+        
+        Birleşimi ikisinin toplam alanından küçük olan (çok örtüşen) çiftler
+        her zaman, crop sayısı max_crops'u geçiyorsa alanı en az büyüyen
+        çiftler birleştirilir. Az örtüşen croplar ayrı kalır, çift
+        detectionlar NMS ile temizlenir.
+        """
+        rects = list(rects)
+        while len(rects) > 1:
+            arr = np.array(rects)
+            union = np.concatenate([
+                np.minimum(arr[:, None, :2], arr[None, :, :2]),
+                np.maximum(arr[:, None, 2:], arr[None, :, 2:])
+            ], axis=2)
+            area = (arr[:, 2] - arr[:, 0]) * (arr[:, 3] - arr[:, 1])
+            union_area = (union[..., 2] - union[..., 0]) * (union[..., 3] - union[..., 1])
+            growth = union_area - area[:, None] - area[None, :]
+            np.fill_diagonal(growth, np.inf)
+            
+            i, j = np.unravel_index(np.argmin(growth), growth.shape)
+            if growth[i, j] > 0 and len(rects) <= self.max_crops:
+                break
+            rects = [r for k, r in enumerate(rects) if k not in (i, j)] + [union[i, j]]
+        return np.array(rects)
+
+
+def pack_rects(sizes, gap=16):
+    """Cropları tek görüntüde (mosaic) yan yana / alt alta yerleştir
+    
+    Basit shelf packing: yüksekliğe göre sıralanıp yaklaşık kare bir
+    genişliği dolduran satırlara dizilir.
+    
+    Args:
+        sizes: (K, 2) [w, h]
+        gap: croplar arası boşluk (piksel)
+    
+    Returns:
+        offsets: (K, 2) her crop'un mosaic içindeki sol üst köşesi
+        canvas_size: (w, h)
+    """
+    sizes = np.asarray(sizes, dtype=np.int64).reshape(-1, 2)
+    if len(sizes) == 0:
+        return np.zeros((0, 2), dtype=np.int64), (0, 0)
+    
+    total_area = ((sizes[:, 0] + gap) * (sizes[:, 1] + gap)).sum()
+    row_width = max(int(sizes[:, 0].max()), int(np.sqrt(total_area)))
+    
+    offsets = np.zeros_like(sizes)
+    x = y = row_height = canvas_w = 0
+    for i in np.argsort(-sizes[:, 1], kind='stable'):
+        w, h = sizes[i]
+        if x > 0 and x + w > row_width:
+            y += row_height + gap
+            x = row_height = 0
+        offsets[i] = (x, y)
+        x += w + gap
+        row_height = max(row_height, h)
+        canvas_w = max(canvas_w, x - gap)
+    return offsets, (int(canvas_w), int(y + row_height))
@@ -0,0 +1,83 @@
+import numpy as np
+
+
+class DetectionScheduler:
+    """Hangi frame'lerde detector çalışacağına karar verir
+    
+    Sabit modda her stride frame'de bir detection yapılır. Adaptive modda
+    detection arası en fazla max_stride frame olur; trackler hızlı
+    hareket ediyorsa (tahmini yer değiştirme / bbox yüksekliği motion_thresh'i
+    geçerse) veya Kalman konum belirsizliği uncertainty_thresh'i geçerse
+    erken detection yapılır. Ara frame'lerde tracker.predict_only kullanılır.
+    """
+    
+    def __init__(self, stride=1, adaptive=False, max_stride=8, min_stride=1,
+                 motion_thresh=0.3, uncertainty_thresh=0.15):
+        self.stride = max(1, stride)
+        self.adaptive = adaptive
+        self.max_stride = max(1, max_stride)
+        self.min_stride = max(1, min_stride)
+        self.motion_thresh = motion_thresh
+        self.uncertainty_thresh = uncertainty_thresh
+        self.last_detect = None
+        self.num_detect = 0
+    
+    def get_state(self):
+        return {'last_detect': np.int64(-1 if self.last_detect is None else self.last_detect),
+                'num_detect': np.int64(self.num_detect)}
+    
+    def set_state(self, state):
+        last_detect = int(state['last_detect'])
+        self.last_detect = None if last_detect < 0 else last_detect
+        self.num_detect = int(state['num_detect'])
+    
+    @property
+    def enabled(self):
+        return self.adaptive or self.stride > 1
+    
+    def skips(self, frame_idx):
+        """frame_idx'in detection'sız geçileceği önceden belli mi (sadece sabit stride)"""
+        return not self.adaptive and frame_idx % self.stride != 0
+    
+    def should_detect(self, frame_idx, tracker=None):
+        """frame_idx için detection yapılacak mı
+        
+        Adaptive modda tracker, bir önceki frame işlendikten sonraki haliyle
+        verilmeli.
+        """
+        if not self.adaptive:
+            detect = frame_idx % self.stride == 0
+        elif self.last_detect is None:
+            detect = True
+        else:
+            since = frame_idx - self.last_detect
+            if since >= self.max_stride:
+                detect = True
+            elif since < self.min_stride:
+                detect = False
+            else:
+                detect = self._needs_update(tracker, since)
+        
+        if detect:
+            self.last_detect = frame_idx
+            self.num_detect += 1
+        return detect
+    
+    def _needs_update(self, tracker, since):
+        """Trackler detection olmadan güvenilir şekilde ilerletilemez mi"""
+        tracks = tracker.tracks
+        visible = tracks.lost_frames == 0
+        if not visible.any():
+            # takip edilen kimse yok, yeni girenleri kaçırmamak için max_stride'a kadar bekle
+            return False
+        
+        mean = tracks.mean[visible]
+        h = np.maximum(mean[:, 3], 1)
+        # bir sonraki frame'e kadar toplam tahmini yer değiştirme
+        motion = np.hypot(mean[:, 4], mean[:, 5]) * (since + 1) / h
+        if motion.max() > self.motion_thresh:
+            return True
+        
+        cov = tracks.covariance[visible]
+        uncertainty = np.sqrt(cov[:, 0, 0] + cov[:, 1, 1]) / h
+        return bool(uncertainty.max() > self.uncertainty_thresh)
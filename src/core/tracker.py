@@ -1,27 +1,20 @@
+import time
+
 import numpy as np
 import yaml
 from pathlib import Path
-from scipy.optimize import linear_sum_assignment
 
-from src.utils.geometry import calculate_iou
+from src.core.matching import linear_assignment
 
 
-class KalmanFilter:
-    """Constant velocity Kalman filter"""
+class BatchKalmanFilter:
+    """Tüm trackler için vektörize constant velocity Kalman filter
     
-    def __init__(self, bbox):
-        # State: [cx, cy, w, h, vx, vy, vw, vh]
-        cx = (bbox[0] + bbox[2]) / 2
-        cy = (bbox[1] + bbox[3]) / 2
-        w = bbox[2] - bbox[0]
-        h = bbox[3] - bbox[1]
-        
-        self.x = np.array([cx, cy, w, h, 0, 0, 0, 0], dtype=np.float32)
-        
-        # State covariance
-        self.P = np.eye(8, dtype=np.float32)
-        self.P[4:, 4:] *= 1000  # yüksek uncertainty for velocities
-        
+    State'ler (N, 8), kovaryanslar (N, 8, 8) dizilerinde tutulur. F/H/Q/R
+    matrisleri tüm trackler için ortak, tek seferde oluşturulur.
+    """
+    
+    def __init__(self):
         # Process noise
         self.Q = np.eye(8, dtype=np.float32)
         self.Q[4:, 4:] *= 0.01
@@ -31,173 +24,293 @@ class KalmanFilter:
         
         # State transition matrix (constant velocity)
         self.F = np.eye(8, dtype=np.float32)
-        self.F[:4, 4:] = np.eye(4)  # position += velocity
+        self.F[:4, 4:] = np.eye(4)
         
         # Measurement matrix
         self.H = np.eye(4, 8, dtype=np.float32)
     
-    def predict(self):
-        """Bir sonraki state'i tahmin et"""
-        self.x = self.F @ self.x
-        self.P = self.F @ self.P @ self.F.T + self.Q
-        return self.get_bbox()
+    def initiate(self, bboxes):
+        """Yeni trackler için state ve kovaryans oluştur
+        
+        Args:
+            bboxes: (N, 4) [x1, y1, x2, y2]
+        
+        Returns:
+            mean: (N, 8), covariance: (N, 8, 8)
+        """
+        bboxes = np.asarray(bboxes, dtype=np.float64).reshape(-1, 4)
+        mean = np.zeros((len(bboxes), 8))
+        mean[:, :4] = self.to_measurement(bboxes)
+        
+        covariance = np.tile(np.eye(8), (len(bboxes), 1, 1))
+        covariance[:, 4:, 4:] *= 1000  # yüksek uncertainty for velocities
+        return mean, covariance
+    
+    def predict(self, mean, covariance, dt=1):
+        """Tüm trackler için tek seferde prediction
+        
+        Args:
+            dt: son update'ten beri geçen frame sayısı (frame atlanmışsa > 1)
+        """
+        if dt == 1:
+            F, Q = self.F, self.Q
+        else:
+            F = self.F.copy()
+            F[:4, 4:] = np.eye(4) * dt
+            Q = self.Q * dt
+        mean = mean @ F.T
+        covariance = F @ covariance @ F.T + Q
+        return mean, covariance
     
-    def update(self, bbox):
-        """Ölçüm ile state'i güncelle"""
-        cx = (bbox[0] + bbox[2]) / 2
-        cy = (bbox[1] + bbox[3]) / 2
-        w = bbox[2] - bbox[0]
-        h = bbox[3] - bbox[1]
-        z = np.array([cx, cy, w, h], dtype=np.float32)
+    def update(self, mean, covariance, bboxes):
+        """Eşleşen trackleri ölçümlerle tek seferde güncelle
+        
+        H sadece ilk 4 state'i seçtiği için H @ P, P @ H.T gibi çarpımlar
+        slicing ile yapılır.
+        """
+        z = self.to_measurement(bboxes)
         
         # Innovation
-        y = z - self.H @ self.x
-        S = self.H @ self.P @ self.H.T + self.R
-        K = self.P @ self.H.T @ np.linalg.inv(S)
+        y = z - mean[:, :4]
+        S = covariance[:, :4, :4] + self.R
+        K = covariance[:, :, :4] @ np.linalg.inv(S)
         
-        self.x = self.x + K @ y
-        self.P = (np.eye(8) - K @ self.H) @ self.P
+        mean = mean + (K @ y[:, :, None])[:, :, 0]
+        covariance = covariance - K @ covariance[:, :4, :]
+        return mean, covariance
     
-    def get_bbox(self):
-        """State'ten bbox çıkar"""
-        cx, cy, w, h = self.x[:4]
-        return np.array([cx - w/2, cy - h/2, cx + w/2, cy + h/2])
+    @staticmethod
+    def to_measurement(bboxes):
+        """[x1, y1, x2, y2] -> [cx, cy, w, h]"""
+        bboxes = np.asarray(bboxes, dtype=np.float64).reshape(-1, 4)
+        return np.stack([
+            (bboxes[:, 0] + bboxes[:, 2]) / 2,
+            (bboxes[:, 1] + bboxes[:, 3]) / 2,
+            bboxes[:, 2] - bboxes[:, 0],
+            bboxes[:, 3] - bboxes[:, 1]
+        ], axis=1)
+    
+    @staticmethod
+    def to_bbox(mean):
+        """State'lerden bbox çıkar, (N, 4)"""
+        cx, cy, w, h = mean[:, 0], mean[:, 1], mean[:, 2], mean[:, 3]
+        return np.stack([cx - w/2, cy - h/2, cx + w/2, cy + h/2], axis=1)
 
 
-class Track:
-    def __init__(self, track_id, box, conf):
-        self.id = track_id
-        self.box = box
-        self.conf = conf
-        self.age = 1
-        self.lost_frames = 0
-        self.kf = KalmanFilter(box)
-        
-    def predict(self):
-        """Kalman prediction"""
-        self.box = self.kf.predict()
-        
-    def update(self, box, conf):
-        self.kf.update(box)
-        self.box = box
-        self.conf = conf
-        self.age += 1
-        self.lost_frames = 0
-        
-    def mark_lost(self):
-        self.lost_frames += 1
+class TrackStore:
+    """Track'leri struct-of-arrays olarak tutar
+    
+    Her track bir satır: id, bbox, conf, age, lost_frames ve Kalman state'i
+    (mean, covariance) aynı indekste.
+    """
+    
+    FIELDS = ('ids', 'boxes', 'confs', 'ages', 'lost_frames', 'mean', 'covariance')
+    
+    def __init__(self):
+        self.ids = np.zeros(0, dtype=np.int64)
+        self.boxes = np.zeros((0, 4))
+        self.confs = np.zeros(0)
+        self.ages = np.zeros(0, dtype=np.int64)
+        self.lost_frames = np.zeros(0, dtype=np.int64)
+        self.mean = np.zeros((0, 8))
+        self.covariance = np.zeros((0, 8, 8))
+    
+    def __len__(self):
+        return len(self.ids)
+    
+    def append(self, ids, boxes, confs, mean, covariance):
+        """Yeni trackleri sona ekle"""
+        n = len(ids)
+        self.ids = np.concatenate([self.ids, ids])
+        self.boxes = np.concatenate([self.boxes, boxes])
+        self.confs = np.concatenate([self.confs, confs])
+        self.ages = np.concatenate([self.ages, np.ones(n, dtype=np.int64)])
+        self.lost_frames = np.concatenate([self.lost_frames, np.zeros(n, dtype=np.int64)])
+        self.mean = np.concatenate([self.mean, mean])
+        self.covariance = np.concatenate([self.covariance, covariance])
+    
+    def keep(self, mask):
+        """Sadece mask'teki trackleri tut"""
+        self.ids = self.ids[mask]
+        self.boxes = self.boxes[mask]
+        self.confs = self.confs[mask]
+        self.ages = self.ages[mask]
+        self.lost_frames = self.lost_frames[mask]
+        self.mean = self.mean[mask]
+        self.covariance = self.covariance[mask]
 
 
 class ByteTracker:
     """ByteTrack with Kalman + Hungarian"""
     
-    def __init__(self, config_path="configs/tracker.yaml"):
+    def __init__(self, config_path="configs/tracker.yaml", overrides=None):
+        """
+        Args:
+            config_path: tracker.yaml
+            overrides: yaml değerlerinin üzerine yazılacak ayarlar (örn: sweep için)
+        """
         config_path = Path(config_path)
         with open(config_path) as f:
             config = yaml.safe_load(f)
         
-        self.config = config['tracker']
+        self.config = {**config['tracker'], **(overrides or {})}
         self.track_thresh = self.config['track_thresh']
         self.track_buffer = self.config['track_buffer']
         self.match_thresh = self.config['match_thresh']
         self.low_thresh = self.config['low_thresh']
+        self.match_method = self.config.get('match_method', 'hungarian')
+        self.gating = self.config.get('gating', True)
         
-        self.tracks = []
+        self.kf = BatchKalmanFilter()
+        self.tracks = TrackStore()
         self.next_id = 1
-        
-    def update(self, detections):
+        # son update / predict_only çağrısının aşama süreleri (saniye, profiling için)
+        self.timings = {'predict': 0.0, 'match': 0.0, 'update': 0.0}
+    
+    def update(self, detections, dt=1):
         """Detectionlari tracklerle eşleştir
         
         Args:
             detections: [[x1, y1, x2, y2, conf], ...]
-            
+            dt: önceki update'ten beri geçen frame sayısı (canlı kaynakta
+                atlanan frameler için > 1)
+        
         Returns:
             tracked_objects: [[x1, y1, x2, y2, track_id, conf], ...]
         """
-        # Kalman prediction
-        for track in self.tracks:
-            track.predict()
+        t0 = time.perf_counter()
+        detections = np.asarray(detections, dtype=np.float64).reshape(-1, 5)
+        tracks = self.tracks
+        
+        # Kalman prediction (tüm trackler tek seferde)
+        if len(tracks) > 0:
+            tracks.mean, tracks.covariance = self.kf.predict(tracks.mean, tracks.covariance, dt)
+            tracks.boxes = self.kf.to_bbox(tracks.mean)
+        t1 = time.perf_counter()
         
         # Yüksek ve düşük confidence detectionlari ayir
-        high_dets = [d for d in detections if d[4] >= self.track_thresh]
-        low_dets = [d for d in detections if self.low_thresh <= d[4] < self.track_thresh]
+        confs = detections[:, 4]
+        high_dets = detections[confs >= self.track_thresh]
+        low_dets = detections[(confs >= self.low_thresh) & (confs < self.track_thresh)]
         
         # İlk eşleştirme: Hungarian algorithm
         matches, unmatched_tracks, unmatched_dets = self._match(
-            self.tracks, high_dets
+            tracks.boxes, high_dets[:, :4]
         )
-        
-        # Eşleşen trackleri güncelle
-        for track_idx, det_idx in matches:
-            det = high_dets[det_idx]
-            self.tracks[track_idx].update(det[:4], det[4])
+        matched_tracks = [track_idx for track_idx, _ in matches]
+        matched_dets = [high_dets[det_idx] for _, det_idx in matches]
         
         # İkinci eşleştirme: düşük confidence
         if len(unmatched_tracks) > 0 and len(low_dets) > 0:
-            remaining_tracks = [self.tracks[i] for i in unmatched_tracks]
             matches_low, _, _ = self._match(
-                remaining_tracks, low_dets
+                tracks.boxes[unmatched_tracks], low_dets[:, :4]
             )
             
-            # matches_low daki indeksler remaining_tracks için
+            # matches_low daki indeksler unmatched_tracks için
             matched_unmatched_indices = []
             for i, det_idx in matches_low:
                 track_idx = unmatched_tracks[i]
-                det = low_dets[det_idx]
-                self.tracks[track_idx].update(det[:4], det[4])
+                matched_tracks.append(track_idx)
+                matched_dets.append(low_dets[det_idx])
                 matched_unmatched_indices.append(track_idx)
             
             # Eşleşenleri unmatched_tracks'ten çıkar
             for track_idx in matched_unmatched_indices:
                 unmatched_tracks.remove(track_idx)
+        t2 = time.perf_counter()
+        
+        # Eşleşen trackleri tek seferde güncelle
+        if matched_tracks:
+            idx = np.array(matched_tracks)
+            dets = np.array(matched_dets)
+            tracks.mean[idx], tracks.covariance[idx] = self.kf.update(
+                tracks.mean[idx], tracks.covariance[idx], dets[:, :4]
+            )
+            tracks.boxes[idx] = dets[:, :4]
+            tracks.confs[idx] = dets[:, 4]
+            tracks.ages[idx] += 1
+            tracks.lost_frames[idx] = 0
         
         # Eşleşmeyen trackleri lost olarak işaretle
-        for track_idx in unmatched_tracks:
-            self.tracks[track_idx].mark_lost()
+        tracks.lost_frames[unmatched_tracks] += dt
         
         # Yeni trackler oluştur
-        for det_idx in unmatched_dets:
-            det = high_dets[det_idx]
-            new_track = Track(self.next_id, det[:4], det[4])
-            self.next_id += 1
-            self.tracks.append(new_track)
+        if len(unmatched_dets) > 0:
+            new_dets = high_dets[unmatched_dets]
+            new_ids = np.arange(self.next_id, self.next_id + len(new_dets))
+            self.next_id += len(new_dets)
+            mean, covariance = self.kf.initiate(new_dets[:, :4])
+            tracks.append(new_ids, new_dets[:, :4], new_dets[:, 4], mean, covariance)
         
         # Ölü trackleri temizle
-        self.tracks = [t for t in self.tracks if t.lost_frames < self.track_buffer]
-        
-        # Sonuçları döndür
-        results = []
-        for track in self.tracks:
-            if track.lost_frames == 0:
-                results.append([
-                    track.box[0], track.box[1], track.box[2], track.box[3],
-                    track.id, track.conf
-                ])
+        tracks.keep(tracks.lost_frames < self.track_buffer)
         
+        results = self._results()
+        self.timings = {'predict': t1 - t0, 'match': t2 - t1, 'update': time.perf_counter() - t2}
         return results
     
-    def _match(self, tracks, detections):
-        """Hungarian algorithm ile eşleştirme"""
-        if len(tracks) == 0 or len(detections) == 0:
-            return [], list(range(len(tracks))), list(range(len(detections)))
+    def predict_only(self, dt=1):
+        """Detection olmayan frame: trackleri sadece Kalman ile ilerlet
+        
+        Görünür trackler (son detection frame'inde eşleşenler) tahmin edilen
+        konumlarıyla döner, lost sayılmaz. Zaten lost olanların süresi
+        işlemeye devam eder. Sonraki update() bu frame'e göre dt almalı.
         
-        # Cost matrix (1 - IoU)
-        cost_matrix = np.zeros((len(tracks), len(detections)))
-        for i, track in enumerate(tracks):
-            for j, det in enumerate(detections):
-                cost_matrix[i, j] = 1 - calculate_iou(track.box[:4], det[:4])
+        Returns:
+            tracked_objects: [[x1, y1, x2, y2, track_id, conf], ...]
+        """
+        t0 = time.perf_counter()
+        tracks = self.tracks
+        if len(tracks) == 0:
+            self.timings = {'predict': 0.0, 'match': 0.0, 'update': 0.0}
+            return []
         
-        # Hungarian
-        row_ind, col_ind = linear_sum_assignment(cost_matrix)
+        tracks.mean, tracks.covariance = self.kf.predict(tracks.mean, tracks.covariance, dt)
+        tracks.boxes = self.kf.to_bbox(tracks.mean)
+        tracks.lost_frames[tracks.lost_frames > 0] += dt
+        tracks.keep(tracks.lost_frames < self.track_buffer)
         
-        matches = []
-        unmatched_tracks = list(range(len(tracks)))
-        unmatched_dets = list(range(len(detections)))
+        results = self._results()
+        self.timings = {'predict': time.perf_counter() - t0, 'match': 0.0, 'update': 0.0}
+        return results
+    
+    def get_state(self):
+        """Checkpoint için tüm durum: track dizileri + next_id"""
+        state = {name: getattr(self.tracks, name) for name in TrackStore.FIELDS}
+        state['next_id'] = np.int64(self.next_id)
+        return state
+    
+    def set_state(self, state):
+        """get_state() çıktısından devam et"""
+        self.tracks = TrackStore()
+        for name in TrackStore.FIELDS:
+            setattr(self.tracks, name, np.array(state[name], dtype=getattr(self.tracks, name).dtype))
+        self.next_id = int(state['next_id'])
+    
+    def predicted_boxes(self, dt=1):
+        """Trackerın durumunu değiştirmeden dt frame sonraki tahmini bboxlar
         
-        for i, j in zip(row_ind, col_ind):
-            if cost_matrix[i, j] < (1 - self.match_thresh):
-                matches.append((i, j))
-                unmatched_tracks.remove(i)
-                unmatched_dets.remove(j)
+        Returns:
+            (N, 4) tüm trackler (lost olanlar dahil)
+        """
+        if len(self.tracks) == 0:
+            return np.zeros((0, 4))
+        mean, _ = self.kf.predict(self.tracks.mean, self.tracks.covariance, dt)
+        return self.kf.to_bbox(mean)
+    
+    def _results(self):
+        """Görünür trackler: [[x1, y1, x2, y2, track_id, conf], ...]"""
+        tracks = self.tracks
+        results = []
+        for i in np.flatnonzero(tracks.lost_frames == 0):
+            x1, y1, x2, y2 = tracks.boxes[i].tolist()
+            results.append([x1, y1, x2, y2, int(tracks.ids[i]), float(tracks.confs[i])])
         
-        return matches, unmatched_tracks, unmatched_dets
+        return results
+    
+    def _match(self, track_boxes, det_boxes):
+        """IoU eşleştirme (Hungarian veya greedy, opsiyonel gating)"""
+        return linear_assignment(
+            track_boxes, det_boxes, self.match_thresh,
+            method=self.match_method, gating=self.gating
+        )
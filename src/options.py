@@ -0,0 +1,102 @@
+"""
+run_sequence ayar grupları
+
+Her mod kendi ayarlarını taşır; run_sequence'a None verilen grup kapalıdır
+(render hariç, varsayılanı her frame'i videoya yazmak).
+"""
+from src.core.stride import DetectionScheduler
+from src.utils.video_io import StreamReader
+
+
+class RenderOptions:
+    """output.mp4 ayarları
+    
+    enabled=False (headless) ise frame kopyalama, çizim ve video encode hiç
+    yapılmaz; tracking.txt, results.json ve events.csv yine yazılır.
+    """
+    
+    def __init__(self, enabled=True, every=1, events_only=False):
+        """
+        Args:
+            enabled: False ise output.mp4 yazılmaz
+            every: sadece her N. frame videoya
+            events_only: sadece crossing event'i olan frameler videoya
+        """
+        self.enabled = enabled
+        self.every = every
+        self.events_only = events_only
+    
+    def should_render(self, frame_idx, num_events):
+        """Frame output.mp4'e yazılacak mı"""
+        if not self.enabled:
+            return False
+        if self.events_only:
+            return num_events > 0
+        return frame_idx % self.every == 0
+
+
+class StreamOptions:
+    """Canlı kaynak (URL, kamera indeksi, FIFO) ayarları
+    
+    Frame sayısı bilinmez, kaynak bitene, max_frames'e ya da Ctrl+C'ye kadar
+    okunur. Geride kalınca drop_policy'ye göre frame atılır; tracking.txt'de
+    frame numarası capture sırasıdır, tracker'a atlanan frame sayısı dt
+    olarak verilir. Detection cache ve checkpoint kullanılmaz.
+    """
+    
+    def __init__(self, drop_policy='oldest', buffer_size=1, max_latency=None, realtime=False):
+        """
+        Args:
+            drop_policy: 'oldest', 'newest' veya 'none' (StreamReader)
+            buffer_size: capture buffer'ı (frame)
+            max_latency: bu kadar saniyeden eski frameler atlanır
+            realtime: dosya kaynağını fps hızında oku (kamera simülasyonu)
+        """
+        self.drop_policy = drop_policy
+        self.buffer_size = buffer_size
+        self.max_latency = max_latency
+        self.realtime = realtime
+    
+    def open(self, source):
+        return StreamReader(source, drop_policy=self.drop_policy, buffer_size=self.buffer_size,
+                            max_latency=self.max_latency, realtime=self.realtime)
+
+
+class StrideOptions:
+    """Detection aralığı
+    
+    Detector sadece her detect_every. frame'de çalışır, aradaki framelerde
+    trackler Kalman prediction ile ilerler ve sayım tahmini konumlar
+    üzerinden devam eder. adaptive=True ise aralık hareket / belirsizliğe
+    göre 1..max_stride arasında seçilir (sadece seri mod, batch 1).
+    """
+    
+    def __init__(self, detect_every=1, adaptive=False, max_stride=8):
+        self.detect_every = detect_every
+        self.adaptive = adaptive
+        self.max_stride = max_stride
+    
+    def scheduler(self):
+        return DetectionScheduler(stride=self.detect_every, adaptive=self.adaptive,
+                                  max_stride=self.max_stride)
+
+
+class CheckpointOptions:
+    """Headless çalışmada checkpoint / devam
+    
+    En fazla every saniyede bir tracker, counter, scheduler ve istatistiklerin
+    durumu, tracking.txt / events.csv'nin o ana kadarki boyutu ve cache'e
+    henüz yazılmamış detectionlar output_dir/checkpoint.npz'e atomik olarak
+    yazılır. resume=True ise checkpoint varsa dosyalar o boyuta kesilir ve
+    kalan framelerden devam edilir; çıktılar kesintisiz çalışmayla aynıdır.
+    Başarıyla biten çalışmada checkpoint silinir.
+    """
+    
+    def __init__(self, every=5.0, resume=False):
+        """
+        Args:
+            every: checkpoint aralığı, saniye (None: alınmaz, sadece devam)
+            resume: checkpoint varsa kaldığı yerden devam et
+        """
+        self.every = every
+        self.resume = resume
@@ -0,0 +1,699 @@
+import json
+import os
+import queue
+import threading
+import time
+
+import numpy as np
+import yaml
+from tqdm import tqdm
+
+from src.utils.video_io import VideoReader, VideoWriter
+from src.core.detector import PersonDetector
+from src.core.tracker import ByteTracker
+from src.core.roi import ROIPlanner
+from src.core.counter import LineCounter, MultiLineCounter, is_multi_config
+from src.utils.visualization import draw_tracks, draw_counting_line, draw_counts, draw_zone
+from src.utils.writers import TrackingWriter, EventWriter
+from src.utils.profiling import FrameProfiler
+from src.utils.checkpoint import save_checkpoint, load_checkpoint
+from src.options import RenderOptions, StrideOptions
+
+
+_DONE = object()  # kuyruk sonu işareti
+
+
+class StageStats:
+    """Stage başına süre ve throughput ölçümü"""
+    
+    def __init__(self, name):
+        self.name = name
+        self.items = 0
+        self.busy_time = 0.0  # iş yaparken geçen süre
+        self.wait_time = 0.0  # kuyrukta beklerken geçen süre
+    
+    def add(self, busy, wait=0.0, items=1):
+        self.busy_time += busy
+        self.wait_time += wait
+        self.items += items
+    
+    def summary(self):
+        return {
+            'items': self.items,
+            'busy_s': self.busy_time,
+            'wait_s': self.wait_time,
+            'fps': self.items / self.busy_time if self.busy_time > 0 else 0
+        }
+
+
+class DetectionStats:
+    """Detection istatistikleri için sabit bellekli running aggregate'ler
+    
+    Tüm confidence değerlerini saklamak yerine sayı, toplam, min/max ve
+    sabit bin'li histogram tutulur.
+    """
+    
+    def __init__(self, bins=10):
+        self.count = 0
+        self.conf_sum = 0.0
+        self.conf_min = None
+        self.conf_max = None
+        self.histogram = np.zeros(bins, dtype=np.int64)  # [0, 1] eşit aralıklı
+    
+    def add(self, confs):
+        """Bir frame'in confidence değerlerini ekle"""
+        confs = np.asarray(confs, dtype=np.float64)
+        if len(confs) == 0:
+            return
+        self.count += len(confs)
+        self.conf_sum += float(confs.sum())
+        self.conf_min = float(confs.min()) if self.conf_min is None else min(self.conf_min, float(confs.min()))
+        self.conf_max = float(confs.max()) if self.conf_max is None else max(self.conf_max, float(confs.max()))
+        
+        bins = len(self.histogram)
+        idx = np.clip((confs * bins).astype(np.int64), 0, bins - 1)
+        self.histogram += np.bincount(idx, minlength=bins)
+    
+    @property
+    def mean(self):
+        return self.conf_sum / self.count if self.count else 0
+    
+    def get_state(self):
+        return {
+            'count': np.int64(self.count),
+            'conf_sum': np.float64(self.conf_sum),
+            # min/max yoksa NaN
+            'conf_range': np.array([np.nan if v is None else v for v in (self.conf_min, self.conf_max)]),
+            'histogram': self.histogram
+        }
+    
+    def set_state(self, state):
+        self.count = int(state['count'])
+        self.conf_sum = float(state['conf_sum'])
+        self.conf_min, self.conf_max = (None if np.isnan(v) else v for v in state['conf_range'].tolist())
+        self.histogram = np.array(state['histogram'], dtype=np.int64)
+    
+    def summary(self, num_frames):
+        return {
+            'total_detections': self.count,
+            'avg_detections_per_frame': self.count / max(num_frames, 1),
+            'avg_confidence': self.mean,
+            'min_confidence': self.conf_min,
+            'max_confidence': self.conf_max,
+            'confidence_histogram': self.histogram.tolist()
+        }
+
+
+class _Worker(threading.Thread):
+    """Exception'ı saklayan stage thread'i"""
+    
+    def __init__(self, name, target):
+        super().__init__(name=name, daemon=True)
+        self._target_fn = target
+        self.error = None
+    
+    def run(self):
+        try:
+            self._target_fn()
+        except BaseException as e:
+            self.error = e
+
+
+def _put(q, item, alive):
+    """Kuyruğa koy, alive() False olursa bloklamadan çık"""
+    while alive():
+        try:
+            q.put(item, timeout=0.1)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+def run_sequence(sequence_name, input_dir=None, output_dir=None, detector=None,
+                 render=True, stream=None, stride=None, checkpoint=None,
+                 batch_size=1, prefetch=0, decode_workers=2, pipelined=False, queue_size=8,
+                 flush_every=1000, cache_dir=None, show_progress=True, max_frames=None,
+                 roi=None, multi_line=None, timeline=None, reduced_decode=None):
+    """Tek sequence için detection + tracking + counting
+    
+    Modlar (pipeline, headless, canlı kaynak, stride, ROI, çoklu çizgi,
+    timeline, küçültülmüş decode, checkpoint) README'de anlatılıyor.
+    
+    Args:
+        render: RenderOptions (True / False: her frame / headless)
+        stream: StreamOptions verilirse input_dir canlı kaynak
+        stride: StrideOptions (None: her frame'de detection)
+        checkpoint: CheckpointOptions (None: checkpoint yok)
+        cache_dir: detection cache klasörü (None: model.yaml'daki ayar)
+        roi, reduced_decode: None ise model.yaml'daki ayar
+        multi_line: None ise sequence birden fazla çizgi veya zone tanımlıyorsa
+        timeline: 'csv' / 'json' ise frame başına süreler output_dir'e
+    
+    Returns:
+        results dict (results.json içeriği + stage istatistikleri)
+    """
+    if not isinstance(render, RenderOptions):
+        render = RenderOptions(enabled=bool(render))
+    stride = stride or StrideOptions()
+    if input_dir is None:
+        input_dir = f'data/MOT17/train/{sequence_name}-SDP/img1/'
+    if output_dir is None:
+        output_dir = f'outputs/{sequence_name}'
+    os.makedirs(output_dir, exist_ok=True)
+    
+    # counting line config
+    with open('configs/counting_lines.yaml', 'r', encoding='utf-8') as f:
+        lines_config = yaml.safe_load(f)
+    if multi_line is None:
+        multi_line = is_multi_config(lines_config[sequence_name])
+    if timeline not in (None, False, 'csv', 'json'):
+        raise ValueError(f"timeline 'csv' veya 'json' olmalı: {timeline}")
+    
+    # checkpoint
+    checkpoint_path = os.path.join(output_dir, 'checkpoint.npz')
+    if stream is not None and checkpoint is not None:
+        raise ValueError("Checkpoint canlı kaynakta kullanılamaz")
+    saved = saved_meta = None
+    if checkpoint is not None and checkpoint.resume and os.path.exists(checkpoint_path):
+        if render.enabled:
+            raise ValueError("output.mp4 devam ettirilemez, resume sadece headless")
+        saved, saved_meta = load_checkpoint(checkpoint_path)
+    elif os.path.exists(checkpoint_path):
+        # çıktılar baştan yazılacak, eski checkpoint geçersiz
+        os.remove(checkpoint_path)
+    start_frame = int(saved['pipeline']['next_frame']) if saved else 0
+    
+    # pipeline
+    if detector is None:
+        detector = PersonDetector(cache_dir=cache_dir)
+    elif cache_dir is not None:
+        detector.cache_dir = cache_dir
+    if roi is not None:
+        detector.roi_config['enabled'] = roi
+    if reduced_decode is not None:
+        detector.reduced_decode = reduced_decode
+    if detector.roi_enabled and pipelined:
+        # croplar tracker'ın güncel durumuna bağlı
+        raise ValueError("ROI inference pipeline modunda kullanılamaz")
+    
+    scheduler = stride.scheduler()
+    if stride.adaptive:
+        # karar bir önceki frame'in tracker durumuna bağlı
+        if pipelined:
+            raise ValueError("adaptive stride pipeline modunda kullanılamaz")
+        batch_size = 1
+    
+    if pipelined:
+        # decode stage: en az kuyruk derinliği kadar prefetch
+        prefetch = max(prefetch, queue_size)
+    if stream is not None:
+        reader = stream.open(input_dir)
+    else:
+        # headless + sabit stride: detection olmayan frameler prefetch'te decode edilmesin
+        reader = VideoReader(input_dir, prefetch=prefetch, num_workers=decode_workers,
+                             decode_size=detector.decode_size, start_frame=start_frame,
+                             skip_fn=None if render.enabled else scheduler.skips)
+    detector.decode_scale = reader.decode_scale
+    
+    # Cache hit ve render yoksa frame'lere hiç gerek yok
+    cache_hit = False
+    if stream is None:
+        # sabit stride'da sadece detection yapılacak frameler cache'te olmalı
+        cache_frames = None
+        if not stride.adaptive:
+            end = reader.total_frames if max_frames is None else min(reader.total_frames, max_frames)
+            cache_frames = [i for i in range(start_frame, end) if not scheduler.skips(i)]
+        cache_hit = detector.open_cache(sequence_name, reader.total_frames, cache_frames)
+        if saved is not None and 'detection_cache' in saved and detector.cache is not None:
+            # kesilmeden önce detect edilen frameler
+            detector.cache.set_state(saved['detection_cache'])
+    skip_decode = cache_hit and not render.enabled
+    if skip_decode and reader.prefetch > 0:
+        reader.release()
+        reader = VideoReader(input_dir, start_frame=start_frame)
+    
+    frame_limit = max_frames if stream is not None else reader.total_frames
+    if max_frames is not None:
+        frame_limit = min(frame_limit, max_frames)
+    run = _SequenceRun(sequence_name, input_dir, output_dir, lines_config[sequence_name], detector,
+                       reader, scheduler, render, stride, stream, checkpoint, multi_line,
+                       batch_size, frame_limit, skip_decode, flush_every, timeline, saved, saved_meta)
+    
+    pbar = tqdm(total=frame_limit, initial=start_frame, desc="Processing", disable=not show_progress)
+    wall_start = time.perf_counter()
+    try:
+        if pipelined:
+            num_frames = _run_pipelined(run.read_batch, run.detect_batch, run.track_frame, run.render_frame,
+                                        queue_size, run.stats, pbar, start_frame)
+        else:
+            num_frames = run.run_serial(start_frame, pbar)
+        completed = True
+    except KeyboardInterrupt:
+        # Canlı kaynakta Ctrl+C normal bitiş
+        if stream is None:
+            completed = False
+            raise
+        completed = True
+        num_frames = run.stats['track'].items
+    except BaseException:
+        completed = False
+        raise
+    finally:
+        # Hata olsa bile o ana kadarki sonuçlar diskte kalsın
+        read_stats = run.close(completed)
+        pbar.close()
+    wall_time = time.perf_counter() - wall_start
+    if os.path.exists(checkpoint_path):
+        # tamamlandı, devam edilecek bir şey yok
+        os.remove(checkpoint_path)
+    
+    results = run.results(num_frames, read_stats)
+    timeline_path = None
+    if run.profiler is not None:
+        results['timings'] = run.profiler.summary()
+        timeline_path = str(run.profiler.save(os.path.join(output_dir, f'timeline.{timeline}')))
+    
+    results_path = os.path.join(output_dir, 'results.json')
+    with open(results_path, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2, ensure_ascii=False)
+    
+    # Stage raporu (results.json'a yazılmaz, çıktılar modlar arası aynı kalsın)
+    stage_report = {
+        'decode': {
+            'items': read_stats['frames'],
+            'busy_s': read_stats['decode_time'],
+            'wait_s': read_stats['wait_time'],
+            'fps': read_stats['frames'] / read_stats['decode_time'] if read_stats['decode_time'] > 0 else 0
+        }
+    }
+    stage_report.update({name: s.summary() for name, s in run.stats.items()})
+    
+    return {
+        **results,
+        'detection_cache': None if stream is not None else detector.cache_status,
+        'stages': stage_report,
+        'wall_time': wall_time,
+        'fps': (num_frames - start_frame) / wall_time if wall_time > 0 else 0,
+        'resumed_from': start_frame,
+        'paths': {
+            'video': run.video_path,
+            'tracking': run.tracking_path,
+            'results': results_path,
+            'events': run.events_path,
+            'timeline': timeline_path
+        }
+    }
+
+
+class _SequenceRun:
+    """run_sequence'ın frame döngüsü ve durumu
+    
+    read_batch -> detect_batch -> track_frame -> render_frame; seri modda
+    run_serial, pipeline modunda _run_pipelined çağırır. Tracker, counter,
+    writerlar ve sayaçlar burada tutulur, checkpoint de buradan yazılır.
+    """
+    
+    def __init__(self, sequence_name, input_dir, output_dir, lines, detector, reader, scheduler,
+                 render, stride, stream, checkpoint, multi_line, batch_size, frame_limit,
+                 skip_decode, flush_every, timeline, saved=None, saved_meta=None):
+        self.sequence_name = sequence_name
+        self.input_dir = input_dir
+        self.detector = detector
+        self.reader = reader
+        self.scheduler = scheduler
+        self.render = render
+        self.stride = stride
+        self.stream = stream
+        self.checkpoint = checkpoint
+        self.multi_line = multi_line
+        self.batch_size = batch_size
+        self.frame_limit = frame_limit
+        self.skip_decode = skip_decode
+        # küçültülmüş decode'da render için frame ayrıca tam çözünürlükte okunur
+        self.reduced = reader.decode_scale > 1
+        self.checkpoint_path = os.path.join(output_dir, 'checkpoint.npz')
+        
+        self.tracker = ByteTracker()
+        if multi_line:
+            self.counter = MultiLineCounter(sequence_name)
+            self.draw_lines = [
+                (tuple(start), tuple(end), tuple(line.get('color', (0, 255, 0))), line.get('thickness', 3))
+                for start, end, line in zip(self.counter.line_starts, self.counter.line_ends, self.counter.lines)
+            ]
+            self.draw_zones = [(zone['polygon'], tuple(zone.get('color', (255, 200, 0))))
+                               for zone in self.counter.zones]
+        else:
+            self.counter = LineCounter(sequence_name)
+            self.draw_lines = [(self.counter.line_start, self.counter.line_end, (0, 255, 0), 3)]
+            self.draw_zones = []
+        self.roi_planner = None
+        if detector.roi_enabled:
+            self.roi_planner = ROIPlanner(detector.roi_config, lines, (reader.width, reader.height))
+        
+        # video writer (headless modda yok)
+        self.video_path = os.path.join(output_dir, 'output.mp4') if render.enabled else None
+        self.writer = None
+        if render.enabled:
+            self.writer = VideoWriter(self.video_path, fps=reader.fps, width=reader.width, height=reader.height)
+        
+        # devam ederken checkpoint'teki ayarlar aynı olmalı
+        self.meta = json.loads(json.dumps({
+            'sequence': sequence_name,
+            'input_dir': str(input_dir),
+            'detection': detector.config,
+            'decode_scale': reader.decode_scale,
+            'tracker': self.tracker.config,
+            'lines': lines,
+            'multi_line': multi_line,
+            'stride': [stride.detect_every, stride.adaptive, stride.max_stride]
+        }, sort_keys=True))
+        if saved is not None:
+            changed = [key for key in self.meta if saved_meta.get(key) != self.meta[key]]
+            if changed:
+                raise ValueError(f"Checkpoint farklı ayarlarla alınmış ({', '.join(changed)}): "
+                                 f"{self.checkpoint_path}")
+        
+        # Tracking sonuçları (MOT format) ve eventler akış halinde yazılır
+        self.tracking_path = os.path.join(output_dir, 'tracking.txt')
+        self.events_path = os.path.join(output_dir, 'events.csv')
+        tracking_resume = events_resume = None
+        if saved is not None:
+            tracking_resume = saved['pipeline']['tracking_file'].tolist()
+            events_resume = saved['pipeline']['events_file'].tolist()
+        self.tracking_writer = TrackingWriter(self.tracking_path, flush_every=flush_every,
+                                              resume_from=tracking_resume)
+        self.event_writer = EventWriter(self.events_path, with_line=multi_line, flush_every=flush_every,
+                                        resume_from=events_resume)
+        
+        self.detection_stats = DetectionStats()
+        self.stats = {name: StageStats(name) for name in ('detect', 'track', 'render')}
+        self.latency = {'count': 0, 'sum': 0.0, 'max': 0.0}  # capture -> tracking sonu
+        self.detected_frames = 0
+        self.roi_stats = {'frames': 0, 'crops': 0, 'pixels': 0}
+        self.last_idx = -1
+        self.profiler = FrameProfiler() if timeline else None
+        if saved is not None:
+            state = saved['pipeline']
+            self.tracker.set_state(saved['tracker'])
+            self.counter.set_state(saved['counter'])
+            scheduler.set_state(saved['scheduler'])
+            self.detection_stats.set_state(saved['detection_stats'])
+            self.last_idx = int(state['last_idx'])
+            self.detected_frames = int(state['detected_frames'])
+            self.roi_stats.update(zip(('frames', 'crops', 'pixels'), state['roi_stats'].tolist()))
+        self.last_checkpoint = time.monotonic()
+    
+    def run_serial(self, start_frame, pbar):
+        """Seri mod: batch oku, detect, frame sırasıyla track / render"""
+        num_frames = start_frame
+        while self.frame_limit is None or num_frames < self.frame_limit:
+            frames, keys = self.read_batch(num_frames)
+            if not frames:
+                break
+            
+            # tracker'a orijinal frame sırasıyla ver
+            for frame, detections, key in zip(frames, self.detect_batch(frames, keys), keys):
+                tracks, counts, should_render = self.track_frame(key, detections)
+                if should_render:
+                    self.render_frame(frame, tracks, counts, key[0])
+                num_frames += 1
+                pbar.update(1)
+            
+            if len(frames) < self.batch_size:
+                break
+        return num_frames
+    
+    def save_state(self, next_frame):
+        """Bu frame işlendikten sonraki durum"""
+        state = {
+            'pipeline': {
+                'next_frame': next_frame,
+                'last_idx': self.last_idx,
+                'detected_frames': self.detected_frames,
+                'roi_stats': [self.roi_stats['frames'], self.roi_stats['crops'], self.roi_stats['pixels']],
+                'tracking_file': self.tracking_writer.checkpoint(),
+                'events_file': self.event_writer.checkpoint()
+            },
+            'tracker': self.tracker.get_state(),
+            'counter': self.counter.get_state(),
+            'scheduler': self.scheduler.get_state(),
+            'detection_stats': self.detection_stats.get_state()
+        }
+        if self.detector.cache is not None and not self.detector.cache_hit:
+            # henüz diske yazılmamış detectionlar, devam eden çalışma cache'i tamamlasın
+            state['detection_cache'] = self.detector.cache.get_state()
+        save_checkpoint(self.checkpoint_path, state, self.meta)
+    
+    def read_batch(self, limit):
+        """batch_size kadar frame oku
+        
+        Returns:
+            frames, keys: keys[i] = (frame indeksi, capture zamanı veya None,
+            detection yapılacak mı)
+        """
+        reader = self.reader
+        frames, keys = [], []
+        while len(frames) < self.batch_size and (self.frame_limit is None or
+                                                 limit + len(frames) < self.frame_limit):
+            start = time.perf_counter()
+            if self.stream is not None:
+                ret, frame = reader.read()
+                if not ret:
+                    break
+                frame_idx, captured_at = reader.last_index, reader.last_timestamp
+                detect = self.scheduler.should_detect(frame_idx, self.tracker)
+            else:
+                frame_idx, captured_at = limit + len(keys), None
+                detect = self.scheduler.should_detect(frame_idx, self.tracker)
+                if self.skip_decode or (not detect and (not self.render.enabled or self.reduced)):
+                    ret, frame = reader.skip(), None
+                else:
+                    ret, frame = reader.read()
+                if not ret:
+                    break
+            if self.profiler is not None:
+                self.profiler.record(frame_idx, read=time.perf_counter() - start)
+            frames.append(frame)
+            keys.append((frame_idx, captured_at, detect))
+        return frames, keys
+    
+    def detect_batch(self, frames, keys):
+        """Detection frame'leri için detector, diğerleri için None"""
+        idx = [i for i, key in enumerate(keys) if key[2]]
+        batch_detections = [None] * len(frames)
+        if not idx:
+            return batch_detections
+        
+        start = time.perf_counter()
+        frame_ids = None if self.stream is not None else [keys[i][0] for i in idx]
+        if self.roi_planner is None:
+            detected = self.detector.detect_batch([frames[i] for i in idx], frame_ids)
+        else:
+            # tracklerin bu frame'deki tahmini konumları
+            rois = []
+            for i in idx:
+                dt = keys[i][0] - self.last_idx if self.last_idx >= 0 else 1
+                frame_rois = self.roi_planner.plan(self.tracker.predicted_boxes(dt))
+                self.roi_stats['frames'] += 1
+                self.roi_stats['crops'] += len(frame_rois)
+                self.roi_stats['pixels'] += int(((frame_rois[:, 2] - frame_rois[:, 0]) *
+                                                 (frame_rois[:, 3] - frame_rois[:, 1])).sum())
+                rois.append(frame_rois)
+            detected = self.detector.detect_batch([frames[i] for i in idx], frame_ids, rois=rois)
+        for i, detections in zip(idx, detected):
+            batch_detections[i] = detections
+        elapsed = time.perf_counter() - start
+        self.stats['detect'].add(elapsed, items=len(idx))
+        if self.profiler is not None:
+            # batch süresi framelere eşit bölünür
+            for i in idx:
+                self.profiler.record(keys[i][0], detect=elapsed / len(idx),
+                                     num_detections=len(batch_detections[i]))
+        return batch_detections
+    
+    def track_frame(self, key, detections):
+        frame_idx, captured_at, _ = key
+        start = time.perf_counter()
+        
+        # tracking (atlanan frameler için dt > 1)
+        dt = frame_idx - self.last_idx if self.last_idx >= 0 else 1
+        self.last_idx = frame_idx
+        if detections is None:
+            tracks = self.tracker.predict_only(dt=dt)
+        else:
+            self.detected_frames += 1
+            if len(detections) > 0:
+                self.detection_stats.add(detections[:, 4])
+            tracks = self.tracker.update(detections, dt=dt)
+        t_track = time.perf_counter()
+        self.tracking_writer.write_tracks(tracks, frame_idx + 1)
+        t_write = time.perf_counter()
+        
+        # counting
+        self.counter.update(tracks, frame_idx + 1)
+        new_events = self.counter.pop_events()
+        t_count = time.perf_counter()
+        self.event_writer.write_events(new_events)
+        counts = self.counter.get_counts()
+        every = self.checkpoint.every if self.checkpoint is not None else None
+        if every is not None and time.monotonic() - self.last_checkpoint >= every:
+            self.save_state(frame_idx + 1)
+            self.last_checkpoint = time.monotonic()
+        end = time.perf_counter()
+        self.stats['track'].add(end - start)
+        if self.profiler is not None:
+            self.profiler.record(frame_idx, count=t_count - t_write, write=(t_write - t_track) + (end - t_count),
+                                 num_tracks=len(tracks), **self.tracker.timings)
+        if captured_at is not None:
+            elapsed = time.monotonic() - captured_at
+            self.latency['count'] += 1
+            self.latency['sum'] += elapsed
+            self.latency['max'] = max(self.latency['max'], elapsed)
+        return tracks, counts, self.render.should_render(frame_idx, len(new_events))
+    
+    def render_frame(self, frame, tracks, counts, frame_idx):
+        start = time.perf_counter()
+        frame_vis = self.reader.read_full(frame_idx) if self.reduced else frame.copy()
+        draw_tracks(frame_vis, tracks)
+        for line_start, line_end, color, thickness in self.draw_lines:
+            draw_counting_line(frame_vis, line_start, line_end, color, thickness)
+        for polygon, color in self.draw_zones:
+            draw_zone(frame_vis, polygon, color)
+        draw_counts(frame_vis, counts)
+        t_draw = time.perf_counter()
+        self.writer.write(frame_vis)
+        end = time.perf_counter()
+        self.stats['render'].add(end - start)
+        if self.profiler is not None:
+            self.profiler.record(frame_idx, draw=t_draw - start, write=end - t_draw)
+    
+    def close(self, completed):
+        """Cache, writerlar ve reader'ı kapat
+        
+        Returns:
+            reader istatistikleri
+        """
+        self.detector.close_cache(save=completed)
+        self.tracking_writer.close()
+        self.event_writer.close()
+        read_stats = self.reader.get_stats()
+        self.reader.release()
+        if self.writer is not None:
+            self.writer.release()
+        return read_stats
+    
+    def results(self, num_frames, read_stats):
+        """results.json içeriği"""
+        final_counts = self.counter.get_counts()
+        results = {
+            'sequence': self.sequence_name,
+            'total_frames': num_frames,
+            'detection_stats': self.detection_stats.summary(self.detected_frames),
+            'counts': {
+                'entry': final_counts['entry'],
+                'exit': final_counts['exit'],
+                'total_crossings': final_counts['total_crossings'],
+                'unique_tracks': final_counts['unique_tracks']
+            }
+        }
+        if self.multi_line:
+            results['lines'] = self.counter.get_line_counts()
+            if self.counter.zones:
+                results['zones'] = self.counter.get_zone_stats(self.reader.fps)
+        
+        if self.reduced:
+            results['decode_scale'] = self.reader.decode_scale
+        roi_stats = self.roi_stats
+        if roi_stats['frames']:
+            frames_px = roi_stats['frames'] * self.reader.width * self.reader.height
+            results['roi'] = {
+                'crops_per_frame': roi_stats['crops'] / roi_stats['frames'],
+                'pixel_ratio': roi_stats['pixels'] / frames_px
+            }
+        if self.scheduler.enabled:
+            results['stride'] = {
+                'detect_every': self.stride.detect_every,
+                'adaptive': self.stride.adaptive,
+                'detected_frames': self.detected_frames
+            }
+        if self.stream is not None:
+            latency = self.latency
+            results['stream'] = {
+                'source': str(self.input_dir),
+                'drop_policy': self.stream.drop_policy,
+                'captured': read_stats['captured'],
+                'dropped': read_stats['dropped'],
+                'drop_rate': read_stats['drop_rate'],
+                'avg_latency_ms': latency['sum'] / latency['count'] * 1000 if latency['count'] else 0,
+                'max_latency_ms': latency['max'] * 1000,
+                'avg_queue_latency_ms': read_stats['avg_queue_latency_ms']
+            }
+        return results
+
+
+def _run_pipelined(read_batch, detect_batch, track_frame, render_frame,
+                   queue_size, stats, pbar, start_frame=0):
+    """decode -> detect -> track/count -> render/encode, aralarında sınırlı kuyruklar"""
+    det_queue = queue.Queue(maxsize=queue_size)
+    render_queue = queue.Queue(maxsize=queue_size)
+    stop = threading.Event()
+    running = lambda: not stop.is_set()
+    
+    def detect_loop():
+        num_read = start_frame
+        while not stop.is_set():
+            frames, keys = read_batch(num_read)
+            if not frames:
+                break
+            batch_detections = detect_batch(frames, keys)
+            num_read += len(frames)
+            for item in zip(frames, batch_detections, keys):
+                if not _put(det_queue, item, running):
+                    return
+        _put(det_queue, _DONE, running)
+    
+    def render_loop():
+        while True:
+            start = time.perf_counter()
+            item = render_queue.get()
+            stats['render'].wait_time += time.perf_counter() - start
+            if item is _DONE:
+                break
+            render_frame(*item)
+    
+    workers = [_Worker('detect', detect_loop), _Worker('render', render_loop)]
+    for worker in workers:
+        worker.start()
+    
+    num_frames = start_frame
+    try:
+        while True:
+            start = time.perf_counter()
+            try:
+                item = det_queue.get(timeout=0.5)
+            except queue.Empty:
+                if not workers[0].is_alive():
+                    break
+                continue
+            finally:
+                stats['track'].wait_time += time.perf_counter() - start
+            if item is _DONE:
+                break
+            
+            frame, detections, key = item
+            tracks, counts, should_render = track_frame(key, detections)
+            num_frames += 1
+            if should_render and not _put(render_queue, (frame, tracks, counts, key[0]), workers[1].is_alive):
+                break
+            pbar.update(1)
+    finally:
+        _put(render_queue, _DONE, workers[1].is_alive)
+        workers[1].join()
+        stop.set()
+        workers[0].join()
+    
+    for worker in workers:
+        if worker.error is not None:
+            raise worker.error
+    return num_frames
@@ -0,0 +1,345 @@
+"""
+Birden fazla kamera için paylaşımlı inference server
+
+Tek process PersonDetector modelini tutar, kamera pipeline'ları frameleri
+Unix socket üzerinden gönderir. Piksel verisi socket'ten geçmez: client
+frameleri /dev/shm'deki bir dosyaya (mmap) yazar, server aynı dosyayı
+mmap ile okur; socket'ten sadece konum / boyut ve sonuç bboxları geçer.
+
+Server farklı kameralardan gelen istekleri dinamik batch'lerde toplar: ilk
+istekten sonra en fazla max_wait saniye ya da max_batch frame dolana kadar
+beklenir, hepsi tek model çağrısında işlenir. Her client'ın aynı anda tek
+isteği olabildiği için bağlı tüm clientlar batch'teyse beklenmez. Model
+meşgulken biriken istekler beklemeden bir sonraki batch'e girer.
+
+Kamera tarafında tracker, counter, ROI, detection cache ve küçültülmüş
+decode aynen çalışır (RemoteDetector bir PersonDetector'dır), sadece model
+çağrısı server'a gider.
+"""
+import mmap
+import os
+import queue
+import tempfile
+import threading
+import time
+from multiprocessing.connection import Client, Listener
+
+import numpy as np
+
+from src.core.detector import PersonDetector
+
+
+# Client frame buffer'ı için RAM tabanlı dosya sistemi (yoksa temp klasörü)
+SHM_DIR = '/dev/shm' if os.path.isdir('/dev/shm') else None
+
+# Kamera tarafında kalan ayarlar (diğerleri server'ın model config'inden)
+LOCAL_KEYS = ('roi', 'reduced_decode', 'use_cache', 'cache_dir')
+
+_STOP = object()  # batch thread'i için durma işareti
+
+
+def server_config(config):
+    """model.yaml 'detection' -> 'server' ayarları (varsayılanlarla)"""
+    server = config.get('server', {})
+    return {
+        'socket': server.get('socket', '/tmp/mot17-detector.sock'),
+        'max_batch': server.get('max_batch', 8),
+        'max_wait_ms': server.get('max_wait_ms', 5)
+    }
+
+
+class _Request:
+    """Tek client isteği: bir veya birkaç frame"""
+    
+    __slots__ = ('frames', 'arrival', 'done', 'result', 'error')
+    
+    def __init__(self, frames):
+        self.frames = frames
+        self.arrival = time.monotonic()
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class InferenceServer:
+    """Unix socket üzerinden dinamik batch'li detection servisi
+    
+    Her client bağlantısı ayrı thread'de okunur, istekler tek kuyrukta
+    toplanır; model sadece batch thread'inde çağrılır.
+    """
+    
+    def __init__(self, detector=None, address=None, max_batch=None, max_wait=None):
+        """
+        Args:
+            detector: PersonDetector (None: model.yaml'dan)
+            address: Unix socket yolu (None: model.yaml server.socket)
+            max_batch: tek model çağrısında en fazla frame
+            max_wait: ilk istekten sonra batch'in dolması için en fazla bekleme (saniye)
+        """
+        self.detector = detector or PersonDetector()
+        config = server_config(self.detector.config)
+        self.address = address or config['socket']
+        self.max_batch = max_batch or config['max_batch']
+        self.max_wait = config['max_wait_ms'] / 1000 if max_wait is None else max_wait
+        
+        self._queue = queue.Queue()
+        self._listener = None
+        self._threads = []
+        self._lock = threading.Lock()
+        self._clients = 0  # bağlı client sayısı
+        self._stats = {'requests': 0, 'frames': 0, 'batches': 0, 'infer_s': 0.0, 'queue_wait_s': 0.0,
+                       'batch_sizes': np.zeros(self.max_batch + 1, dtype=np.int64)}
+    
+    def start(self):
+        """Socket'i aç, accept ve batch thread'lerini başlat"""
+        if os.path.exists(self.address):
+            # önceki çalışmadan kalan socket dosyası
+            os.remove(self.address)
+        # istekler pickle, sadece aynı kullanıcı bağlanabilsin: socket dosyası
+        # baştan sadece sahibine açık oluşturulur (sonradan chmod'a kadar açık kalmasın)
+        umask = os.umask(0o077)
+        try:
+            self._listener = Listener(self.address, family='AF_UNIX', backlog=64)
+        finally:
+            os.umask(umask)
+        
+        # model bağlantı gelmeden yüklensin (ilk isteğin gecikmesine girmesin)
+        self.detector.model
+        for target in (self._batch_loop, self._accept_loop):
+            thread = threading.Thread(target=target, daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        return self
+    
+    def close(self):
+        """Yeni bağlantı kabul etme, batch thread'ini durdur"""
+        if self._listener is not None:
+            self._listener.close()  # socket dosyasını da siler
+            self._listener = None
+        self._queue.put(_STOP)
+        for thread in self._threads:
+            thread.join(timeout=5)
+        self._threads = []
+    
+    def __enter__(self):
+        return self.start()
+    
+    def __exit__(self, *exc):
+        self.close()
+    
+    def stats(self):
+        """Toplam istek / frame / batch sayıları ve süreler"""
+        with self._lock:
+            stats = dict(self._stats)
+            sizes = stats.pop('batch_sizes').copy()
+        stats['clients'] = self._clients
+        stats['mean_batch'] = stats['frames'] / stats['batches'] if stats['batches'] else 0
+        stats['batch_sizes'] = {int(size): int(n) for size, n in enumerate(sizes) if n}
+        return stats
+    
+    def _accept_loop(self):
+        while True:
+            try:
+                conn = self._listener.accept()
+            except (OSError, AttributeError):
+                # close() ile listener kapatıldı
+                return
+            threading.Thread(target=self._serve_client, args=(conn,), daemon=True).start()
+    
+    def _serve_client(self, conn):
+        """Tek client: istekleri oku, batch kuyruğuna ekle, sonucu gönder"""
+        buffers = {}  # client frame buffer'ları: yol -> mmap
+        with self._lock:
+            self._clients += 1
+        try:
+            conn.send(('ok', {'config': self.detector.config, 'max_batch': self.max_batch,
+                              'max_wait': self.max_wait}))
+            while True:
+                command, *args = conn.recv()
+                if command == 'detect':
+                    request = _Request(self._frames(buffers, *args))
+                    self._queue.put(request)
+                    request.done.wait()
+                    request.frames = None  # mmap görünümleri bırakılsın
+                    if request.error is not None:
+                        conn.send(('error', request.error))
+                    else:
+                        conn.send(('ok', request.result))
+                elif command == 'stats':
+                    conn.send(('ok', self.stats()))
+                else:
+                    conn.send(('error', f"Bilinmeyen komut: {command}"))
+        except (EOFError, OSError):
+            # client bağlantıyı kapattı
+            pass
+        finally:
+            with self._lock:
+                self._clients -= 1
+            buffers.clear()
+            conn.close()
+    
+    @staticmethod
+    def _frames(buffers, path, layout):
+        """Client buffer'ındaki frameler (kopyasız numpy görünümleri)
+        
+        Args:
+            path: client'ın frame dosyası
+            layout: [(offset, shape), ...] uint8 frameler
+        """
+        end = max((offset + int(np.prod(shape)) for offset, shape in layout), default=0)
+        buffer = buffers.get(path)
+        if buffer is None or len(buffer) < end:
+            # client buffer'ı büyüttü, yeniden map et
+            with open(path, 'rb') as f:
+                buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            buffers[path] = buffer
+        return [np.ndarray(shape, dtype=np.uint8, buffer=buffer, offset=offset) for offset, shape in layout]
+    
+    def _batch_loop(self):
+        """İstekleri max_batch / max_wait'e göre topla, tek model çağrısında işle"""
+        carry = None
+        while True:
+            first = carry if carry is not None else self._queue.get()
+            carry = None
+            if first is _STOP:
+                return
+            
+            batch, size = [first], len(first.frames)
+            deadline = first.arrival + self.max_wait
+            # bağlı her client zaten batch'teyse yeni istek gelemez
+            while size < self.max_batch and len(batch) < self._clients:
+                timeout = deadline - time.monotonic()
+                try:
+                    item = self._queue.get(timeout=timeout) if timeout > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is _STOP or size + len(item.frames) > self.max_batch:
+                    # sığmayan istek bir sonraki batch'in ilki
+                    carry = item
+                    break
+                batch.append(item)
+                size += len(item.frames)
+            self._run_batch(batch)
+    
+    def _run_batch(self, batch):
+        frames = [frame for request in batch for frame in request.frames]
+        start = time.monotonic()
+        try:
+            boxes = self.detector.model(frames)
+            error = None
+        except Exception as e:
+            boxes, error = None, f"{type(e).__name__}: {e}"
+        elapsed = time.monotonic() - start
+        
+        with self._lock:
+            stats = self._stats
+            stats['requests'] += len(batch)
+            stats['frames'] += len(frames)
+            stats['batches'] += 1
+            stats['infer_s'] += elapsed
+            stats['queue_wait_s'] += sum(start - request.arrival for request in batch)
+            stats['batch_sizes'][min(len(frames), self.max_batch)] += 1
+        
+        i = 0
+        for request in batch:
+            if error is None:
+                request.result = boxes[i:i + len(request.frames)]
+                i += len(request.frames)
+            else:
+                request.error = error
+            request.done.set()
+
+
+class RemoteBackend:
+    """Backend arayüzü (backend(images) -> [(K, 5), ...]), model server'da
+    
+    Frameler her çağrıda client'ın /dev/shm dosyasına yazılır; dosya
+    gerekirse büyütülür. Çağrı server cevap verene kadar bekler.
+    """
+    
+    def __init__(self, address):
+        self.address = address
+        self._conn = Client(address, family='AF_UNIX')
+        self.info = self._receive()
+        fd, self.path = tempfile.mkstemp(prefix='mot17-frames-', dir=SHM_DIR)
+        self._file = os.fdopen(fd, 'r+b')
+        self._buffer = None
+    
+    def __call__(self, images):
+        if len(images) == 0:
+            return []
+        layout, offset = [], 0
+        for image in images:
+            layout.append((offset, image.shape))
+            offset += image.nbytes
+        self._reserve(offset)
+        
+        for image, (start, shape) in zip(images, layout):
+            self._buffer[start:start + image.nbytes] = np.ascontiguousarray(image, dtype=np.uint8).reshape(-1)
+        self._conn.send(('detect', self.path, layout))
+        return self._receive()
+    
+    def stats(self):
+        """Server istatistikleri (tüm clientlar)"""
+        self._conn.send(('stats',))
+        return self._receive()
+    
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+            self._buffer = None
+            self._file.close()
+            os.remove(self.path)
+    
+    def __del__(self):
+        try:
+            self.close()
+        except Exception:
+            pass
+    
+    def _reserve(self, size):
+        """Buffer en az size byte olsun"""
+        if self._buffer is not None and len(self._buffer) >= size:
+            return
+        # tekrar tekrar büyütmemek için 2'nin katına yuvarla
+        capacity = 1 << max(int(size - 1).bit_length(), 20)
+        self._file.truncate(capacity)
+        self._buffer = np.memmap(self._file, dtype=np.uint8, mode='r+', shape=(capacity,))
+    
+    def _receive(self):
+        status, payload = self._conn.recv()
+        if status != 'ok':
+            raise RuntimeError(f"Inference server hatası: {payload}")
+        return payload
+
+
+class RemoteDetector(PersonDetector):
+    """Modeli InferenceServer'da çalışan PersonDetector
+    
+    Model ayarları (model, backend, imgsz, threshold'lar) server'dan alınır,
+    böylece detection cache key'i server'ın modeline göre oluşur. ROI,
+    küçültülmüş decode ve cache kamera tarafında, local model.yaml'a göre.
+    """
+    
+    def __init__(self, address=None, config_path="configs/model.yaml", cache_dir=None, roi=None):
+        """
+        Args:
+            address: server socket'i (None: model.yaml server.socket)
+            config_path, cache_dir, roi: PersonDetector ile aynı
+        """
+        super().__init__(config_path, cache_dir=cache_dir, roi=roi)
+        self.address = address or server_config(self.config)['socket']
+        self._model = RemoteBackend(self.address)
+        
+        local = {key: self.config[key] for key in LOCAL_KEYS if key in self.config}
+        self.config = {**self._model.info['config'], **local}
+        self.conf_thresh = self.config['confidence_threshold']
+        self.iou_thresh = self.config['iou_threshold']
+        self.device = self.config['device']
+    
+    def server_stats(self):
+        return self._model.stats()
+    
+    def close(self):
+        self._model.close()
@@ -0,0 +1,352 @@
+"""
+Tek sequence'ın zamansal parçalara bölünerek paralel işlenmesi
+
+Sequence örtüşen frame pencerelerine bölünür, her pencerede detector +
+ByteTracker ayrı bir process'te çalışır. Pencere sınırlarında track ID'leri
+örtüşen framelerdeki IoU uyumuna göre birleştirilir (stitching), sayım
+birleştirilmiş trackler üzerinden sırayla yapılır; sınırda geçişler iki kez
+sayılmaz ve kaybolmaz.
+"""
+import json
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import yaml
+from scipy.optimize import linear_sum_assignment
+
+from src.core.counter import LineCounter, MultiLineCounter, is_multi_config
+from src.core.stride import DetectionScheduler
+from src.core.tracker import ByteTracker
+from src.pipeline import DetectionStats
+from src.utils.geometry import pairwise_iou
+from src.utils.video_io import VideoReader
+from src.utils.writers import TrackingWriter, EventWriter
+
+
+# Worker process başına tek detector (model bir kez yüklenir)
+_detector = None
+
+
+def _init_worker(cache_dir, torch_threads):
+    """Worker başlangıcı: torch thread sayısı + model yükleme"""
+    global _detector
+    if torch_threads:
+        import torch
+        torch.set_num_threads(torch_threads)
+    
+    from src.core.detector import PersonDetector
+    _detector = PersonDetector(cache_dir=cache_dir)
+
+
+def plan_windows(total_frames, num_shards, overlap):
+    """Frame pencereleri
+    
+    Frameler num_shards eşit parçaya (core) bölünür, ilki hariç her pencere
+    overlap frame geriden başlar. Her frame'in çıktısı core'unu içeren
+    pencereden alınır; örtüşen kısım sadece stitching ve tracker'ın
+    ısınması içindir.
+    
+    Returns:
+        [(start, core_start, end), ...] 0'dan başlayan frame indeksleri, end hariç
+    """
+    bounds = np.linspace(0, total_frames, max(1, num_shards) + 1).round().astype(np.int64)
+    return [
+        (max(0, int(a) - overlap), int(a), int(b))
+        for a, b in zip(bounds[:-1], bounds[1:]) if b > a
+    ]
+
+
+def run_window(sequence_name, input_dir, window, batch_size=1, detect_every=1, detector=None):
+    """Bir pencerede detection + tracking (worker içinde)
+    
+    Returns:
+        dict: frames (N,) frame indeksleri, tracks (N, 6) [x1, y1, x2, y2, id, conf]
+        (framelere göre sıralı, frame içinde tracker sırası), core'daki
+        detection confidence'ları, detection yapılan frame sayısı ve süre
+    """
+    detector = detector or _detector
+    start, core_start, end = window
+    wall_start = time.perf_counter()
+    
+    reader = VideoReader(input_dir, decode_size=detector.decode_size, start_frame=start)
+    detector.decode_scale = reader.decode_scale
+    end = min(end, reader.total_frames)
+    
+    tracker = ByteTracker()
+    scheduler = DetectionScheduler(stride=detect_every)
+    cache_hit = detector.open_cache(sequence_name, reader.total_frames,
+                                    [i for i in range(start, end) if not scheduler.skips(i)])
+    frames, rows, confs = [], [], []
+    detected_frames = 0
+    last_idx = -1
+    try:
+        frame_idx = start
+        while frame_idx < end:
+            ids = list(range(frame_idx, min(frame_idx + batch_size, end)))
+            detect = [scheduler.should_detect(i) for i in ids]
+            batch = []
+            for i, d in zip(ids, detect):
+                if cache_hit or not d:
+                    reader.skip()
+                    batch.append(None)
+                else:
+                    batch.append(reader.read()[1])
+            
+            det_idx = [k for k, d in enumerate(detect) if d]
+            detections = [None] * len(ids)
+            if det_idx:
+                detected = detector.detect_batch([batch[k] for k in det_idx], [ids[k] for k in det_idx])
+                for k, boxes in zip(det_idx, detected):
+                    detections[k] = boxes
+            
+            for i, boxes in zip(ids, detections):
+                dt = i - last_idx if last_idx >= 0 else 1
+                last_idx = i
+                if boxes is None:
+                    tracks = tracker.predict_only(dt=dt)
+                else:
+                    tracks = tracker.update(boxes, dt=dt)
+                    if i >= core_start:
+                        detected_frames += 1
+                        confs.append(np.asarray(boxes)[:, 4] if len(boxes) else np.zeros(0))
+                frames.append(np.full(len(tracks), i, dtype=np.int64))
+                rows.append(np.asarray(tracks, dtype=np.float64).reshape(-1, 6))
+            frame_idx = ids[-1] + 1
+    finally:
+        # pencere sadece sequence'ın bir kısmı, kısmi cache yazılmaz
+        detector.close_cache(save=False)
+        reader.release()
+    
+    return {
+        'window': (start, core_start, end),
+        'frames': np.concatenate(frames) if frames else np.zeros(0, dtype=np.int64),
+        'tracks': np.concatenate(rows) if rows else np.zeros((0, 6)),
+        'confs': np.concatenate(confs) if confs else np.zeros(0),
+        'detected_frames': detected_frames,
+        'elapsed_s': time.perf_counter() - wall_start,
+        'cache_hit': cache_hit,
+        'worker_pid': os.getpid()
+    }
+
+
+def _frame_rows(frames, frame_idx):
+    lo, hi = np.searchsorted(frames, [frame_idx, frame_idx + 1])
+    return slice(lo, hi)
+
+
+def match_seam(prev, cur, iou_thresh=0.5, min_agreement=0.5):
+    """İki ardışık pencerenin örtüşen framelerindeki track ID eşleşmesi
+    
+    Her örtüşen framede iki pencerenin trackleri arasında IoU >= iou_thresh
+    olan çiftler sayılır; sayılar Hungarian ile birebir eşleştirilir. Yeni
+    penceredeki track örtüşmede görüldüğü framelerin en az min_agreement
+    kadarında uyuşmuyorsa eşleşmez (yeni ID alır).
+    
+    Returns:
+        {cur local id: prev local id}
+    """
+    start, core_start, _ = cur['window']
+    pairs, seen = [], []
+    for frame_idx in range(start, core_start):
+        a = prev['tracks'][_frame_rows(prev['frames'], frame_idx)]
+        b = cur['tracks'][_frame_rows(cur['frames'], frame_idx)]
+        seen.append(b[:, 4])
+        if len(a) == 0 or len(b) == 0:
+            continue
+        rows, cols = np.nonzero(pairwise_iou(a[:, :4], b[:, :4]) >= iou_thresh)
+        pairs.append(np.stack([a[rows, 4], b[cols, 4]], axis=1))
+    
+    pairs = np.concatenate(pairs) if pairs else np.zeros((0, 2))
+    if len(pairs) == 0:
+        return {}
+    a_ids, a_inv = np.unique(pairs[:, 0], return_inverse=True)
+    b_ids, b_inv = np.unique(pairs[:, 1], return_inverse=True)
+    agreement = np.zeros((len(a_ids), len(b_ids)))
+    np.add.at(agreement, (a_inv, b_inv), 1)
+    
+    seen_ids, seen_counts = np.unique(np.concatenate(seen), return_counts=True)
+    present = seen_counts[np.searchsorted(seen_ids, b_ids)]
+    rows, cols = linear_sum_assignment(agreement, maximize=True)
+    ok = agreement[rows, cols] >= min_agreement * present[cols]
+    return {int(b_ids[c]): int(a_ids[r]) for r, c in zip(rows[ok], cols[ok])}
+
+
+def stitch(results, iou_thresh=0.5, min_agreement=0.5):
+    """Pencere çıktılarını global ID'li tek track dizisine birleştir
+    
+    Her frame core'unu içeren pencereden alınır. İlk pencerenin ID'leri
+    aynen kalır; sonrakilerde önceki pencereyle eşleşen track onun global
+    ID'sini alır, eşleşmeyenlere sırayla yeni ID verilir.
+    
+    Returns:
+        frames (N,), tracks (N, 6) global ID'li, seam istatistikleri
+    """
+    next_id = 1
+    id_map = {}
+    frames, tracks, seams = [], [], []
+    for k, result in enumerate(results):
+        start, core_start, end = result['window']
+        lo = np.searchsorted(result['frames'], core_start)
+        own_frames, own_tracks = result['frames'][lo:], result['tracks'][lo:].copy()
+        
+        matched = {}
+        if k > 0:
+            matched = match_seam(results[k - 1], result, iou_thresh, min_agreement)
+            overlap = result['tracks'][:lo]
+            seams.append({
+                'frame': core_start + 1,
+                'tracks': int(len(np.unique(overlap[:, 4]))),
+                'stitched': len(matched)
+            })
+        
+        # ilk görünme sırasıyla global ID
+        local_ids, first = np.unique(own_tracks[:, 4].astype(np.int64), return_index=True)
+        mapping = {}
+        for local_id in local_ids[np.argsort(first, kind='stable')].tolist():
+            if matched.get(local_id) in id_map:
+                mapping[local_id] = id_map[matched[local_id]]
+            else:
+                mapping[local_id] = next_id
+                next_id += 1
+        # bir sonraki seam için bu pencerenin tüm ID'leri
+        id_map = mapping
+        if len(own_tracks):
+            own_tracks[:, 4] = [mapping[i] for i in own_tracks[:, 4].astype(np.int64).tolist()]
+        frames.append(own_frames)
+        tracks.append(own_tracks)
+    
+    frames = np.concatenate(frames) if frames else np.zeros(0, dtype=np.int64)
+    tracks = np.concatenate(tracks) if tracks else np.zeros((0, 6))
+    return frames, tracks, seams
+
+
+def run_sharded(sequence_name, input_dir=None, output_dir=None, num_shards=2, overlap=30,
+                workers=None, batch_size=1, cache_dir=None, detect_every=1, multi_line=None,
+                torch_threads=0, iou_thresh=0.5, min_agreement=0.5, flush_every=1000):
+    """Tek sequence'ı num_shards pencerede paralel işle
+    
+    Çıktılar run_sequence(render=False) ile aynı formatta: tracking.txt,
+    events.csv, results.json. results.json'a pencereler ve seam başına
+    birleştirilen track sayıları 'sharding' olarak eklenir. num_shards=1
+    seri çalışmayla birebir aynı çıktıyı verir. Render, canlı kaynak, ROI ve
+    adaptive stride desteklenmez.
+    
+    Returns:
+        results dict (results.json içeriği + pencere süreleri)
+    """
+    if input_dir is None:
+        input_dir = f'data/MOT17/train/{sequence_name}-SDP/img1/'
+    if output_dir is None:
+        output_dir = f'outputs/{sequence_name}'
+    os.makedirs(output_dir, exist_ok=True)
+    
+    with open('configs/counting_lines.yaml', 'r', encoding='utf-8') as f:
+        lines_config = yaml.safe_load(f)
+    if multi_line is None:
+        multi_line = is_multi_config(lines_config[sequence_name])
+    
+    with VideoReader(input_dir) as reader:
+        total_frames, fps = reader.total_frames, reader.fps
+    windows = plan_windows(total_frames, num_shards, overlap)
+    workers = min(workers or len(windows), len(windows))
+    
+    wall_start = time.perf_counter()
+    # fork + torch thread havuzu sorun çıkarabilir, spawn kullan
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context,
+                             initializer=_init_worker, initargs=(cache_dir, torch_threads)) as pool:
+        futures = [
+            pool.submit(run_window, sequence_name, input_dir, window, batch_size, detect_every)
+            for window in windows
+        ]
+        results = [future.result() for future in futures]
+    track_time = time.perf_counter() - wall_start
+    
+    frames, tracks, seams = stitch(results, iou_thresh, min_agreement)
+    
+    # Sayım birleştirilmiş trackler üzerinden, frame sırasıyla
+    counter = MultiLineCounter(sequence_name) if multi_line else LineCounter(sequence_name)
+    tracking_path = os.path.join(output_dir, 'tracking.txt')
+    events_path = os.path.join(output_dir, 'events.csv')
+    tracking_writer = TrackingWriter(tracking_path, flush_every=flush_every)
+    event_writer = EventWriter(events_path, with_line=multi_line, flush_every=flush_every)
+    bounds = np.searchsorted(frames, np.arange(total_frames + 1))
+    try:
+        for frame_idx in range(total_frames):
+            frame_tracks = tracks[bounds[frame_idx]:bounds[frame_idx + 1]]
+            frame_tracks = [[*t[:4], int(t[4]), t[5]] for t in frame_tracks.tolist()]
+            tracking_writer.write_tracks(frame_tracks, frame_idx + 1)
+            counter.update(frame_tracks, frame_idx + 1)
+            event_writer.write_events(counter.pop_events())
+    finally:
+        tracking_writer.close()
+        event_writer.close()
+    wall_time = time.perf_counter() - wall_start
+    
+    detection_stats = DetectionStats()
+    for result in results:
+        detection_stats.add(result['confs'])
+    detected_frames = sum(result['detected_frames'] for result in results)
+    
+    final_counts = counter.get_counts()
+    results_json = {
+        'sequence': sequence_name,
+        'total_frames': total_frames,
+        'detection_stats': detection_stats.summary(detected_frames),
+        'counts': {
+            'entry': final_counts['entry'],
+            'exit': final_counts['exit'],
+            'total_crossings': final_counts['total_crossings'],
+            'unique_tracks': final_counts['unique_tracks']
+        }
+    }
+    if multi_line:
+        results_json['lines'] = counter.get_line_counts()
+        if counter.zones:
+            results_json['zones'] = counter.get_zone_stats(fps)
+    if detect_every > 1:
+        results_json['stride'] = {
+            'detect_every': detect_every,
+            'adaptive': False,
+            'detected_frames': detected_frames
+        }
+    results_json['sharding'] = {
+        'shards': len(windows),
+        'overlap': overlap,
+        'windows': [list(window) for window in windows],
+        'seams': seams
+    }
+    
+    results_path = os.path.join(output_dir, 'results.json')
+    with open(results_path, 'w', encoding='utf-8') as f:
+        json.dump(results_json, f, indent=2, ensure_ascii=False)
+    
+    # Pencere başına süreler (results.json'a yazılmaz)
+    stage_report = {
+        f'shard_{k}': {
+            'items': result['window'][2] - result['window'][0],
+            'busy_s': result['elapsed_s'],
+            'wait_s': 0.0,
+            'fps': (result['window'][2] - result['window'][0]) / result['elapsed_s'] if result['elapsed_s'] > 0 else 0
+        }
+        for k, result in enumerate(results)
+    }
+    
+    return {
+        **results_json,
+        'detection_cache': ('hit' if all(r['cache_hit'] for r in results) else 'miss') if cache_dir else None,
+        'stages': stage_report,
+        'track_time': track_time,
+        'wall_time': wall_time,
+        'fps': total_frames / wall_time if wall_time > 0 else 0,
+        'paths': {
+            'video': None,
+            'tracking': tracking_path,
+            'results': results_path,
+            'events': events_path,
+            'timeline': None
+        }
+    }
@@ -0,0 +1,53 @@
+import json
+import os
+from pathlib import Path
+
+import numpy as np
+
+
+# Checkpoint içeriği değişirse artır (eski checkpoint'ler reddedilir)
+CHECKPOINT_VERSION = 1
+
+
+def save_checkpoint(path, state, meta):
+    """Pipeline durumunu atomik olarak .npz'e yaz
+    
+    Önce geçici dosyaya yazılır, sonra os.replace ile yerine taşınır; yazma
+    sırasında çökme olursa önceki checkpoint bozulmadan kalır. Sıkıştırma
+    yok, birkaç saniyede bir alınabilecek kadar ucuz.
+    
+    Args:
+        state: {'tracker': {ad: dizi}, 'counter': {...}, ...} (bir seviye iç içe)
+        meta: JSON'a çevrilebilir ayarlar (devam ederken karşılaştırılır)
+    """
+    path = Path(path)
+    arrays = {
+        f'{group}/{name}': np.asarray(value)
+        for group, values in state.items() for name, value in values.items()
+    }
+    arrays['meta'] = np.array(json.dumps({'version': CHECKPOINT_VERSION, **meta}, sort_keys=True))
+    
+    tmp_path = path.with_name(path.name + f'.tmp{os.getpid()}.npz')
+    with open(tmp_path, 'wb') as f:
+        np.savez(f, **arrays)
+    os.replace(tmp_path, path)
+    return path
+
+
+def load_checkpoint(path):
+    """save_checkpoint çıktısını oku
+    
+    Returns:
+        state (iç içe dict), meta (dict)
+    """
+    state = {}
+    with np.load(path) as data:
+        meta = json.loads(str(data['meta']))
+        for key in data.files:
+            if key == 'meta':
+                continue
+            group, name = key.split('/', 1)
+            state.setdefault(group, {})[name] = data[key]
+    if meta.get('version') != CHECKPOINT_VERSION:
+        raise ValueError(f"Checkpoint sürümü uyumsuz: {path}")
+    return state, meta
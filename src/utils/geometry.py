@@ -23,6 +23,80 @@ def calculate_iou(box1, box2):
     return inter / union if union > 0 else 0
 
 
+def _iou(a, b):
+    """Aynı şekle broadcast edilebilen (..., 4) bbox dizileri için eleman bazında IoU"""
+    x1 = np.maximum(a[..., 0], b[..., 0])
+    y1 = np.maximum(a[..., 1], b[..., 1])
+    x2 = np.minimum(a[..., 2], b[..., 2])
+    y2 = np.minimum(a[..., 3], b[..., 3])
+    
+    inter = np.clip(x2 - x1, 0, None) * np.clip(y2 - y1, 0, None)
+    area_a = (a[..., 2] - a[..., 0]) * (a[..., 3] - a[..., 1])
+    area_b = (b[..., 2] - b[..., 0]) * (b[..., 3] - b[..., 1])
+    union = area_a + area_b - inter
+    
+    iou = np.zeros_like(inter)
+    np.divide(inter, union, out=iou, where=union > 0)
+    return iou
+
+
+def pairwise_iou(boxes_a, boxes_b):
+    """İki bbox kümesi arasında tüm IoU değerleri (broadcasting ile)
+    
+    Args:
+        boxes_a: (N, 4) [x1, y1, x2, y2]
+        boxes_b: (M, 4) [x1, y1, x2, y2]
+    
+    Returns:
+        (N, M) IoU matrisi
+    """
+    a = np.asarray(boxes_a, dtype=np.float64).reshape(-1, 4)
+    b = np.asarray(boxes_b, dtype=np.float64).reshape(-1, 4)
+    return _iou(a[:, None, :], b[None, :, :])
+
+
+def paired_iou(boxes_a, boxes_b):
+    """Satır satır eşleşen bboxlar için IoU (boxes_a[i] - boxes_b[i])
+    
+    Args:
+        boxes_a, boxes_b: (K, 4) [x1, y1, x2, y2]
+    
+    Returns:
+        (K,) IoU değerleri
+    """
+    a = np.asarray(boxes_a, dtype=np.float64).reshape(-1, 4)
+    b = np.asarray(boxes_b, dtype=np.float64).reshape(-1, 4)
+    return _iou(a, b)
+
+
+def nms(boxes, scores, iou_thresh=0.5):
+    """Non-maximum suppression
+    
+    IoU matrisi bir kez hesaplanır, bastırma skor sırasıyla satırlar
+    üzerinden yapılır.
+    
+    Args:
+        boxes: (N, 4) [x1, y1, x2, y2]
+        scores: (N,)
+        iou_thresh: bu değerden fazla örtüşen düşük skorlu bboxlar atılır
+    
+    Returns:
+        Tutulan indeksler, skora göre azalan sırada
+    """
+    scores = np.asarray(scores, dtype=np.float64).reshape(-1)
+    if len(scores) == 0:
+        return np.zeros(0, dtype=np.int64)
+    
+    order = np.argsort(-scores, kind='stable')
+    iou = pairwise_iou(np.asarray(boxes)[order], np.asarray(boxes)[order])
+    suppressed = np.zeros(len(order), dtype=bool)
+    for i in range(len(order)):
+        if suppressed[i]:
+            continue
+        suppressed[i + 1:] |= iou[i, i + 1:] > iou_thresh
+    return order[~suppressed]
+
+
 def bbox_area(bbox):
     """Bbox alanını hesapla"""
     return (bbox[2] - bbox[0]) * (bbox[3] - bbox[1])
@@ -67,6 +141,100 @@ def line_intersection(p1, p2, line_start, line_end):
     return 0 <= t <= 1 and 0 <= u <= 1
 
 
+def line_intersections(p1, p2, line_starts, line_ends):
+    """line_intersection'ın M hareket x L çizgi için vektörize hali
+    
+    Aynı formül ve aynı sınır kuralları (0 <= t, u <= 1, paralel değil),
+    sonuç scalar versiyonla birebir aynı.
+    
+    Args:
+        p1, p2: (M, 2) önceki ve şimdiki pozisyonlar
+        line_starts, line_ends: (L, 2)
+    
+    Returns:
+        (M, L) bool
+    """
+    p1 = np.asarray(p1, dtype=np.float64).reshape(-1, 2)
+    p2 = np.asarray(p2, dtype=np.float64).reshape(-1, 2)
+    a = np.asarray(line_starts, dtype=np.float64).reshape(-1, 2)
+    b = np.asarray(line_ends, dtype=np.float64).reshape(-1, 2)
+    x1, y1 = p1[:, 0, None], p1[:, 1, None]
+    x2, y2 = p2[:, 0, None], p2[:, 1, None]
+    x3, y3 = a[None, :, 0], a[None, :, 1]
+    x4, y4 = b[None, :, 0], b[None, :, 1]
+    
+    denom = (x1 - x2) * (y3 - y4) - (y1 - y2) * (x3 - x4)
+    valid = np.abs(denom) >= 1e-10
+    denom = np.where(valid, denom, 1.0)
+    t = ((x1 - x3) * (y3 - y4) - (y1 - y3) * (x3 - x4)) / denom
+    u = -((x1 - x2) * (y1 - y3) - (y1 - y2) * (x1 - x3)) / denom
+    return valid & (t >= 0) & (t <= 1) & (u >= 0) & (u <= 1)
+
+
+def segment_crossings(p1, p2, line_starts, line_ends):
+    """M hareketin L çizgiyi kesip kesmediği, tek seferde (signed-side testi)
+    
+    line_intersection ile aynı kural: uç noktalara değmek de kesişme sayılır,
+    paralel hareket sayılmaz.
+    
+    Args:
+        p1, p2: (M, 2) önceki ve şimdiki pozisyonlar
+        line_starts, line_ends: (L, 2)
+    
+    Returns:
+        (M, L) int8: 0 kesişme yok, +1 / -1 hareket çizginin pozitif /
+        negatif tarafına doğru (pozitif taraf: cross(end - start, p - start) > 0)
+    """
+    p1 = np.asarray(p1, dtype=np.float64).reshape(-1, 1, 2)
+    p2 = np.asarray(p2, dtype=np.float64).reshape(-1, 1, 2)
+    a = np.asarray(line_starts, dtype=np.float64).reshape(1, -1, 2)
+    b = np.asarray(line_ends, dtype=np.float64).reshape(1, -1, 2)
+    
+    def cross(u, v):
+        return u[..., 0] * v[..., 1] - u[..., 1] * v[..., 0]
+    
+    line = b - a
+    motion = p2 - p1
+    # hareketin uçları çizginin hangi tarafında
+    side_1 = cross(line, p1 - a)
+    side_2 = cross(line, p2 - a)
+    # çizginin uçları hareketin hangi tarafında
+    side_a = cross(motion, a - p1)
+    side_b = cross(motion, b - p1)
+    
+    parallel = np.abs(cross(motion, line)) < 1e-10
+    crossed = (side_1 * side_2 <= 0) & (side_a * side_b <= 0) & ~parallel
+    return np.where(crossed, np.sign(side_2 - side_1), 0).astype(np.int8)
+
+
+def points_in_polygons(points, polygons):
+    """Her nokta için her polygon'un içinde mi (ray casting, tek seferde)
+    
+    Args:
+        points: (N, 2)
+        polygons: [(K_i, 2), ...] köşe sayıları farklı olabilir
+    
+    Returns:
+        (N, P) bool
+    """
+    points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+    if len(polygons) == 0:
+        return np.zeros((len(points), 0), dtype=bool)
+    
+    # tüm polygonların kenarları art arda, polygon başına başlangıç indeksi
+    starts = [np.asarray(poly, dtype=np.float64).reshape(-1, 2) for poly in polygons]
+    ends = [np.roll(poly, -1, axis=0) for poly in starts]
+    offsets = np.cumsum([0] + [len(poly) for poly in starts[:-1]])
+    (x1, y1), (x2, y2) = np.concatenate(starts).T, np.concatenate(ends).T
+    
+    px, py = points[:, :1], points[:, 1:]
+    straddle = (y1 > py) != (y2 > py)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        x_cross = x1 + (py - y1) * (x2 - x1) / (y2 - y1)
+    hits = straddle & (px < x_cross)
+    return np.add.reduceat(hits.astype(np.int64), offsets, axis=1) % 2 == 1
+
+
 def euclidean_distance(p1, p2):
     """Euclidean distance"""
     return np.sqrt((p1[0] - p2[0])**2 + (p1[1] - p2[1])**2)
@@ -0,0 +1,120 @@
+import os
+from pathlib import Path
+
+import numpy as np
+
+
+# Sidecar cache formatı değişirse artır (eski cache'ler yeniden oluşturulur)
+CACHE_VERSION = 1
+
+
+class MOTData:
+    """MOT format dosyanın kolon bazlı hali
+    
+    Satırlar frame'e göre sıralı tutulur; offsets[f]:offsets[f + 1] aralığı
+    frame f'in satırları. frame() kopyasız slice döner.
+    
+    Attributes:
+        ids: (N,) int64 track/GT ID
+        boxes: (N, 4) float64 [x1, y1, x2, y2]
+        confs: (N,) float64
+        offsets: (num_frames + 2,) int64, frame 0..num_frames için sınırlar
+    """
+    
+    def __init__(self, frames, ids, boxes, confs):
+        frames = np.asarray(frames, dtype=np.int64)
+        order = np.argsort(frames, kind='stable')
+        frames = frames[order]
+        self.ids = np.ascontiguousarray(np.asarray(ids, dtype=np.int64)[order])
+        self.boxes = np.ascontiguousarray(np.asarray(boxes, dtype=np.float64).reshape(-1, 4)[order])
+        self.confs = np.ascontiguousarray(np.asarray(confs, dtype=np.float64)[order])
+        
+        self.num_frames = int(frames[-1]) if len(frames) else 0
+        self.offsets = np.searchsorted(frames, np.arange(self.num_frames + 2))
+    
+    @classmethod
+    def from_rows(cls, rows):
+        """MOT kolonları: frame, id, x, y, w, h, conf, ..."""
+        rows = np.asarray(rows, dtype=np.float64)
+        boxes = rows[:, 2:6].copy()
+        boxes[:, 2:] += boxes[:, :2]
+        return cls(rows[:, 0], rows[:, 1], boxes, rows[:, 6])
+    
+    def __len__(self):
+        return len(self.ids)
+    
+    def frame(self, frame_id):
+        """Frame'in (ids, boxes, confs) slice'ları"""
+        if frame_id < 0 or frame_id > self.num_frames:
+            start = end = 0
+        else:
+            start, end = self.offsets[frame_id], self.offsets[frame_id + 1]
+        return self.ids[start:end], self.boxes[start:end], self.confs[start:end]
+    
+    def frame_ids(self):
+        """En az bir satırı olan frame'ler"""
+        return np.nonzero(np.diff(self.offsets))[0]
+    
+    def select(self, mask):
+        """Maskeye uyan satırlardan yeni MOTData"""
+        frames = np.repeat(np.arange(self.num_frames + 1), np.diff(self.offsets))
+        return MOTData(frames[mask], self.ids[mask], self.boxes[mask], self.confs[mask])
+
+
+def _parse(path):
+    """Dosyayı tek seferde (N, C) float64 diziye çevir"""
+    with open(path) as f:
+        lines = [line for line in f.read().splitlines() if line.strip()]
+    if not lines:
+        return np.zeros((0, 7))
+    
+    num_cols = lines[0].count(',') + 1
+    values = np.array(','.join(lines).split(','), dtype=np.float64)
+    return values.reshape(len(lines), num_cols)
+
+
+def _cache_path(path):
+    return path.with_name(path.name + '.npz')
+
+
+def load_mot(path, is_gt=False, use_cache=True):
+    """gt.txt / det.txt / tracking.txt yükle
+    
+    Parse edilen satırlar dosyanın yanına <dosya>.npz olarak kaydedilir,
+    dosyanın mtime ve boyutu değişirse cache yeniden oluşturulur.
+    
+    Args:
+        path: MOT format dosya
+        is_gt: True ise conf <= 0 satırlar atlanır (sadece visible)
+        use_cache: sidecar cache kullan
+    
+    Returns:
+        MOTData
+    """
+    path = Path(path)
+    stat = os.stat(path)
+    signature = np.array([CACHE_VERSION, stat.st_mtime_ns, stat.st_size], dtype=np.int64)
+    cache_path = _cache_path(path)
+    
+    rows = None
+    if use_cache and cache_path.exists():
+        try:
+            with np.load(cache_path) as cached:
+                if np.array_equal(cached['signature'], signature):
+                    rows = cached['rows']
+        except (OSError, KeyError, ValueError):
+            rows = None  # bozuk cache, yeniden parse
+    
+    if rows is None:
+        rows = _parse(path)
+        if use_cache:
+            try:
+                tmp_path = cache_path.with_name(cache_path.name + f'.tmp{os.getpid()}.npz')
+                np.savez(tmp_path, signature=signature, rows=rows)
+                os.replace(tmp_path, cache_path)
+            except OSError:
+                pass  # salt okunur klasör, cache'siz devam
+    
+    if is_gt:
+        rows = rows[rows[:, 6] > 0]
+    return MOTData.from_rows(rows)
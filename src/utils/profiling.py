@@ -0,0 +1,119 @@
+import cProfile
+import io
+import json
+import pstats
+from pathlib import Path
+
+import numpy as np
+
+
+# Süre alanları saniye olarak toplanır, raporda ms
+TIME_FIELDS = ('read', 'detect', 'predict', 'match', 'update', 'count', 'draw', 'write')
+COUNT_FIELDS = ('num_detections', 'num_tracks')
+
+
+class FrameProfiler:
+    """Frame başına stage süreleri ve sayıları için sabit boyutlu ring buffer
+    
+    Her frame bir satır (slot = frame_idx % capacity); stage'ler kendi
+    kolonlarına ekler, pipelined modda farklı thread'ler aynı satırın farklı
+    kolonlarına yazar. Sadece son capacity frame tutulur, bellek sabit.
+    """
+    
+    def __init__(self, capacity=100000):
+        self.capacity = capacity
+        self.fields = TIME_FIELDS + COUNT_FIELDS
+        self._columns = {name: i for i, name in enumerate(self.fields)}
+        self.frames = np.full(capacity, -1, dtype=np.int64)
+        self.data = np.zeros((capacity, len(self.fields)))
+        self.num_frames = 0  # toplam (taşanlar dahil)
+    
+    @property
+    def column_names(self):
+        """Çıktıdaki kolon adları (süreler _ms)"""
+        return [f'{name}_ms' if name in TIME_FIELDS else name for name in self.fields]
+    
+    def record(self, frame_idx, **values):
+        """frame_idx satırına değerleri ekle (örn: record(5, read=0.002))"""
+        slot = frame_idx % self.capacity
+        if self.frames[slot] != frame_idx:
+            self.frames[slot] = frame_idx
+            self.data[slot] = 0
+            self.num_frames += 1
+        row = self.data[slot]
+        for name, value in values.items():
+            row[self._columns[name]] += value
+    
+    def timeline(self):
+        """Buffer'daki frameler, frame sırasıyla: frames (N,), data (N, F)"""
+        valid = np.flatnonzero(self.frames >= 0)
+        order = valid[np.argsort(self.frames[valid], kind='stable')]
+        return self.frames[order], self.data[order]
+    
+    def summary(self):
+        """Alan başına p50 / p95 / p99 / ortalama / max (süreler ms)"""
+        frames, data = self.timeline()
+        # capacity'yi aşan eski frameler özete girmez
+        summary = {'frames': int(len(frames)), 'overwritten_frames': self.num_frames - int(len(frames))}
+        if len(frames) == 0:
+            return summary
+        
+        p50, p95, p99 = np.percentile(data, [50, 95, 99], axis=0)
+        mean, peak = data.mean(axis=0), data.max(axis=0)
+        for i, (name, key) in enumerate(zip(self.fields, self.column_names)):
+            scale = 1000 if name in TIME_FIELDS else 1
+            summary[key] = {
+                'p50': float(p50[i] * scale),
+                'p95': float(p95[i] * scale),
+                'p99': float(p99[i] * scale),
+                'mean': float(mean[i] * scale),
+                'max': float(peak[i] * scale)
+            }
+        return summary
+    
+    def save(self, path):
+        """Timeline'ı .csv veya .json olarak kaydet (süreler ms)"""
+        path = Path(path)
+        frames, data = self.timeline()
+        data = data.copy()
+        data[:, :len(TIME_FIELDS)] *= 1000
+        
+        if path.suffix == '.json':
+            num_times = len(TIME_FIELDS)
+            rows = [
+                {'frame': int(f) + 1,
+                 **dict(zip(self.column_names, row[:num_times].tolist() + row[num_times:].astype(int).tolist()))}
+                for f, row in zip(frames, data)
+            ]
+            with open(path, 'w') as f:
+                json.dump(rows, f)
+        else:
+            header = ','.join(['frame'] + self.column_names)
+            table = np.column_stack([frames + 1, data])
+            fmt = ['%d'] + ['%.4f'] * len(TIME_FIELDS) + ['%d'] * len(COUNT_FIELDS)
+            np.savetxt(path, table, fmt=fmt, delimiter=',', header=header, comments='')
+        return path
+
+
+def profile_call(report_dir, fn, /, *args, **kwargs):
+    """fn'i cProfile altında çalıştır, raporu report_dir'e yaz
+    
+    report_dir/profile.prof (snakeviz / pstats ile açılabilir) ve
+    profile.txt (kümülatif süreye göre ilk 50 fonksiyon). cProfile sadece
+    çağıran thread'i ölçer, pipelined modda decode / detect / render
+    thread'leri rapora girmez.
+    
+    Returns:
+        fn'in dönüş değeri
+    """
+    report_dir = Path(report_dir)
+    report_dir.mkdir(parents=True, exist_ok=True)
+    profiler = cProfile.Profile()
+    try:
+        return profiler.runcall(fn, *args, **kwargs)
+    finally:
+        profiler.dump_stats(report_dir / 'profile.prof')
+        stream = io.StringIO()
+        pstats.Stats(profiler, stream=stream).sort_stats('cumulative').print_stats(50)
+        with open(report_dir / 'profile.txt', 'w') as f:
+            f.write(stream.getvalue())
@@ -0,0 +1,51 @@
+"""
+Sequence keşfi: sequences.yaml veya klasör glob'u
+
+run_all.py ve scripts/ altındaki araçlar aynı listeyi kullanır.
+"""
+import glob
+import os
+import re
+
+import yaml
+
+
+def base_sequence(name):
+    """Detector son eki olmadan sequence adı (MOT17-02-DPM -> MOT17-02)"""
+    return re.sub(r'-(SDP|DPM|FRCNN)$', '', name)
+
+
+def collect_sequences(config_path='configs/sequences.yaml', pattern=None, names=None):
+    """İşlenecek (ad, klasör) listesi
+    
+    pattern verilirse klasörler glob ile bulunur (örn: data/MOT17/train/*-SDP),
+    yoksa sequences.yaml'daki enabled sequence'lar kullanılır. Ad çıktı
+    klasörü ve özet anahtarıdır: glob'da aynı sequence'ın birden fazla
+    detector varyantı varsa (MOT17-02-SDP, MOT17-02-DPM) klasör adı, yoksa
+    son eksiz ad (MOT17-02). names hem ada hem son eksiz ada uyar.
+    """
+    if pattern:
+        seq_dirs = [
+            seq_dir for seq_dir in sorted(glob.glob(pattern))
+            if os.path.isdir(os.path.join(seq_dir, 'img1'))
+        ]
+        dir_names = [os.path.basename(os.path.normpath(seq_dir)) for seq_dir in seq_dirs]
+        bases = [base_sequence(dir_name) for dir_name in dir_names]
+        # aynı çıktı klasörüne iki worker yazmasın
+        sequences = [
+            (base if bases.count(base) == 1 else dir_name, seq_dir)
+            for base, dir_name, seq_dir in zip(bases, dir_names, seq_dirs)
+        ]
+    else:
+        with open(config_path, 'r', encoding='utf-8') as f:
+            config = yaml.safe_load(f)
+        sequences = [
+            (name, f"data/MOT17/train/{info['name']}")
+            for name, info in config['sequences'].items()
+            if info.get('enabled', True)
+        ]
+    
+    if names:
+        sequences = [(name, seq_dir) for name, seq_dir in sequences
+                     if name in names or base_sequence(name) in names]
+    return sequences
@@ -1,15 +1,64 @@
 import cv2
 from pathlib import Path
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 import glob
+import queue
+import threading
+import time
 
 
-class VideoReader:
-    """Video veya frame okuma"""
+# JPEG DCT ölçekleme ile küçültülmüş decode (libjpeg 1/2, 1/4, 1/8)
+REDUCED_FLAGS = {
+    1: cv2.IMREAD_COLOR,
+    2: cv2.IMREAD_REDUCED_COLOR_2,
+    4: cv2.IMREAD_REDUCED_COLOR_4,
+    8: cv2.IMREAD_REDUCED_COLOR_8,
+}
+
+
+def reduced_scale(width, height, target_size):
+    """Uzun kenarı target_size'ın altına düşürmeyen en büyük decode ölçeği"""
+    scale = 1
+    for s in (2, 4, 8):
+        if max(width, height) / s >= target_size:
+            scale = s
+    return scale
 
-    def __init__(self, video_path, fps=30):
+
+class VideoReader:
+    """Video veya frame okuma
+    
+    prefetch > 0 ise frameler arka planda decode edilir: image sequence için
+    num_workers thread'lik havuz, video dosyası için tek okuma thread'i.
+    Bellekte en fazla prefetch kadar frame tutulur, sıra korunur.
+    
+    decode_size verilirse image sequence frameleri uzun kenarı decode_size'dan
+    küçük olmayacak şekilde 1/2, 1/4 veya 1/8 ölçekte decode edilir
+    (decode_scale). width / height orijinal boyuttur; tam çözünürlük
+    gerektiğinde read_full kullanılır. Video dosyalarında decode_scale 1.
+    
+    start_frame verilirse okuma o frame'den başlar (checkpoint'ten devam,
+    sharding). Image sequence'ta doğrudan, video dosyasında grab ile atlanır.
+    
+    skip_fn(index) True dönen frameler skip ile atlanacak demektir: image
+    sequence prefetch'inde bunlar arka planda decode edilmez. Tahmin tutmazsa
+    (frame read ile istenirse) o frame senkron decode edilir.
+    """
+    
+    def __init__(self, video_path, fps=30, prefetch=0, num_workers=2, decode_size=None, start_frame=0,
+                 skip_fn=None):
         self.video_path = Path(video_path)
         self.is_image_sequence = False
         self.current_frame = 0
+        self.prefetch = prefetch
+        self.num_workers = num_workers
+        self.skip_fn = skip_fn
+        
+        # decode süresi vs consumer bekleme süresi
+        self.decode_time = 0.0
+        self.wait_time = 0.0
+        self._stats_lock = threading.Lock()
         
         if self.video_path.is_dir():
             # Frame dizini (MOT17 gibi)
@@ -26,6 +75,7 @@ class VideoReader:
             self.total_frames = len(self.frame_files)
             self.fps = fps
             self.cap = None
+            self.decode_scale = reduced_scale(self.width, self.height, decode_size) if decode_size else 1
         else:
             # Video dosyası
             self.cap = cv2.VideoCapture(str(video_path))
@@ -36,21 +86,178 @@ class VideoReader:
             self.width = int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH))
             self.height = int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
             self.total_frames = int(self.cap.get(cv2.CAP_PROP_FRAME_COUNT))
+            self.decode_scale = 1
+        
+        if self.is_image_sequence:
+            self.current_frame = min(start_frame, self.total_frames)
+        else:
+            while self.current_frame < start_frame and self.cap.grab():
+                self.current_frame += 1
+        
+        self._executor = None
+        self._thread = None
+        if self.prefetch > 0:
+            self._start_prefetch()
+    
+    def _start_prefetch(self):
+        """Arka plan decode'u başlat"""
+        if self.is_image_sequence:
+            self._executor = ThreadPoolExecutor(max_workers=self.num_workers)
+            self._pending = deque()
+            self._next_submit = self.current_frame
+            for _ in range(self.prefetch):
+                self._submit_next()
+        else:
+            self._queue = queue.Queue(maxsize=self.prefetch)
+            self._stop = threading.Event()
+            self._thread = threading.Thread(target=self._capture_loop, daemon=True)
+            self._thread.start()
+    
+    def _decode(self, path):
+        """Tek frame decode (worker thread'de çalışır)"""
+        start = time.perf_counter()
+        frame = cv2.imread(path, REDUCED_FLAGS[self.decode_scale])
+        elapsed = time.perf_counter() - start
+        with self._stats_lock:
+            self.decode_time += elapsed
+        return frame
+    
+    def _submit_next(self):
+        if self._next_submit < len(self.frame_files):
+            if self.skip_fn is not None and self.skip_fn(self._next_submit):
+                # atlanacak frame, decode yok
+                self._pending.append(None)
+            else:
+                path = self.frame_files[self._next_submit]
+                self._pending.append(self._executor.submit(self._decode, path))
+            self._next_submit += 1
+    
+    def _capture_loop(self):
+        """Video dosyasını sırayla okuyup kuyruğa koy"""
+        while not self._stop.is_set():
+            start = time.perf_counter()
+            ret, frame = self.cap.read()
+            with self._stats_lock:
+                self.decode_time += time.perf_counter() - start
+            
+            item = (ret, frame if ret else None)
+            while not self._stop.is_set():
+                try:
+                    self._queue.put(item, timeout=0.1)
+                    break
+                except queue.Full:
+                    continue
+            if not ret:
+                break
+    
+    def _read_prefetched(self):
+        start = time.perf_counter()
+        if self.is_image_sequence:
+            if not self._pending:
+                return False, None
+            future = self._pending.popleft()
+            if future is None:
+                # skip_fn yanıldı, frame gerçekten isteniyor
+                frame = self._decode(self.frame_files[self.current_frame])
+            else:
+                frame = future.result()
+            # Kuyruk derinliğini sabit tut
+            self._submit_next()
+            ret = True
+        else:
+            ret, frame = self._queue.get()
+            if not ret:
+                # Sonraki read çağrıları da False dönsün
+                self._queue.put((False, None))
+        self.wait_time += time.perf_counter() - start
+        
+        if ret:
+            self.current_frame += 1
+        return ret, frame
     
     def read(self):
+        if self.prefetch > 0:
+            return self._read_prefetched()
+        
         if self.is_image_sequence:
             if self.current_frame < len(self.frame_files):
-                frame = cv2.imread(self.frame_files[self.current_frame])
+                frame = self._decode(self.frame_files[self.current_frame])
                 self.current_frame += 1
                 return True, frame
             return False, None
         else:
+            start = time.perf_counter()
             ret, frame = self.cap.read()
+            self.decode_time += time.perf_counter() - start
             if ret:
                 self.current_frame += 1
             return ret, frame
     
+    def read_full(self, index):
+        """index'teki frame'i tam çözünürlükte decode et (render için)
+        
+        Sadece image sequence; okuma sırasını değiştirmez.
+        """
+        start = time.perf_counter()
+        frame = cv2.imread(self.frame_files[index])
+        with self._stats_lock:
+            self.decode_time += time.perf_counter() - start
+        return frame
+    
+    def skip(self):
+        """Frame'i kullanmadan ilerle (detection cache hit + headless, stride)
+        
+        Image sequence'ta decode edilmez; prefetch modunda skip_fn'in
+        önceden atladığı frameler decode edilmemiştir, diğerlerinin başlamamış
+        decode'u iptal edilir. Video dosyasında grab kullanılır, prefetch
+        thread'i ise frame'i yine okur.
+        """
+        if self.prefetch > 0 and self.is_image_sequence:
+            if not self._pending:
+                return False
+            future = self._pending.popleft()
+            if future is not None:
+                future.cancel()
+            self._submit_next()
+            self.current_frame += 1
+            return True
+        if self.prefetch > 0:
+            return self.read()[0]
+        if self.is_image_sequence:
+            if self.current_frame < len(self.frame_files):
+                self.current_frame += 1
+                return True
+            return False
+        ret = self.cap.grab()
+        if ret:
+            self.current_frame += 1
+        return ret
+    
+    def get_stats(self):
+        """Decode ve bekleme süreleri (saniye)
+        
+        Senkron modda consumer decode süresi kadar bekler; prefetch modunda
+        wait_time << decode_time ise decode, detection ile örtüşüyor demektir.
+        """
+        frames = max(self.current_frame, 1)
+        wait_time = self.wait_time if self.prefetch > 0 else self.decode_time
+        return {
+            'frames': self.current_frame,
+            'decode_time': self.decode_time,
+            'wait_time': wait_time,
+            'avg_decode_ms': self.decode_time / frames * 1000,
+            'avg_wait_ms': wait_time / frames * 1000
+        }
+    
     def release(self):
+        if self._executor:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+            self._pending.clear()
+        if self._thread:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
         if self.cap:
             self.cap.release()
     
@@ -66,6 +273,181 @@ class VideoReader:
         return 0
 
 
+class StreamReader:
+    """Canlı kaynak okuma (RTSP/HTTP URL, kamera indeksi, FIFO veya dosya)
+    
+    Capture ayrı thread'de sürekli çalışır, frameler buffer_size'lık
+    buffer'da tutulur. Inference geride kalırsa drop_policy'ye göre:
+        'oldest': buffer'daki en eski frame atılır (consumer hep en yeni frame'i alır)
+        'newest': gelen yeni frame atılır (buffer sırası korunur)
+        'none':   frame atılmaz, capture bekler (dosya / pipe için)
+    max_latency (saniye) verilirse read anında bundan eski frameler de atılır.
+    
+    Her frame'e capture sırası (index) ve zamanı işaretlenir; atılan frameler
+    index'te boşluk bırakır, tracker'a verilecek frame farkı buradan çıkar.
+    """
+    
+    DROP_POLICIES = ('oldest', 'newest', 'none')
+    
+    def __init__(self, source, fps=None, drop_policy='oldest', buffer_size=1,
+                 max_latency=None, realtime=False):
+        """
+        Args:
+            source: URL, kamera indeksi ('0') veya dosya/FIFO yolu
+            fps: kaynak fps'i bilinmiyorsa kullanılacak değer
+            realtime: dosya kaynağını fps hızında oku (canlı kamera simülasyonu)
+        """
+        if drop_policy not in self.DROP_POLICIES:
+            raise ValueError(f"Geçersiz drop_policy: {drop_policy} ({', '.join(self.DROP_POLICIES)})")
+        
+        self.source = str(source)
+        self.drop_policy = drop_policy
+        self.buffer_size = max(1, buffer_size)
+        self.max_latency = max_latency
+        self.realtime = realtime
+        self.prefetch = self.buffer_size  # capture zaten arka planda
+        self.is_image_sequence = False
+        self.total_frames = 0  # canlı kaynakta bilinmiyor
+        self.current_frame = 0
+        self.decode_scale = 1
+        
+        # Son okunan frame'in capture indeksi ve zamanı (time.monotonic)
+        self.last_index = -1
+        self.last_timestamp = None
+        
+        self.cap = cv2.VideoCapture(int(self.source) if self.source.isdigit() else self.source)
+        if not self.cap.isOpened():
+            raise ValueError(f"Kaynak açılamadı: {source}")
+        
+        self.fps = int(self.cap.get(cv2.CAP_PROP_FPS)) or fps or 30
+        self.width = int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+        self.height = int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        
+        # Sayaçlar
+        self.captured = 0
+        self.dropped = 0
+        self.decode_time = 0.0
+        self.wait_time = 0.0
+        self.latency_sum = 0.0  # capture -> read arası
+        self.latency_max = 0.0
+        
+        self._buffer = deque()
+        self._ended = False
+        self._cond = threading.Condition()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._capture_loop, daemon=True)
+        self._thread.start()
+    
+    def _capture_loop(self):
+        next_time = time.monotonic()
+        while not self._stop.is_set():
+            start = time.perf_counter()
+            ret, frame = self.cap.read()
+            elapsed = time.perf_counter() - start
+            if not ret:
+                break
+            
+            item = (self.captured, time.monotonic(), frame)
+            with self._cond:
+                self.decode_time += elapsed
+                self.captured += 1
+                if len(self._buffer) >= self.buffer_size:
+                    if self.drop_policy == 'oldest':
+                        self._buffer.popleft()
+                        self.dropped += 1
+                    elif self.drop_policy == 'newest':
+                        self.dropped += 1
+                        item = None
+                    else:
+                        while len(self._buffer) >= self.buffer_size and not self._stop.is_set():
+                            self._cond.wait(0.1)
+                if item is not None:
+                    self._buffer.append(item)
+                    self._cond.notify_all()
+            
+            if self.realtime:
+                next_time += 1.0 / self.fps
+                delay = next_time - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+        
+        with self._cond:
+            self._ended = True
+            self._cond.notify_all()
+    
+    def read(self):
+        """En uygun frame'i al (yoksa gelene kadar bekle)
+        
+        Returns:
+            ret, frame (kaynak bittiyse False, None)
+        """
+        start = time.perf_counter()
+        with self._cond:
+            while True:
+                while not self._buffer and not self._ended:
+                    self._cond.wait(0.1)
+                if not self._buffer:
+                    self.wait_time += time.perf_counter() - start
+                    return False, None
+                
+                index, timestamp, frame = self._buffer.popleft()
+                self._cond.notify_all()
+                latency = time.monotonic() - timestamp
+                if self.max_latency is not None and latency > self.max_latency and self._buffer:
+                    self.dropped += 1  # bayat, daha yenisi var
+                    continue
+                break
+        
+        self.wait_time += time.perf_counter() - start
+        self.latency_sum += latency
+        self.latency_max = max(self.latency_max, latency)
+        self.last_index = index
+        self.last_timestamp = timestamp
+        self.current_frame += 1
+        return True, frame
+    
+    def skip(self):
+        """Frame'i tüket (capture thread'inde zaten decode edilmiş, atlanamaz)"""
+        return self.read()[0]
+    
+    def get_stats(self):
+        """VideoReader ile aynı alanlar + drop / latency sayaçları"""
+        frames = max(self.current_frame, 1)
+        with self._cond:
+            captured, dropped = self.captured, self.dropped
+            decode_time = self.decode_time
+        return {
+            'frames': self.current_frame,
+            'decode_time': decode_time,
+            'wait_time': self.wait_time,
+            'avg_decode_ms': decode_time / max(captured, 1) * 1000,
+            'avg_wait_ms': self.wait_time / frames * 1000,
+            'captured': captured,
+            'dropped': dropped,
+            'drop_rate': dropped / captured if captured else 0,
+            'avg_queue_latency_ms': self.latency_sum / frames * 1000,
+            'max_queue_latency_ms': self.latency_max * 1000
+        }
+    
+    def release(self):
+        if self._thread:
+            self._stop.set()
+            with self._cond:
+                self._cond.notify_all()
+            self._thread.join()
+            self._thread = None
+        self.cap.release()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *args):
+        self.release()
+    
+    def get_progress(self):
+        return 0
+
+
 class VideoWriter:
     """Video yazma için basic class"""
     
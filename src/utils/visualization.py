@@ -38,6 +38,13 @@ def draw_counting_line(frame, line_start, line_end, color=(0, 255, 0), thickness
     return frame
 
 
+def draw_zone(frame, polygon, color=(255, 200, 0), thickness=2):
+    """Sayım zone'u (polygon)"""
+    points = np.asarray(polygon, dtype=np.int32).reshape(-1, 1, 2)
+    cv2.polylines(frame, [points], True, color, thickness)
+    return frame
+
+
 def draw_counts(frame, counts, position=(20, 50)):
     """Sayım bilgileri"""
     x, y = position
@@ -0,0 +1,126 @@
+import time
+from pathlib import Path
+
+
+class BufferedLineWriter:
+    """Satır bazlı buffered dosya yazma
+    
+    Satırlar bellekte biriktirilir; flush_every satırda bir veya
+    flush_interval saniyede bir diske yazılır. Bellek kullanımı buffer
+    boyutuyla sınırlı, crash durumunda en fazla son buffer kaybolur.
+    """
+    
+    def __init__(self, path, header=None, flush_every=1000, flush_interval=5.0,
+                 trailing_newline=True, resume_from=None):
+        """
+        Args:
+            resume_from: checkpoint() çıktısı (offset, lines_written); verilirse
+                dosya offset'e kesilip sonuna yazılır, header tekrar yazılmaz
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.flush_every = flush_every
+        self.flush_interval = flush_interval
+        # False ise satırlar '\n'.join gibi yazılır (son satırdan sonra newline yok)
+        self.trailing_newline = trailing_newline
+        
+        self.buffer = []
+        self.lines_written = 0
+        self.last_flush = time.monotonic()
+        
+        if resume_from is not None:
+            # checkpoint'ten sonra yazılmış satırlar atılır
+            offset, self.lines_written = resume_from
+            self.file = open(self.path, 'r+')
+            self.file.truncate(offset)
+            self.file.seek(offset)
+            return
+        
+        self.file = open(self.path, 'w')
+        if header is not None:
+            self.file.write(header + '\n')
+    
+    def write(self, line):
+        if self.trailing_newline:
+            self.buffer.append(line + '\n')
+        elif self.lines_written == 0 and not self.buffer:
+            self.buffer.append(line)
+        else:
+            self.buffer.append('\n' + line)
+        
+        if len(self.buffer) >= self.flush_every or time.monotonic() - self.last_flush >= self.flush_interval:
+            self.flush()
+    
+    def write_lines(self, lines):
+        for line in lines:
+            self.write(line)
+    
+    def flush(self):
+        """Buffer'ı diske yaz"""
+        if self.buffer:
+            self.file.write(''.join(self.buffer))
+            self.lines_written += len(self.buffer)
+            self.buffer = []
+        self.file.flush()
+        self.last_flush = time.monotonic()
+    
+    def checkpoint(self):
+        """Buffer'ı diske yaz, devam için (offset, lines_written) döndür"""
+        self.flush()
+        return self.file.tell(), self.lines_written
+    
+    def close(self):
+        if not self.file.closed:
+            self.flush()
+            self.file.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *args):
+        self.close()
+
+
+class TrackingWriter(BufferedLineWriter):
+    """tracking.txt (MOT format) yazıcı"""
+    
+    def __init__(self, path, **kwargs):
+        # Eski çıktı ile aynı: son satırdan sonra newline yok
+        kwargs.setdefault('trailing_newline', False)
+        super().__init__(path, **kwargs)
+    
+    def write_tracks(self, tracks, frame_id):
+        """Bir frame'in tracklerini yaz
+        
+        Args:
+            tracks: [[x1, y1, x2, y2, track_id, conf], ...]
+            frame_id: 1'den başlayan frame numarası
+        """
+        for track in tracks:
+            x1, y1, x2, y2, track_id, conf = track
+            w = x2 - x1
+            h = y2 - y1
+            # Format: <frame>, <id>, <bb_left>, <bb_top>, <bb_width>, <bb_height>, <conf>, -1, -1, -1
+            self.write(f"{frame_id},{int(track_id)},{x1:.2f},{y1:.2f},{w:.2f},{h:.2f},{conf:.4f},-1,-1,-1")
+
+
+class EventWriter(BufferedLineWriter):
+    """events.csv yazıcı"""
+    
+    HEADER = 'frame,track_id,event_type,direction'
+    
+    def __init__(self, path, with_line=False, **kwargs):
+        """
+        Args:
+            with_line: MultiLineCounter eventleri için 'line' kolonu ekle
+        """
+        self.with_line = with_line
+        kwargs.setdefault('header', self.HEADER + (',line' if with_line else ''))
+        super().__init__(path, **kwargs)
+    
+    def write_events(self, events):
+        for event in events:
+            line = f"{event['frame']},{event['track_id']},{event['event_type']},{event['direction']}"
+            if self.with_line:
+                line += f",{event['line']}"
+            self.write(line)